@@ -0,0 +1,462 @@
+"""
+ZER01NE 67 - ASYNC SERVER
+aiohttp application with the same API routes as the Flask app, backed by the same ZER01NE67 core.
+
+Each connection is a coroutine rather than a thread, so thousands of slow
+keep-alive clients cost little more than their sockets. Safety checks and
+lookups against the in-process store are microseconds and run on the event
+loop; Earth validation (pool registration and /earth/validate) runs in an
+executor so it never stalls other connections. So does any core call that
+can block: checks with a deadline_ms (they may wait for re-validation),
+registrations when WAL_DIR is set with WAL_SYNC_COMMIT (they wait for the
+log's fsync), and everything when the state is remote (STATE_STORE=redis,
+or a sharding ShardRouter), since those calls are socket round trips.
+
+Usage: python async_app.py
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+
+from aiohttp import web
+
+import metrics
+import responses
+import sovereign_quantum_system as sq
+from sovereign_quantum_system import (Config, ChildState, EarthValidator, EarthPointCache,
+                                      HOME_RESPONSE, POINTS_RESPONSE, HTTP_SECONDS, HTTP_REQUESTS, ERRORS,
+                                      health_body, point_filters, sse_event)
+
+SYSTEM = 'system'
+EARTH_POOL = 'earth_pool'
+STATE_POOL = 'state_pool'
+REMOTE = 'remote'       # core calls make network round trips (Redis store or shard router)
+SYNC_WAL = 'sync_wal'   # registrations wait for the write-ahead log's group commit
+
+_worker_cache = None
+
+
+def _validate_location(lat: float, lon: float, alt: float, **filters):
+    """Process-pool entry point; each worker keeps its own point cache (feed points stay static)"""
+    global _worker_cache
+    if _worker_cache is None:
+        _worker_cache = EarthPointCache()
+    return EarthValidator(cache=_worker_cache).validate_location(lat, lon, alt, **filters)
+
+
+def _validate_many(lats, lons, alts):
+    result = EarthValidator().validate_location_many(lats, lons, alts)
+    result['values'] = {k: v.tolist() for k, v in result['values'].items()}
+    for key in ('confidence', 'average_confidence', 'points_passed', 'collapse_state', 'verified'):
+        result[key] = result[key].tolist()
+    return result
+
+
+async def _read_json(request: web.Request, required):
+    """Parsed body, or an error response when it is not JSON or lacks fields"""
+    try:
+        data = await request.json(loads=responses.loads)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None, json_response({'error': 'Invalid JSON'}, status=400)
+    if not isinstance(data, dict) or not all(k in data for k in required):
+        return None, json_response({'error': 'Missing required fields'}, status=400)
+    return data, None
+
+
+def json_response(data, status: int = 200) -> web.Response:
+    return web.Response(body=responses.dumps(data), status=status, content_type='application/json')
+
+
+def _precomputed(request: web.Request, body) -> web.Response:
+    """Serve pre-serialized bytes in whichever encoding the client accepts"""
+    data, encoding = body.select(request.headers.get('Accept-Encoding'), Config.RESPONSE_COMPRESS_MIN_BYTES)
+    response = web.Response(body=data, content_type='application/json', headers={'Vary': 'Accept-Encoding'})
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _reply(result):
+    return json_response(result, status=400 if 'error' in result else 200)
+
+
+async def _in_executor(pool, fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(pool, partial(fn, *args, **kwargs))
+
+
+async def _core(request: web.Request, fn, *args, blocking: bool = False, **kwargs):
+    """Call into the core: inline when it is in-process and cannot block, else in the state pool"""
+    if blocking or request.app[REMOTE]:
+        return await _in_executor(request.app[STATE_POOL], fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+def _is_remote(system) -> bool:
+    """True for a ShardRouter or a system whose store is not process-local memory"""
+    store = getattr(system, 'store', None)
+    return store is None or store.backend != 'memory'
+
+
+def _waits_for_wal(system) -> bool:
+    """True when registrations block until the write-ahead log has written (and fsynced) them"""
+    durable = getattr(getattr(system, 'store', None), 'durable', None)
+    return durable is not None and bool(durable.wal.sync_kinds)
+
+
+# ============================================
+# ROUTES
+# ============================================
+
+routes = web.RouteTableDef()
+
+
+@routes.get('/')
+async def home(request):
+    return _precomputed(request, HOME_RESPONSE)
+
+
+@routes.get('/health')
+async def health(request):
+    return web.Response(body=health_body(), content_type='application/json')
+
+
+@routes.get('/stats')
+async def stats(request):
+    return json_response(await _core(request, request.app[SYSTEM].get_stats))
+
+
+@routes.post('/pool/register')
+async def register_pool(request):
+    data, error = await _read_json(request, ['owner_id', 'lat', 'lon'])
+    if error:
+        return error
+
+    # Earth validation dominates registration - keep it off the event loop
+    result = await _in_executor(
+        request.app[STATE_POOL], request.app[SYSTEM].register_location,
+        owner_id=data['owner_id'],
+        lat=data['lat'],
+        lon=data['lon'],
+        depth_m=data.get('depth_m', 1.2),
+        name=data.get('name', 'Pool')
+    )
+    return _reply(result)
+
+
+@routes.post('/family/register')
+async def create_family(request):
+    data, error = await _read_json(request, ['session_id', 'mother_id', 'child_id'])
+    if error:
+        return error
+
+    return _reply(await _core(
+        request, request.app[SYSTEM].create_family_bond,
+        blocking=request.app[SYNC_WAL],
+        session_id=data['session_id'],
+        mother_id=data['mother_id'],
+        child_id=data['child_id']
+    ))
+
+
+@routes.post('/safety/check')
+async def check_safety(request):
+    data, error = await _read_json(request, ['bond_id', 'child'])
+    if error:
+        return error
+
+    child = ChildState(
+        child_id=data['child'].get('child_id', 'unknown'),
+        lat=data['child'].get('lat'),
+        lon=data['child'].get('lon'),
+        distance_to_pool=data['child'].get('distance', 0.0),
+        moving_toward_pool=data['child'].get('moving_toward', False),
+        heart_rate=data['child'].get('heart_rate', 60.0)
+    )
+    # A deadline may wait on re-validation (a threading.Event), which must not stall the loop
+    deadline_ms = data.get('deadline_ms')
+    return _reply(await _core(
+        request, request.app[SYSTEM].safety_check,
+        bond_id=data['bond_id'],
+        child=child,
+        deadline_ms=deadline_ms,
+        blocking=deadline_ms is not None
+    ))
+
+
+@routes.post('/safety/check/batch')
+async def check_safety_batch(request):
+    data, error = await _read_json(request, ['bond_ids'])
+    if error:
+        return error
+    if not ('distances' in data or 'lats' in data):
+        return json_response({'error': 'Missing required fields'}, status=400)
+
+    bond_ids = data['bond_ids']
+    n = len(bond_ids)
+    child_ids = data.get('child_ids', ['unknown'] * n)
+    distances = data.get('distances', [0.0] * n)
+    moving_toward = data.get('moving_toward', [False] * n)
+    heart_rates = data.get('heart_rates', [60.0] * n)
+    lats = data.get('lats')
+    lons = data.get('lons', [None] * n) if lats is not None else None
+
+    columns = [child_ids, distances, moving_toward, heart_rates] + ([lats, lons] if lats is not None else [])
+    if not all(len(col) == n for col in columns):
+        return json_response({'error': 'Array lengths do not match'}, status=400)
+
+    results = await _core(
+        request, request.app[SYSTEM].safety_check_batch,
+        bond_ids=bond_ids,
+        child_ids=child_ids,
+        distances=distances,
+        moving_toward=moving_toward,
+        heart_rates=heart_rates,
+        lats=lats,
+        lons=lons
+    )
+    return json_response({
+        'results': results,
+        'count': n,
+        'alerts': sum(1 for r in results if r.get('alert'))
+    })
+
+
+@routes.get('/pools/nearby')
+async def pools_nearby(request):
+    try:
+        lat = float(request.query['lat'])
+        lon = float(request.query['lon'])
+        radius_m = float(request.query['radius_m']) if request.query.get('radius_m') else None
+        k = int(request.query['k']) if request.query.get('k') else None
+    except (KeyError, ValueError):
+        return json_response({'error': 'lat and lon are required'}, status=400)
+
+    pools = await _core(request, request.app[SYSTEM].safety.pools_near, lat, lon, radius_m=radius_m, k=k)
+    return json_response({'pools': pools, 'count': len(pools)})
+
+
+@routes.get('/alerts')
+async def get_alerts(request):
+    args = {}
+    for key in ('since', 'cursor', 'limit'):
+        value = request.query.get(key)
+        if value:
+            try:
+                args[key] = int(value)
+            except ValueError:
+                if key == 'cursor':
+                    args[key] = value   # sharded mode: one position per shard (validated by the store)
+    for key in ('child_id', 'pool_id'):
+        if request.query.get(key):
+            args[key] = request.query[key]
+
+    # Conditional GET: same store version + same query -> 304 (version after syncing other workers)
+    safety = request.app[SYSTEM].safety
+    query = hashlib.md5(request.query_string.encode()).hexdigest()[:8]
+    etag = f"{await _core(request, safety.alerts_version)}-{query}"
+    if any(tag.value == etag for tag in request.if_none_match or ()):
+        response = web.Response(status=304)
+        response.etag = etag
+        return response
+
+    try:
+        page = await _core(request, safety.query_alerts, **args)
+    except ValueError as e:
+        return json_response({'error': str(e)}, status=400)
+    response = json_response({
+        'alerts': page['alerts'],
+        'next_cursor': page['next_cursor'],
+        'count': await _core(request, len, safety.alerts)
+    })
+    response.etag = etag
+    return response
+
+
+@routes.get('/alerts/stream')
+async def stream_alerts(request):
+    """Server-Sent Events: push each new alert, resumable via Last-Event-ID"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.query.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    broadcaster = request.app[SYSTEM].safety.stream
+    if broadcaster is None:
+        return json_response({'error': 'Live stream is not available in sharded mode'}, status=501)
+    sub = broadcaster.subscribe(
+        pool_id=request.query.get('pool_id'),
+        child_id=request.query.get('child_id'),
+        owner_id=request.query.get('owner_id'),
+        last_event_id=last_event_id
+    )
+    if sub is None:
+        return json_response({'error': 'Too many subscribers'}, status=503)
+
+    # Publishers run on other threads; wake this coroutine instead of blocking one
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    sub.on_ready = lambda: loop.call_soon_threadsafe(ready.set)
+    if sub.queue:
+        ready.set()
+
+    response = web.StreamResponse(headers={'Content-Type': 'text/event-stream',
+                                           'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    try:
+        await response.prepare(request)
+        await response.write(b'retry: 3000\n\n')
+        while not sub.closed:
+            try:
+                await asyncio.wait_for(ready.wait(), Config.ALERT_STREAM_KEEPALIVE_S)
+            except asyncio.TimeoutError:
+                await response.write(b': keep-alive\n\n')
+                continue
+            ready.clear()
+            for position, alert, update in sub.drain(timeout=0):
+                await response.write(sse_event(position, alert, update).encode())
+    except (ConnectionResetError, asyncio.CancelledError):
+        pass
+    finally:
+        broadcaster.unsubscribe(sub)
+    return response
+
+
+@routes.post('/earth/validate')
+async def earth_validate(request):
+    data, error = await _read_json(request, ['lat', 'lon'])
+    if error:
+        return error
+
+    filters = point_filters(data, request.query)
+    pool = request.app[EARTH_POOL]
+    if isinstance(pool, ProcessPoolExecutor):
+        result = await _in_executor(pool, _validate_location, data['lat'], data['lon'],
+                                    data.get('alt', 300.0), **filters)
+    else:
+        earth = request.app[SYSTEM].earth
+        validator = EarthValidator(cache=earth.cache, feeds=earth.feeds)
+        result = await _in_executor(pool, validator.validate_location,
+                                    lat=data['lat'], lon=data['lon'], alt=data.get('alt', 300.0), **filters)
+    return _reply(result)
+
+
+@routes.get('/session/{session_id}/earth')
+async def session_earth(request):
+    """Earth summary for a session, with the full 47-point result if not yet evicted"""
+    result = await _core(request, request.app[SYSTEM].get_earth_result, request.match_info['session_id'])
+    return json_response(result, status=404 if 'error' in result else 200)
+
+
+@routes.get('/metrics')
+async def prometheus_metrics(request):
+    """Counters and latency histograms in the Prometheus text format"""
+    return web.Response(body=metrics.REGISTRY.render().encode(), headers={'Content-Type': metrics.CONTENT_TYPE})
+
+
+@routes.get('/earth/points')
+async def earth_points(request):
+    """Point registry: id, name, group, purity and dependencies"""
+    return _precomputed(request, POINTS_RESPONSE)
+
+
+@routes.post('/earth/validate/batch')
+async def earth_validate_batch(request):
+    data, error = await _read_json(request, ['lats', 'lons'])
+    if error:
+        return error
+
+    alts = data.get('alts', 300.0)
+    if len(data['lats']) != len(data['lons']) or (
+            isinstance(alts, list) and len(alts) != len(data['lats'])):
+        return json_response({'error': 'Array lengths do not match'}, status=400)
+
+    result = await _in_executor(request.app[EARTH_POOL], _validate_many, data['lats'], data['lons'], alts)
+    return json_response(result)
+
+
+# ============================================
+# APP FACTORY
+# ============================================
+
+def _record_status(method: str, route: str, status: int, body=None):
+    HTTP_REQUESTS.labels(method, route, status).inc()
+    if status >= 400:
+        try:
+            message = responses.loads(body).get('error') if isinstance(body, bytes) else None
+        except (ValueError, AttributeError):
+            message = None
+        ERRORS.labels(metrics.error_type(message or f"http_{status}")).inc()
+
+
+@web.middleware
+async def record_request(request, handler):
+    """Latency and status per route, same series as the Flask app"""
+    if not metrics.ENABLED:
+        return await handler(request)
+    start = time.perf_counter()
+    resource = request.match_info.route.resource
+    route = resource.canonical if resource is not None else 'unmatched'
+    try:
+        response = await handler(request)
+    except web.HTTPException as exc:
+        _record_status(request.method, route, exc.status)
+        raise
+    except Exception as exc:
+        ERRORS.labels(type(exc).__name__).inc()
+        raise
+    finally:
+        HTTP_SECONDS.labels(request.method, route).observe(time.perf_counter() - start)
+    _record_status(request.method, route, response.status, getattr(response, 'body', None))
+    return response
+
+
+@web.middleware
+async def compress_response(request, handler):
+    """gzip/deflate large JSON bodies when the client accepts it (same rules as the Flask app)"""
+    response = await handler(request)
+    if (type(response) is not web.Response or response.status != 200
+            or 'Content-Encoding' in response.headers or not isinstance(response.body, bytes)
+            or len(response.body) < Config.RESPONSE_COMPRESS_MIN_BYTES):
+        return response
+    response.headers.add('Vary', 'Accept-Encoding')
+    encoding = responses.negotiate(request.headers.get('Accept-Encoding'))
+    if encoding:
+        response.body = responses.compress(response.body, encoding, Config.RESPONSE_COMPRESS_LEVEL)
+        response.headers['Content-Encoding'] = encoding
+        etag = response.etag
+        if etag and not etag.is_weak:
+            response.headers['ETag'] = f'W/"{etag.value}"'   # same content, different bytes
+    return response
+
+
+def make_app(system=None) -> web.Application:
+    """aiohttp application serving `system` (default: the module-level ZER01NE67)"""
+    app = web.Application(middlewares=[record_request, compress_response])
+    app[SYSTEM] = system or sq.get_system()
+    app[REMOTE] = _is_remote(app[SYSTEM])
+    app[SYNC_WAL] = _waits_for_wal(app[SYSTEM])
+    app[STATE_POOL] = ThreadPoolExecutor(Config.ASYNC_EARTH_THREADS, thread_name_prefix='zer01ne-earth')
+    app[EARTH_POOL] = (ProcessPoolExecutor(Config.ASYNC_EARTH_PROCESSES)
+                       if Config.ASYNC_EARTH_PROCESSES > 0 else app[STATE_POOL])
+    app.add_routes(routes)
+
+    async def shutdown(app):
+        app[STATE_POOL].shutdown(wait=False)
+        if app[EARTH_POOL] is not app[STATE_POOL]:
+            app[EARTH_POOL].shutdown(wait=False)
+    app.on_shutdown.append(shutdown)
+    return app
+
+
+def main():
+    print(f"🌐 Starting async server on http://localhost:{Config.PORT}")
+    web.run_app(make_app(), host=Config.HOST, port=Config.PORT,
+                keepalive_timeout=Config.ASYNC_KEEPALIVE_S, backlog=Config.ASYNC_BACKLOG)
+
+
+if __name__ == "__main__":
+    main()
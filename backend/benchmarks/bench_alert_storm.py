@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Alert storm benchmark
+Alert-store growth when children stay near the pool, with per-bond debouncing and hysteresis
+
+Children send --hz x --seconds readings back to back (checks are stamped
+with the server clock, so each child's run is one continuous episode and a
+five-minute storm takes seconds). Half of them sit
+in steady danger; the other half hover around the raise threshold, which is
+the case hysteresis exists for. Every reading over ALERT_RAISE_THRESHOLD used
+to append an alert; the store should now grow by orders of magnitude less.
+Exits non-zero if the reduction is under --min-reduction.
+
+Usage: python benchmarks/bench_alert_storm.py [--children 200] [--seconds 300] [--hz 5] [--min-reduction 100]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sovereign_quantum_system import Config, ZER01NE67, ChildState
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--children', type=int, default=200)
+    parser.add_argument('--seconds', type=int, default=300, help='simulated duration (sets readings per child)')
+    parser.add_argument('--hz', type=float, default=5.0, help='readings per child per second')
+    parser.add_argument('--min-reduction', type=float, default=100.0)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ALERT STORM - sustained danger, alerts stored vs readings over threshold")
+    print("=" * 60)
+
+    system = ZER01NE67()
+    session_id = system.register_location("OWNER_STORM", 33.4484, -112.0740)['session_id']
+    bonds = [system.create_family_bond(session_id, f"MOM_{i}", f"CHILD_{i}")['bond_id']
+             for i in range(args.children)]
+    sub = system.safety.stream.subscribe()
+
+    ticks = int(args.seconds * args.hz)
+    readings = over = pushed = 0
+
+    start = time.perf_counter()
+    for tick in range(ticks):
+        for i, bond_id in enumerate(bonds):
+            # Even children: steady 0.93; odd children: alternate 0.88 / 0.73 around the raise threshold
+            distance = 1.0 if i % 2 == 0 else (2.0 if tick % 2 == 0 else 5.0)
+            child = ChildState(child_id=f"CHILD_{i}", distance_to_pool=distance, moving_toward_pool=True,
+                               heart_rate=150.0)
+            result = system.safety_check(bond_id, child)
+            readings += 1
+            over += result['danger_probability'] > Config.ALERT_RAISE_THRESHOLD
+        pushed += len(sub.drain(timeout=0))
+    elapsed = time.perf_counter() - start
+
+    stored = len(system.safety.alerts)
+    reduction = over / max(stored, 1)
+    print(f"   {args.children} children x {ticks:,} readings ({args.seconds}s at {args.hz:g} Hz): "
+          f"{readings:,} checks in {elapsed:.1f}s")
+    print(f"   readings over raise threshold (alerts before debouncing) {over:>10,}")
+    print(f"   alerts stored                                           {stored:>10,}")
+    print(f"   events pushed to a live subscriber                      {pushed:>10,}")
+    print(f"   store version (appends + in-place updates)              {system.safety.alerts.version:>10,}")
+
+    ok = reduction >= args.min_reduction
+    print(f"\n   reduction {reduction:,.0f}x (minimum {args.min_reduction:g}x)  ->  {'PASS' if ok else 'FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Async server connection benchmark
+Holds N keep-alive connections open against async_app.py and sends safety checks over all of them
+
+The server runs in its own process on one core; the client opens every
+connection first, then sends a request on each connection per round.
+
+Usage: python benchmarks/bench_async_connections.py [--connections 10000] [--rounds 5]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+import urllib.request
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def post(port: int, path: str, body: dict) -> dict:
+    req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=json.dumps(body).encode(),
+                                 headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read())
+
+
+def start_server(port: int) -> subprocess.Popen:
+    env = dict(os.environ, PORT=str(port), HOST='127.0.0.1', ASYNC_BACKLOG='16384')
+    cmd = [sys.executable, 'async_app.py']
+    if sys.platform.startswith('linux'):
+        cmd = ['taskset', '-c', '0'] + cmd    # pin the server to one core
+    proc = subprocess.Popen(cmd, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL)
+    for _ in range(200):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health")
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("async server did not start")
+
+
+async def open_connection(port: int, sem: asyncio.Semaphore):
+    async with sem:
+        return await asyncio.open_connection('127.0.0.1', port)
+
+
+async def request(conn, payload: bytes) -> float:
+    reader, writer = conn
+    start = time.perf_counter()
+    writer.write(payload)
+    headers = await reader.readuntil(b'\r\n\r\n')
+    length = next(int(line.split(b':')[1]) for line in headers.split(b'\r\n')
+                  if line.lower().startswith(b'content-length'))
+    await reader.readexactly(length)
+    return time.perf_counter() - start
+
+
+async def run(port: int, connections: int, rounds: int, bond_id: str):
+    body = json.dumps({'bond_id': bond_id, 'child': {'child_id': 'CHILD_BENCH', 'distance': 25.0}}).encode()
+    payload = (b"POST /safety/check HTTP/1.1\r\nHost: localhost\r\nConnection: keep-alive\r\n"
+               b"Content-Type: application/json\r\nContent-Length: " + str(len(body)).encode()
+               + b"\r\n\r\n" + body)
+
+    start = time.perf_counter()
+    sem = asyncio.Semaphore(1000)
+    opened = await asyncio.gather(*[open_connection(port, sem) for _ in range(connections)],
+                                  return_exceptions=True)
+    conns = [c for c in opened if not isinstance(c, Exception)]
+    print(f"   connections open: {len(conns):,}/{connections:,} in {time.perf_counter() - start:.1f}s")
+
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        results = await asyncio.gather(*[request(c, payload) for c in conns], return_exceptions=True)
+        errors += sum(1 for r in results if isinstance(r, Exception))
+        latencies += [r for r in results if not isinstance(r, Exception)]
+    elapsed = time.perf_counter() - start
+
+    for _, writer in conns:
+        writer.close()
+    latencies.sort()
+    if latencies:
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"   requests: {len(latencies):,}  errors: {errors}  {len(latencies) / elapsed:,.0f} req/s")
+        print(f"   latency (all connections in flight): p50 {p50:.0f} ms  p99 {p99:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, default=10_000, help='keep-alive connections')
+    parser.add_argument('--rounds', type=int, default=5, help='requests per connection')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"ASYNC SERVER BENCHMARK - {args.connections:,} keep-alive connections")
+    print("=" * 60)
+
+    port = free_port()
+    server = start_server(port)
+    try:
+        session = post(port, '/pool/register', {'owner_id': 'OWNER_BENCH', 'lat': 33.4484, 'lon': -112.0740})
+        bond = post(port, '/family/register', {'session_id': session['session_id'],
+                                               'mother_id': 'MOM_BENCH', 'child_id': 'CHILD_BENCH'})
+        asyncio.run(run(port, args.connections, args.rounds, bond['bond_id']))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Bond index benchmark
+Shows ZER01NE67.safety_check latency stays flat as the bond count grows
+
+Usage: python benchmarks/bench_bond_index.py [--max 1000000]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sovereign_quantum_system import ZER01NE67, ChildState
+
+BONDS_PER_SESSION = 1000
+
+
+def populate(system: ZER01NE67, target: int, state: dict):
+    """Grow the system to `target` bonds, reusing sessions already created"""
+    while state['bonds'] < target:
+        if state['session_id'] is None or state['in_session'] >= BONDS_PER_SESSION:
+            result = system.register_location(f"OWNER_{state['sessions']}", 33.4484, -112.0740)
+            state['session_id'] = result['session_id']
+            state['sessions'] += 1
+            state['in_session'] = 0
+        n = state['bonds']
+        bond = system.create_family_bond(state['session_id'], f"MOM_{n}", f"CHILD_{n}")
+        state['last_bond'] = bond['bond_id']
+        state['in_session'] += 1
+        state['bonds'] += 1
+
+
+def measure(system: ZER01NE67, bond_id: str, iterations: int) -> float:
+    """Mean safety_check latency in microseconds"""
+    child = ChildState(child_id="CHILD_BENCH", distance_to_pool=25.0, heart_rate=70.0)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        system.safety_check(bond_id, child)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max', type=int, default=1_000_000, help='largest bond count to test')
+    parser.add_argument('--iterations', type=int, default=2000, help='safety checks per size')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BOND INDEX BENCHMARK - safety_check latency vs bond count")
+    print("=" * 60)
+
+    system = ZER01NE67()
+    state = {'bonds': 0, 'sessions': 0, 'in_session': 0, 'session_id': None, 'last_bond': None}
+    size = 10
+    while size <= args.max:
+        populate(system, size, state)
+        latency = measure(system, state['last_bond'], args.iterations)
+        print(f"   {size:>9,} bonds  {state['sessions']:>6,} sessions  {latency:8.2f} us/check")
+        size *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Outbound dispatcher benchmark
+SOS and insurer webhook delivery against a local stub HTTP server
+
+Starts a keep-alive stub on 127.0.0.1 that answers slowly (--delay-ms) and
+fails a share of requests with 503 (--fail-rate), then:
+
+1. times check_safety calls that raise an alert with the dispatcher on and
+   off - queueing must not add measurable latency even with a slow stub;
+2. raises --alerts alerts at --rate per second and checks that every SOS
+   and every insurer event arrives exactly once per target (after retries),
+   that SOS latency p99 is within DISPATCH_SOS_SLO_MS and that each stored
+   alert is marked satelite_sos_sent.
+
+Exits non-zero on any lost event, an SLO miss at p99, or check overhead
+over --max-overhead-us.
+
+Usage: python benchmarks/bench_dispatcher.py [--alerts 500] [--rate 50] [--delay-ms 20] [--fail-rate 0.1]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sovereign_quantum_system import Config, ZER01NE67, ChildState
+from dispatcher import OutboundDispatcher
+
+DANGER = dict(distance_to_pool=1.0, moving_toward_pool=True, heart_rate=150.0)
+
+
+class Stub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay_s: float, fail_rate: float):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.delay_s = delay_s
+        self.fail_rate = fail_rate
+        self.random = random.Random(67)
+        self.lock = threading.Lock()
+        self.received = defaultdict(list)   # path -> [(monotonic, body)]
+        self.requests = 0
+        self.failed = 0
+
+    @property
+    def base(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'     # keep-alive
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        time.sleep(self.server.delay_s)
+        with self.server.lock:
+            self.server.requests += 1
+            fail = self.server.random.random() < self.server.fail_rate
+            if fail:
+                self.server.failed += 1
+            else:
+                self.server.received[self.path].append((time.monotonic(), json.loads(body)))
+        self.send_response(503 if fail else 200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def setup(bonds: int):
+    system = ZER01NE67()
+    session_id = system.register_location("OWNER_DISPATCH", 33.4484, -112.0740)['session_id']
+    ids = [system.create_family_bond(session_id, f"MOM_{i}", f"CHILD_{i}")['bond_id'] for i in range(bonds)]
+    return system, ids
+
+
+def dispatcher_for(system, stub: Stub, **options) -> OutboundDispatcher:
+    return OutboundDispatcher(
+        sos_urls=[f"{stub.base}/sos"],
+        insurer_urls=[f"{stub.base}/state-farm", f"{stub.base}/allstate"],
+        on_sos_delivered=system.safety.alerts.mark_sos_sent,
+        slo_ms=Config.DISPATCH_SOS_SLO_MS, **options)
+
+
+def raise_alerts(system, bond_ids, rate: float = 0.0):
+    """check_safety on fresh bonds in danger: every call raises (and dispatches) one alert"""
+    raised_at = {}
+    start = time.perf_counter()
+    for i, bond_id in enumerate(bond_ids):
+        if rate:
+            time.sleep(max(0.0, start + i / rate - time.perf_counter()))
+        result = system.safety.check_safety(bond_id, ChildState(child_id=f"CHILD_{i}", **DANGER))
+        raised_at[result['alert_id']] = time.monotonic()
+    return (time.perf_counter() - start) / len(bond_ids) * 1e6, raised_at
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--alerts', type=int, default=500)
+    parser.add_argument('--rate', type=float, default=50.0, help='alerts raised per second in the delivery run')
+    parser.add_argument('--delay-ms', type=float, default=20.0, help='stub response time')
+    parser.add_argument('--fail-rate', type=float, default=0.1, help='share of stub requests answered 503')
+    parser.add_argument('--max-overhead-us', type=float, default=50.0)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("OUTBOUND DISPATCHER - SOS lane + batched insurer lane vs a stub server")
+    print("=" * 60)
+
+    stub = Stub(args.delay_ms / 1000.0, args.fail_rate)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    failures = []
+
+    # 1. Request-path cost: raising checks with no dispatcher vs a slow, flaky one
+    system, bond_ids = setup(args.alerts * 2)
+    system.safety.dispatcher = None
+    off_us, _ = raise_alerts(system, bond_ids[:args.alerts])
+    system.safety.dispatcher = dispatcher_for(system, stub, backoff_s=0.02)
+    on_us, _ = raise_alerts(system, bond_ids[args.alerts:])
+    system.safety.dispatcher.close(timeout=60)
+    overhead = on_us - off_us
+    print(f"   check_safety raising an alert   off {off_us:>7.1f} us   on {on_us:>7.1f} us   "
+          f"overhead {overhead:+.1f} us")
+    if overhead > args.max_overhead_us:
+        failures.append(f"dispatcher adds {overhead:.1f} us per raising check")
+
+    # 2. Delivery: every event exactly once per target, SOS within the SLO
+    stub.received.clear()
+    system, bond_ids = setup(args.alerts)
+    dispatcher = system.safety.dispatcher = dispatcher_for(system, stub, backoff_s=0.02, linger_s=0.5)
+    _, raised_at = raise_alerts(system, bond_ids, args.rate)
+    start = time.perf_counter()
+    drained = dispatcher.flush(timeout=120)
+    elapsed = time.perf_counter() - start
+    stats = dispatcher.stats()
+
+    sos = [body['alert']['alert_id'] for _, body in stub.received['/sos']]
+    latencies = [(at - raised_at[body['alert']['alert_id']]) * 1000 for at, body in stub.received['/sos']]
+    p50, p99 = percentile(latencies, 0.5), percentile(latencies, 0.99)
+    print(f"   SOS        {len(sos):>6} delivered   p50 {p50:>7.1f} ms   p99 {p99:>7.1f} ms   "
+          f"(SLO {Config.DISPATCH_SOS_SLO_MS:.0f} ms)   retried {stats['sos']['retried']}")
+    if sorted(sos) != sorted(raised_at):
+        failures.append(f"SOS: {len(set(sos))} distinct of {len(raised_at)} alerts, {len(sos)} deliveries")
+    if p99 > Config.DISPATCH_SOS_SLO_MS:
+        failures.append(f"SOS p99 {p99:.1f} ms over the {Config.DISPATCH_SOS_SLO_MS:.0f} ms SLO")
+
+    for path in ('/state-farm', '/allstate'):
+        batches = stub.received[path]
+        events = [e['alert']['alert_id'] for _, body in batches for e in body['events']]
+        print(f"   {path[1:]:<10} {len(events):>6} events in {len(batches)} batches")
+        if sorted(events) != sorted(raised_at):
+            failures.append(f"{path}: {len(set(events))} distinct of {len(raised_at)} events, {len(events)} received")
+
+    unsent = sum(1 for alert in system.safety.alerts if not alert.satelite_sos_sent)
+    print(f"   stub requests {stub.requests} ({stub.failed} answered 503)   connections opened "
+          f"{stats['connections_opened']}, reused {stats['connections_reused']}   drained in {elapsed:.2f}s")
+    if not drained:
+        failures.append("dispatcher did not drain within 120 s")
+    if unsent:
+        failures.append(f"{unsent} stored alerts not marked satelite_sos_sent")
+    if stats['sos']['dropped'] or stats['insurer']['dropped'] or stats['sos']['failed'] or stats['insurer']['failed']:
+        failures.append(f"dropped/failed events: {stats}")
+
+    dispatcher.close()
+    stub.shutdown()
+    print(f"\n   {'PASS' if not failures else 'FAIL'}")
+    for failure in failures:
+        print(f"      {failure}")
+    sys.exit(0 if not failures else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Data feed client benchmark
+Points 16/20/43 against local fake NASA POWER, NOAA CO-OPS and USGS NWIS servers
+
+The fake servers answer after --delay-ms and can be switched to 503s. The
+client runs on a controllable clock, so TTL expiry and breaker cooldowns
+happen instantly. Checks, in order:
+
+1. cold: validate_location returns fallback values without waiting on the
+   slow upstream;
+2. single flight: --threads threads validating the same tile, plus
+   concurrent async get()s, cause one upstream request per source;
+3. fresh: the next validation carries the upstream values;
+4. stale-while-revalidate: after the TTL the old value is served at once
+   and refreshed by exactly one background request;
+5. circuit breaker: a failing upstream is called at most
+   breaker_failures times, last-known values keep being served, and one
+   trial after the cooldown closes the breaker again.
+
+Also reports validate_location latency with feeds vs static points.
+Exits non-zero if any check fails. tests/test_feeds.py runs the same checks
+(and the default sources' credentials) under pytest.
+
+Usage: python benchmarks/bench_feeds.py [--delay-ms 300] [--threads 32] [--calls 2000]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+
+from sovereign_quantum_system import EarthValidator, EarthPointCache
+from feeds import FeedClient, FeedSource, _wind_params, _tide_params, _water_table_params, \
+    parse_wind, parse_tides, parse_water_table
+
+LAT, LON = 33.4484, -112.0740
+TTL = {'wind': 3600.0, 'tides': 21600.0, 'water_table': 86400.0}
+FEED_POINTS = {'wind': (16, 'speed_mps'), 'tides': (20, 'amplitude_m'), 'water_table': (43, 'depth_ft')}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeUpstream:
+    """aiohttp app serving all three feeds; each answer's value grows with its request count"""
+
+    def __init__(self, delay_s: float):
+        self.delay_s = delay_s
+        self.failing = False
+        self.requests = Counter()
+        self.headers = {}       # source -> headers of its last request
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.port = asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+
+    async def _start(self) -> int:
+        app = web.Application()
+        app.router.add_get('/power', self._handler('wind', self.wind))
+        app.router.add_get('/tides', self._handler('tides', self.tides))
+        app.router.add_get('/gwlevels', self._handler('water_table', self.water_table))
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    def _handler(self, name, body):
+        async def handle(request):
+            self.requests[name] += 1
+            self.headers[name] = dict(request.headers)
+            n = self.requests[name]
+            await asyncio.sleep(self.delay_s)
+            if self.failing:
+                return web.Response(status=503)
+            return web.json_response(body(n))
+        return handle
+
+    @staticmethod
+    def value(name: str, n: int) -> float:
+        return {'wind': 3.0, 'tides': 0.75, 'water_table': 120.0}[name] + n
+
+    def wind(self, n):
+        return {'properties': {'parameter': {'WS10M': {'2026101700': 1.0, '2026101701': self.value('wind', n),
+                                                       '2026101702': -999.0}}}}
+
+    def tides(self, n):
+        a = self.value('tides', n)
+        return {'predictions': [{'t': '2026-10-17 03:12', 'v': f"{a:.3f}", 'type': 'H'},
+                                {'t': '2026-10-17 09:30', 'v': f"{-a:.3f}", 'type': 'L'}]}
+
+    def water_table(self, n):
+        return {'value': {'timeSeries': [{'values': [{'value': [{'value': '99.0'},
+                                                                {'value': str(self.value('water_table', n))}]}]}]}}
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.port}/{path}"
+
+
+def make_client(upstream: FakeUpstream, clock: FakeClock, failures: int, cooldown_s: float) -> FeedClient:
+    return FeedClient(
+        [FeedSource('wind', upstream.url('power'), _wind_params, parse_wind, TTL['wind']),
+         FeedSource('tides', upstream.url('tides'), _tide_params('9410230'), parse_tides, TTL['tides'],
+                    tiled=False),
+         FeedSource('water_table', upstream.url('gwlevels'), _water_table_params, parse_water_table,
+                    TTL['water_table'])],
+        breaker_failures=failures, breaker_cooldown_s=cooldown_s, clock=clock)
+
+
+def feed_points(validator: EarthValidator, lat: float = LAT, lon: float = LON):
+    """{feed: (value, state)} from one validation, and how long it took"""
+    start = time.perf_counter()
+    result = validator.validate_location(lat, lon, points=[16, 20, 43])
+    elapsed = time.perf_counter() - start
+    points = result['points']
+    return {name: (points[pid][field], points[pid]['feed']) for name, (pid, field) in FEED_POINTS.items()}, elapsed
+
+
+def latency_us(validator: EarthValidator, calls: int, tiles: int = 64):
+    """p50/p99 of full validations cycling over `tiles` tiles (cold at first)"""
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter()
+        validator.validate_location(LAT + (i % tiles) * 0.3, LON)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1e6, timings[int(0.99 * len(timings))] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--delay-ms', type=float, default=300.0, help='fake upstream response time')
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--calls', type=int, default=2000, help='validations for the latency comparison')
+    parser.add_argument('--breaker-failures', type=int, default=3)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("DATA FEEDS - cached NASA/NOAA/USGS client against fake upstreams")
+    print("=" * 60)
+
+    upstream = FakeUpstream(args.delay_ms / 1000.0)
+    clock = FakeClock()
+    cooldown_s = 30.0
+    client = make_client(upstream, clock, args.breaker_failures, cooldown_s)
+    validator = EarthValidator(cache=EarthPointCache(), feeds=client)
+    failures = []
+
+    def check(label: str, ok: bool, detail: str = ''):
+        print(f"   {label:<58} {'ok' if ok else 'FAIL'}  {detail}")
+        if not ok:
+            failures.append(f"{label} {detail}")
+
+    # 1. Cold: fallbacks, no waiting on a slow upstream
+    values, elapsed = feed_points(validator)
+    check("cold read returns fallbacks without blocking",
+          all(state == 'fallback' for _, state in values.values()) and elapsed < args.delay_ms / 1000.0 / 10,
+          f"{elapsed * 1000:.2f} ms, {values}")
+
+    # 2. Single flight: many threads on the same tile, plus concurrent async get()s
+    barrier = threading.Barrier(args.threads)
+
+    def hammer():
+        barrier.wait()
+        for _ in range(20):
+            feed_points(validator, LAT + 0.01, LON + 0.01)
+
+    threads = [threading.Thread(target=hammer) for _ in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    async def many_gets():
+        return await asyncio.gather(*(client.get('wind', LAT + 5, LON + 5) for _ in range(100)))
+
+    gets = asyncio.run(many_gets())
+    client.flush(timeout=30)
+    check("single flight: one request per source per tile",
+          dict(upstream.requests) == {'wind': 2, 'tides': 1, 'water_table': 1},
+          f"{dict(upstream.requests)} for {args.threads * 20:,} validations + 100 gets")
+    check("async get() waits for the shared fetch",
+          all(state == 'fresh' for _, state in gets), f"{gets[0]}")
+
+    # 3. Fresh values
+    values, _ = feed_points(validator)
+    expected = {name: upstream.value(name, 1) for name in FEED_POINTS}
+    check("fresh values come from upstream",
+          all(state == 'fresh' and abs(value - expected[name]) < 1e-6 for name, (value, state) in values.items()),
+          f"{values}")
+
+    # 4. Stale-while-revalidate
+    upstream.requests.clear()
+    clock.now += max(TTL.values())
+    values, elapsed = feed_points(validator)
+    stale_ok = all(state == 'stale' and abs(value - expected[name]) < 1e-6
+                   for name, (value, state) in values.items())
+    for _ in range(50):
+        feed_points(validator)
+    client.flush(timeout=30)
+    values, _ = feed_points(validator)
+    check("expired tile serves last value immediately",
+          stale_ok and elapsed < args.delay_ms / 1000.0 / 10, f"{elapsed * 1000:.2f} ms")
+    check("one background revalidation per source",
+          dict(upstream.requests) == {'wind': 1, 'tides': 1, 'water_table': 1}, f"{dict(upstream.requests)}")
+    check("revalidated values are fresh",
+          all(state == 'fresh' for _, state in values.values()), f"{values}")
+    last = {name: value for name, (value, _) in values.items()}
+
+    # 5. Circuit breaker
+    upstream.requests.clear()
+    upstream.failing = True
+    clock.now += max(TTL.values())
+    for _ in range(20):
+        feed_points(validator)
+        client.flush(timeout=30)
+    values, _ = feed_points(validator)
+    states = {name: client.breakers[name].state for name in FEED_POINTS}
+    check("failing upstream is called at most breaker_failures times",
+          all(n <= args.breaker_failures for n in upstream.requests.values()) and set(states.values()) == {'open'},
+          f"{dict(upstream.requests)} breakers {states}")
+    check("last known values served while the breaker is open",
+          all(state == 'stale' and value == last[name] for name, (value, state) in values.items()), f"{values}")
+
+    upstream.failing = False
+    upstream.requests.clear()
+    clock.now += cooldown_s
+    feed_points(validator)
+    client.flush(timeout=30)
+    values, _ = feed_points(validator)
+    check("one trial after the cooldown closes the breaker",
+          dict(upstream.requests) == {'wind': 1, 'tides': 1, 'water_table': 1}
+          and all(client.breakers[name].state == 'closed' for name in FEED_POINTS)
+          and all(state == 'fresh' for _, state in values.values()),
+          f"{dict(upstream.requests)}")
+
+    # Request-path latency, feeds on (64 tiles starting cold, slow upstream) vs static points
+    static = latency_us(EarthValidator(cache=EarthPointCache()), args.calls)
+    fed = latency_us(EarthValidator(cache=EarthPointCache(), feeds=make_client(upstream, FakeClock(), 5, 30.0)),
+                     args.calls)
+    print(f"\n   validate_location   static p50 {static[0]:>7.1f} us  p99 {static[1]:>7.1f} us   "
+          f"feeds p50 {fed[0]:>7.1f} us  p99 {fed[1]:>7.1f} us")
+    print(f"   stats {client.stats()}")
+    client.close()
+
+    print(f"\n   {'PASS' if not failures else 'FAIL'}")
+    sys.exit(0 if not failures else 1)
+
+
+if __name__ == "__main__":
+    main()
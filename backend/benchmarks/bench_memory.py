@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Memory benchmark
+Bytes per entity for the models, for dict vs columnar pools/bonds/alerts,
+and bytes per registered session (with its pool and two bonds)
+
+Usage: python benchmarks/bench_memory.py [--count 100000] [--sessions 10000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from dataclasses import make_dataclass, fields
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sovereign_quantum_system import (
+    ChildState, SafetyAlert, ColumnarTable, AlertColumns, POOL_SCHEMA, BOND_SCHEMA,
+    ZER01NE67, MemoryStateStore, EarthValidator, EarthResultStore
+)
+
+
+def bytes_per(build, count: int) -> float:
+    """Traced allocation per entity for whatever build(count) keeps alive"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / count
+
+
+def unslotted(cls):
+    """Same fields as cls, but a regular dataclass with a per-instance __dict__"""
+    return make_dataclass(cls.__name__ + 'Dict', [(f.name, f.type, f) for f in fields(cls)])
+
+
+def pool_record(n: int) -> dict:
+    return {'pool_id': f"{n:016x}", 'owner_id': f"OWNER_{n % 1000}", 'lat': 33.4484 + n * 1e-6,
+            'lon': -112.0740, 'depth_m': 1.2, 'created': time.time_ns()}
+
+
+def bond_record(n: int) -> dict:
+    return {'bond_id': f"{n:016x}", 'mother_id': f"MOM_{n % 5000}", 'child_id': f"CHILD_{n % 5000}",
+            'pool_id': f"{n % 1000:016x}", 'created': time.time_ns(), 'handshakes': 0}
+
+
+def alert(n: int, cls=SafetyAlert):
+    return cls(alert_id=f"{n:016x}", child_id=f"CHILD_{n % 5000}", pool_id=f"{n % 1000:016x}",
+               danger_probability=0.9, triggered=True, satelite_sos_sent=True)
+
+
+def build_dict_table(record):
+    def build(count):
+        return {r[next(iter(r))]: r for r in (record(n) for n in range(count))}
+    return build
+
+
+def build_columnar_table(record, key, schema):
+    def build(count):
+        table = ColumnarTable(key, schema)
+        for n in range(count):
+            r = record(n)
+            table[r[key]] = r
+        return table
+    return build
+
+
+def build_alert_list(count):
+    return [alert(n) for n in range(count)]
+
+
+def build_alert_columns(count):
+    columns = AlertColumns()
+    for n in range(count):
+        columns.append(alert(n))
+    return columns
+
+
+def build_sessions(columnar: bool, keep_results: bool):
+    """Register sessions at distinct locations, two bonds each
+
+    keep_results=True retains every full 47-point result, as sessions
+    used to; False keeps only the compact summary.
+    """
+    def build(count):
+        store = MemoryStateStore(columnar)
+        store.earth_results = EarthResultStore(max_entries=count if keep_results else 0)
+        system = ZER01NE67(store=store)
+        system.earth = EarthValidator()     # no point cache: measure sessions, not cells
+        for n in range(count):
+            session = system.register_location(f"OWNER_{n}", 33.0 + n * 1e-3, -112.0740)
+            for b in range(2):
+                system.create_family_bond(session['session_id'], f"MOM_{n}", f"CHILD_{n}_{b}")
+        system.revalidator.stop()
+        return system
+    return build
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=100_000, help='entities per measurement')
+    parser.add_argument('--sessions', type=int, default=10_000, help='sessions per measurement')
+    args = parser.parse_args()
+    n = args.count
+
+    print("=" * 60)
+    print(f"MEMORY BENCHMARK - bytes per entity ({n:,} entities)")
+    print("=" * 60)
+
+    ChildDict = unslotted(ChildState)
+    AlertDict = unslotted(SafetyAlert)
+    rows = [
+        ("ChildState", lambda c: [ChildDict(child_id=f"CHILD_{i}") for i in range(c)],
+         lambda c: [ChildState(child_id=f"CHILD_{i}") for i in range(c)]),
+        ("SafetyAlert", lambda c: [alert(i, AlertDict) for i in range(c)],
+         lambda c: [alert(i) for i in range(c)]),
+        ("pools", build_dict_table(pool_record),
+         build_columnar_table(pool_record, 'pool_id', POOL_SCHEMA)),
+        ("bonds", build_dict_table(bond_record),
+         build_columnar_table(bond_record, 'bond_id', BOND_SCHEMA)),
+        ("alerts", build_alert_list, build_alert_columns),
+    ]
+
+    print(f"   {'entity':<14}{'before':>10}{'after':>10}{'saved':>8}")
+    for name, before, after in rows:
+        b = bytes_per(before, n)
+        a = bytes_per(after, n)
+        print(f"   {name:<14}{b:>10.0f}{a:>10.0f}{(1 - a / b):>8.0%}")
+
+    print(f"\n   per session incl. pool + 2 bonds ({args.sessions:,} sessions)")
+    full = bytes_per(build_sessions(False, True), args.sessions)
+    print(f"   {'full result kept':<28}{full:>10.0f}")
+    for label, columnar in (("summary only (dict)", False), ("summary only (columnar)", True)):
+        compact = bytes_per(build_sessions(columnar, False), args.sessions)
+        print(f"   {label:<28}{compact:>10.0f}{(1 - compact / full):>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Metrics overhead benchmark
+Cost of /metrics instrumentation on the /safety/check path, with recording on vs off
+
+Alternates rounds with metrics.ENABLED on and off so drift affects both
+equally, and compares the best round of each. Measured end to end through
+the Flask test client and, for reference, on ZER01NE67.safety_check alone.
+Exits non-zero if the request overhead is over --budget percent.
+
+Usage: python benchmarks/bench_metrics_overhead.py [--requests 5000] [--rounds 7] [--budget 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+from sovereign_quantum_system import ZER01NE67, ChildState, create_app
+
+
+def best_of(fn, n: int, rounds: int):
+    """Best per-call time in microseconds with metrics on and with metrics off"""
+    best = {True: float('inf'), False: float('inf')}
+    for _ in range(rounds):
+        for enabled in (True, False):
+            metrics.enable(enabled)
+            start = time.perf_counter()
+            for _ in range(n):
+                fn()
+            best[enabled] = min(best[enabled], (time.perf_counter() - start) / n * 1e6)
+    metrics.enable(True)
+    return best[True], best[False]
+
+
+def report(label: str, on: float, off: float) -> float:
+    overhead = (on - off) / off * 100
+    print(f"   {label:<28} off {off:>8.2f} us   on {on:>8.2f} us   overhead {on - off:>+6.2f} us ({overhead:+.1f}%)")
+    return overhead
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000, help='requests per round')
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--budget', type=float, default=3.0, help='allowed request overhead in percent')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("METRICS OVERHEAD - /safety/check with recording on vs off")
+    print("=" * 60)
+
+    system = ZER01NE67()
+    session_id = system.register_location("OWNER_BENCH", 33.4484, -112.0740)['session_id']
+    bond_id = system.create_family_bond(session_id, "MOM_BENCH", "CHILD_BENCH")['bond_id']
+    client = create_app(system).test_client()
+    body = {'bond_id': bond_id, 'child': {'child_id': 'CHILD_BENCH', 'distance': 25.0, 'heart_rate': 70.0}}
+    child = ChildState(child_id="CHILD_BENCH", distance_to_pool=25.0, heart_rate=70.0)
+
+    request_overhead = report('POST /safety/check', *best_of(
+        lambda: client.post('/safety/check', json=body), args.requests, args.rounds))
+    report('ZER01NE67.safety_check', *best_of(
+        lambda: system.safety_check(bond_id, child), args.requests * 20, args.rounds))
+
+    ok = request_overhead <= args.budget
+    print(f"\n   request overhead {request_overhead:+.1f}% (budget {args.budget:g}%)  ->  {'PASS' if ok else 'FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Pool spatial index benchmark
+Radius and nearest-k query latency over PoolSpatialIndex at up to 1M pools
+
+Usage: python benchmarks/bench_pool_index.py [--pools 1000000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sovereign_quantum_system import Config, ChildSafetyAPI, ChildState
+
+# Continental US bounding box
+LAT_RANGE = (25.0, 49.0)
+LON_RANGE = (-124.0, -67.0)
+
+
+def timed(fn, queries) -> float:
+    """Mean latency of fn(lat, lon) in microseconds"""
+    start = time.perf_counter()
+    for lat, lon in queries:
+        fn(lat, lon)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pools', type=int, default=1_000_000, help='pools to index')
+    parser.add_argument('--queries', type=int, default=2000, help='queries per measurement')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("POOL INDEX BENCHMARK - spatial queries vs pool count")
+    print("=" * 60)
+
+    rng = random.Random(67)
+    api = ChildSafetyAPI()
+    start = time.perf_counter()
+    for n in range(args.pools):
+        api.register_pool(f"OWNER_{n}", rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE), 1.2)
+    print(f"   registered {args.pools:,} pools in {time.perf_counter() - start:.1f} s")
+
+    queries = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(args.queries)]
+    index = api.pool_index
+
+    radius = Config.POOL_ALARM_RADIUS_M
+    cases = [
+        (f"within {radius:.0f} m", lambda a, b: index.within(a, b, radius)),
+        ("within 100 m", lambda a, b: index.within(a, b, 100.0)),
+        ("nearest k=1", lambda a, b: index.nearest(a, b, 1)),
+        ("nearest k=10", lambda a, b: index.nearest(a, b, 10)),
+    ]
+    for label, fn in cases:
+        print(f"   {label:<24}{timed(fn, queries):9.1f} us/query")
+
+    # Server-side distance inside check_safety
+    pool_id = next(iter(api.pools))
+    bond_id = api.create_bond("MOM_BENCH", "CHILD_BENCH", pool_id)
+    pool = api.pools[pool_id]
+    child = ChildState("CHILD_BENCH", lat=pool['lat'] + 0.0001, lon=pool['lon'], heart_rate=70.0)
+    start = time.perf_counter()
+    for _ in range(args.queries):
+        api.check_safety(bond_id, child)
+    print(f"   {'check_safety (lat/lon)':<24}{(time.perf_counter() - start) / args.queries * 1e6:9.1f} us/check")
+
+
+if __name__ == "__main__":
+    main()
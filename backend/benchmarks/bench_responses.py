@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Response encoding benchmark
+Requests/s and bytes/s for the largest endpoints: stdlib json vs orjson, identity vs gzip vs deflate
+
+Runs the Flask app in-process through its test client, so the numbers are
+the server's own cost per response (routing, encoding, compression) with no
+socket in between. Payload MB/s counts uncompressed JSON; wire bytes are what
+would go on the network.
+
+Usage: python benchmarks/bench_responses.py [--alerts 5000] [--batch 200] [--seconds 2]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import responses
+import sovereign_quantum_system as sq
+from sovereign_quantum_system import ZER01NE67, ChildState, HOME_RESPONSE
+
+
+def setup(alerts: int):
+    """A system with `alerts` alerts spread over 50 children"""
+    system = ZER01NE67()
+    session_id = system.register_location("OWNER_BENCH", 33.4484, -112.0740)['session_id']
+    bonds = [system.create_family_bond(session_id, f"MOM_{i}", f"CHILD_{i}")['bond_id'] for i in range(50)]
+    for i in range(alerts):
+        child = ChildState(child_id=f"CHILD_{i % 50}", distance_to_pool=1.0, moving_toward_pool=True, heart_rate=150.0)
+        system.safety_check(bonds[i % 50], child)
+    return system
+
+
+def measure(client, method: str, path: str, body, accept: str, seconds: float):
+    """(requests/s, payload bytes, wire bytes) for one endpoint"""
+    headers = {'Accept-Encoding': accept} if accept else {}
+    call = getattr(client, method)
+    kwargs = {'json': body} if body is not None else {}
+    first = call(path, headers=headers, **kwargs)
+    assert first.status_code == 200, (path, first.status_code)
+    wire = len(first.data)
+    payload = len(call(path, **kwargs).data)
+
+    n, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        call(path, headers=headers, **kwargs)
+        n += 1
+    return n / (time.perf_counter() - start), payload, wire
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--alerts', type=int, default=5000, help='alerts in the store')
+    parser.add_argument('--batch', type=int, default=200, help='points per /earth/validate/batch')
+    parser.add_argument('--seconds', type=float, default=2.0, help='time per measurement')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("RESPONSE ENCODING BENCHMARK")
+    print("=" * 60)
+    print(f"   orjson installed: {responses.HAS_ORJSON}  "
+          f"compress >= {sq.Config.RESPONSE_COMPRESS_MIN_BYTES} B at level {sq.Config.RESPONSE_COMPRESS_LEVEL}")
+
+    client = sq.create_app(setup(args.alerts)).test_client()
+    lats = [33.0 + i * 0.01 for i in range(args.batch)]
+    lons = [-112.0 - i * 0.01 for i in range(args.batch)]
+    endpoints = [
+        ('GET /alerts?limit=1000', 'get', '/alerts?limit=1000', None),
+        ('POST /earth/validate', 'post', '/earth/validate', {'lat': 33.4484, 'lon': -112.0740}),
+        (f'POST /earth/validate/batch x{args.batch}', 'post', '/earth/validate/batch', {'lats': lats, 'lons': lons}),
+        ('GET /stats', 'get', '/stats', None),
+    ]
+    encoders = ['stdlib', 'orjson'] if responses.HAS_ORJSON else ['stdlib']
+
+    for label, method, path, body in endpoints:
+        print(f"\n   {label}")
+        print(f"   {'encoder':<8} {'encoding':<9} {'req/s':>8} {'payload MB/s':>13} {'wire B':>9} {'wire MB/s':>10}")
+        for name in encoders:
+            responses.use_encoder(name)
+            for accept in (None, 'gzip', 'deflate'):
+                rate, payload, wire = measure(client, method, path, body, accept, args.seconds)
+                print(f"   {name:<8} {accept or 'identity':<9} {rate:>8,.0f} {rate * payload / 1e6:>13.1f} "
+                      f"{wire:>9,} {rate * wire / 1e6:>10.2f}")
+    responses.use_encoder(sq.Config.JSON_ENCODER)
+
+    # Constant bodies: encode per request vs serve the precomputed bytes
+    payload = responses.loads(HOME_RESPONSE.body)
+    min_bytes = sq.Config.RESPONSE_COMPRESS_MIN_BYTES
+    print("\n   GET / body")
+    for label, fn in [('json.dumps per request', lambda: json.dumps(payload).encode()),
+                      ('responses.dumps per request', lambda: responses.dumps(payload)),
+                      ('precomputed', lambda: HOME_RESPONSE.select('gzip, deflate', min_bytes))]:
+        per_call = min(timeit.repeat(fn, number=100_000, repeat=3)) / 100_000
+        print(f"   {label:<28} {per_call * 1e6:>6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Retention benchmark
+Steady memory under session churn: idle TTLs, alert history limit and memory budget
+
+Simulates --rounds minutes of traffic. Every minute --sessions new families
+register (two bonds each) and the families of the last few minutes send a
+dangerous reading per bond, raising alerts; then the retention sweep runs
+on the simulated clock with --ttl-s idle TTLs. Checks, for dict and
+columnar stores:
+
+1. sessions, bonds, pools and alerts stay bounded (TTL / ALERT_MAX_HISTORY);
+2. traced memory stops growing once the churn reaches steady state;
+3. a cursor taken in the first minute still pages from the oldest alert
+   held, and per-child queries only return held alerts;
+4. the bond index, pool index, alert indexes and stored Earth results
+   match the entities left after every sweep;
+5. with MEMORY_BUDGET_MB set below the current usage, one sweep brings the
+   estimate under the budget (no tolerance) and the indexes stay consistent.
+
+Exits non-zero if any check fails.
+
+Usage: python benchmarks/bench_retention.py [--rounds 30] [--sessions 300] [--ttl-s 150] [--max-alerts 2000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sovereign_quantum_system import ZER01NE67, MemoryStateStore, ChildState
+
+DANGER = dict(distance_to_pool=1.0, moving_toward_pool=True, heart_rate=150.0)
+ROUND_S = 60.0
+LOCATIONS = 200     # distinct pool sites, so the Earth point cache stays warm
+CHILDREN = 2000     # child ids are reused, so telemetry stays at its steady size
+
+
+def inconsistencies(system) -> list:
+    """Index entries pointing at missing entities, and entities missing from their indexes"""
+    problems = []
+    sessions, pools, bonds = system.sessions, system.safety.pools, system.safety.bonds
+    for bond_id, (session_id, pool_id) in list(system.bond_index.items()):
+        if bond_id not in bonds or session_id not in sessions or pool_id not in pools:
+            problems.append(f"bond index entry {bond_id} -> missing bond/session/pool")
+    if len(bonds) != len(system.bond_index):
+        problems.append(f"{len(bonds)} bonds vs {len(system.bond_index)} indexed")
+    for session_id in list(sessions):
+        if sessions[session_id]['pool_id'] not in pools:
+            problems.append(f"session {session_id} -> missing pool")
+    if len(pools) != len(system.safety.pool_index):
+        problems.append(f"{len(pools)} pools vs {len(system.safety.pool_index)} in the spatial index")
+    if system.store.earth_results.stats()['entries'] > len(sessions):
+        problems.append("Earth results kept for removed sessions")
+
+    alerts = system.safety.alerts
+    for alert_id, position in list(alerts._by_id.items()):
+        if position < alerts.base or alerts[position].alert_id != alert_id:
+            problems.append(f"alert id index {alert_id} -> {position} (base {alerts.base})")
+    if len(alerts._by_id) != len(alerts):
+        problems.append(f"{len(alerts._by_id)} alert ids indexed for {len(alerts)} alerts")
+    for index, field in ((alerts._by_child, 'child_id'), (alerts._by_pool, 'pool_id')):
+        for value, (positions, _) in list(index.items()):
+            if positions[0] < alerts.base or getattr(alerts[positions[-1]], field) != value:
+                problems.append(f"{field} index {value} -> evicted or wrong alerts")
+    return problems[:5]
+
+
+def run(columnar: bool, args) -> list:
+    failures = []
+    store = MemoryStateStore(columnar)
+    store.alerts.max_history = args.max_alerts
+    system = ZER01NE67(store)
+    retention = system.retention
+    retention.session_ttl_s = retention.bond_ttl_s = args.ttl_s
+    layout = 'columnar' if columnar else 'dict'
+
+    start_now = time.time()
+    active = []         # bond ids of the last two rounds
+    cursor = None
+    peaks = {'sessions': 0, 'bonds': 0, 'alerts': 0}
+    steady_round = int(args.ttl_s // ROUND_S) + 3
+    steady_bytes = None
+    sweep_ms = []
+    n = 0
+    tracemalloc.start()
+    for round_ in range(args.rounds):
+        now = start_now + round_ * ROUND_S
+        bond_ids = []
+        for _ in range(args.sessions):
+            site = n % LOCATIONS
+            session_id = system.register_location(f"OWNER_{n}", 33.40 + site * 0.001, -112.07)['session_id']
+            for k in range(2):
+                bond_ids.append(system.create_family_bond(session_id, f"MOM_{n}",
+                                                          f"CHILD_{(2 * n + k) % CHILDREN}")['bond_id'])
+            n += 1
+        active = active[-1:] + [bond_ids]
+        for recent in active:
+            for bond_id in recent:
+                system.safety_check(bond_id, ChildState(child_id=system.safety.bonds[bond_id]['child_id'], **DANGER))
+        if cursor is None:
+            cursor = system.safety.alerts.end - 1
+
+        began = time.perf_counter()
+        retention.sweep(now)
+        sweep_ms.append((time.perf_counter() - began) * 1000)
+        problems = inconsistencies(system)
+        if problems:
+            failures.append(f"{layout} round {round_}: {problems}")
+            break
+        peaks = {'sessions': max(peaks['sessions'], len(system.sessions)),
+                 'bonds': max(peaks['bonds'], len(system.safety.bonds)),
+                 'alerts': max(peaks['alerts'], len(system.safety.alerts))}
+        if round_ == steady_round:
+            steady_bytes = tracemalloc.get_traced_memory()[0]
+    final_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # 1. Bounded entity counts
+    live_rounds = 2 + int(args.ttl_s // ROUND_S)     # checked for two rounds, then idle for the TTL
+    max_sessions = args.sessions * live_rounds
+    max_alerts = args.max_alerts + (args.max_alerts >> 3) + 1
+    print(f"   {layout:<8} {n:>7,} sessions registered   peak held: {peaks['sessions']:,} sessions, "
+          f"{peaks['bonds']:,} bonds, {peaks['alerts']:,} alerts")
+    if peaks['sessions'] > max_sessions or peaks['bonds'] > 2 * max_sessions:
+        failures.append(f"{layout}: {peaks} exceeds {max_sessions} sessions ({args.ttl_s:.0f} s TTL)")
+    if peaks['alerts'] > max_alerts:
+        failures.append(f"{layout}: {peaks['alerts']} alerts held, limit {max_alerts}")
+
+    # 2. Steady memory
+    if steady_bytes is not None:
+        growth = (final_bytes - steady_bytes) / steady_bytes
+        print(f"   {layout:<8} traced memory {steady_bytes / 2**20:.1f} MB at round {steady_round} -> "
+              f"{final_bytes / 2**20:.1f} MB at round {args.rounds}  ({growth:+.1%})   "
+              f"sweep median {sorted(sweep_ms)[len(sweep_ms) // 2]:.1f} ms")
+        if growth > args.max_growth:
+            failures.append(f"{layout}: memory grew {growth:.1%} in steady state")
+
+    # 3. Cursors survive eviction
+    alerts = system.safety.alerts
+    page, next_cursor = alerts.query(cursor=cursor, limit=10)
+    if not page or alerts.position(page[0].alert_id) != alerts.base or next_cursor != alerts.base + len(page):
+        failures.append(f"{layout}: cursor {cursor} after eviction returned {len(page)} alerts, next {next_cursor}")
+    child_page, _ = alerts.query(child_id='CHILD_1', limit=100)
+    if any(alerts.position(alert.alert_id) is None for alert in child_page):
+        failures.append(f"{layout}: per-child query returned evicted alerts")
+
+    # 5. Memory budget
+    before = retention.stats()['total_bytes']
+    retention.budget_mb = before / 2 / 2**20
+    retention.sweep(start_now + args.rounds * ROUND_S)
+    after = retention.stats()
+    print(f"   {layout:<8} budget {retention.budget_mb:.2f} MB: {before / 2**20:.2f} -> "
+          f"{after['total_bytes'] / 2**20:.2f} MB   evicted {after['evictions']}")
+    if after['total_bytes'] > retention.budget_mb * 2**20:
+        failures.append(f"{layout}: {after['total_bytes']} bytes left over a {retention.budget_mb:.2f} MB budget")
+    problems = inconsistencies(system)
+    if problems:
+        failures.append(f"{layout} after budget eviction: {problems}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=30, help='simulated minutes')
+    parser.add_argument('--sessions', type=int, default=300, help='new sessions per minute')
+    parser.add_argument('--ttl-s', type=float, default=150.0, help='session and bond idle TTL')
+    parser.add_argument('--max-alerts', type=int, default=2000, help='ALERT_MAX_HISTORY')
+    parser.add_argument('--max-growth', type=float, default=0.10, help='allowed steady-state memory growth')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("RETENTION - idle TTLs, alert history limit and memory budget")
+    print("=" * 60)
+
+    failures = run(False, args) + run(True, args)
+    print(f"\n   {'PASS' if not failures else 'FAIL'}")
+    for failure in failures:
+        print(f"      {failure}")
+    sys.exit(0 if not failures else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Shard scaling benchmark
+Shows safety-check throughput growing with the number of shard processes
+
+Each run starts N shards, creates bonds through a router, then drives them
+from N client processes (each with its own router) for a fixed time.
+Scaling flattens once shards + clients exceed the available cores.
+
+Usage: python benchmarks/bench_shard_scaling.py [--shards 1,2,4] [--seconds 3] [--batch 64]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sharding import ShardCluster, ShardRouter
+
+BONDS_PER_SHARD = 200
+
+
+def drive(addresses, authkey, bond_ids, seconds, batch, counts):
+    """Client process: hammer the router with safety checks until time runs out"""
+    from sovereign_quantum_system import ChildState
+
+    router = ShardRouter(addresses, authkey)
+    rng = random.Random(os.getpid())
+    child = ChildState(child_id="CHILD_BENCH", distance_to_pool=25.0, heart_rate=70.0)
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if batch > 1:
+            ids = rng.choices(bond_ids, k=batch)
+            router.safety_check_batch(ids, ["CHILD_BENCH"] * batch, [25.0] * batch,
+                                      [False] * batch, [70.0] * batch)
+            done += batch
+        else:
+            router.safety_check(rng.choice(bond_ids), child)
+            done += 1
+    counts.put(done)
+
+
+def run(shards: int, seconds: float, batch: int) -> float:
+    """Checks per second with `shards` shards and as many client processes"""
+    ctx = multiprocessing.get_context('spawn')
+    with ShardCluster(shards) as cluster:
+        router = cluster.router()
+        bond_ids = []
+        for s in range(shards * 4):
+            session = router.register_location(f"OWNER_{s}", 33.4484 + s * 0.001, -112.0740)
+            for b in range(BONDS_PER_SHARD // 4):
+                bond = router.create_family_bond(session['session_id'], f"MOM_{s}_{b}", f"CHILD_{s}_{b}")
+                bond_ids.append(bond['bond_id'])
+
+        counts = ctx.Queue()
+        clients = [ctx.Process(target=drive, args=(cluster.addresses, cluster.authkey,
+                                                   bond_ids, seconds, batch, counts))
+                   for _ in range(shards)]
+        for proc in clients:
+            proc.start()
+        total = sum(counts.get() for _ in clients)
+        for proc in clients:
+            proc.join()
+    return total / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    cores = os.cpu_count() or 1
+    default = ','.join(str(n) for n in (1, 2, 4, 8, 16) if n <= max(1, cores // 2)) or '1'
+    parser.add_argument('--shards', default=default, help='comma-separated shard counts')
+    parser.add_argument('--seconds', type=float, default=3.0, help='load duration per run')
+    parser.add_argument('--batch', type=int, default=1, help='bonds per request (1 = /safety/check)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"SHARD SCALING BENCHMARK - {cores} cores, batch={args.batch}")
+    print("=" * 60)
+
+    base = None
+    for shards in (int(n) for n in args.shards.split(',')):
+        rate = run(shards, args.seconds, args.batch)
+        base = base or rate
+        print(f"{shards:>4} shards  {rate:>12,.0f} checks/s   x{rate / base:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Microbenchmark suite
+Times the core hot paths, writes JSON results, and fails on regressions against a stored baseline
+
+Covers EarthValidator.validate_location (cold and cached), each of the 47
+pNN_* points, ChildSafetyAPI.check_safety, ZER01NE67.safety_check at
+several bond counts, get_alerts/query_alerts at several history sizes,
+and one Flask test-client request per API route.
+
+Each benchmark is calibrated to a loop count that runs for at least
+--min-time seconds, then repeated; min and median per-call times are kept.
+`compare` checks a current run (a results file, or a fresh run) against a
+baseline and exits non-zero when any benchmark is slower by more than
+--threshold percent.
+
+Usage:
+    python benchmarks/bench_suite.py run [-o results.json] [-k filter] [--quick]
+    python benchmarks/bench_suite.py compare baseline.json [current.json] [--threshold 10] [--floor-us 0.2]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+import responses
+from sovereign_quantum_system import (ZER01NE67, ChildState, SafetyAlert, EarthValidator,
+                                      EarthPointCache, POINT_REGISTRY, create_app)
+
+LAT, LON, ALT = 33.4484, -112.0740, 300.0
+SAFE_CHILD = dict(distance_to_pool=25.0, moving_toward_pool=False, heart_rate=70.0)
+
+
+# ============================================
+# TIMING
+# ============================================
+
+def time_call(fn, min_time: float, repeats: int) -> dict:
+    """Per-call time of fn() in microseconds: min and median over `repeats` timed loops"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+
+    samples = [elapsed / loops]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return {
+        'min_us': round(min(samples) * 1e6, 4),
+        'median_us': round(statistics.median(samples) * 1e6, 4),
+        'loops': loops,
+        'repeats': repeats
+    }
+
+
+# ============================================
+# BENCHMARKS
+# ============================================
+# Each generator yields (name, fn) pairs; setup happens before the yield.
+
+def populate(system: ZER01NE67, start: int, end: int, session_id: str = None, per_session: int = 1000):
+    """Add bonds start..end-1, a new session every per_session bonds; returns (session_id, last bond_id)"""
+    bond_id = None
+    for n in range(start, end):
+        if n % per_session == 0:
+            session_id = system.register_location(f"OWNER_{n}", LAT, LON)['session_id']
+        bond_id = system.create_family_bond(session_id, f"MOM_{n}", f"CHILD_{n}")['bond_id']
+    return session_id, bond_id
+
+
+def earth_benchmarks(sizes):
+    cold = EarthValidator()
+    yield 'earth.validate_location[cold]', lambda: cold.validate_location(LAT, LON, ALT)
+    cached = EarthValidator(cache=EarthPointCache())
+    yield 'earth.validate_location[cached]', lambda: cached.validate_location(LAT, LON, ALT)
+    yield 'earth.validate_location[summary]', lambda: cold.validate_location(LAT, LON, ALT, summary_only=True)
+    for spec in POINT_REGISTRY.values():
+        method = getattr(cold, spec.method)
+        args = spec.args(LAT, LON, ALT)
+        yield f"earth.{spec.method}", lambda method=method, args=args: method(*args)
+
+
+def safety_benchmarks(sizes):
+    system = ZER01NE67()
+    _, bond_id = populate(system, 0, 1)
+    child = ChildState(child_id="CHILD_0", **SAFE_CHILD)
+    yield 'safety.check_safety', lambda: system.safety.check_safety(bond_id, child)
+
+    system, built, session_id = ZER01NE67(), 0, None
+    for size in sizes:
+        session_id, bond_id = populate(system, built, size, session_id)
+        built = size
+        child = ChildState(child_id=f"CHILD_{size - 1}", **SAFE_CHILD)
+        yield f"system.safety_check[bonds={size}]", lambda bond_id=bond_id, child=child: system.safety_check(bond_id, child)
+
+
+def alert_benchmarks(sizes):
+    system, built = ZER01NE67(), 0
+    safety = system.safety
+    for size in sizes:
+        safety.alerts.extend(
+            SafetyAlert(alert_id=f"A{n}", child_id=f"CHILD_{n % 100}", pool_id=f"POOL_{n % 10}",
+                        danger_probability=0.9, timestamp=n, triggered=True, satelite_sos_sent=False)
+            for n in range(built, size))
+        built = size
+        yield f"alerts.get_alerts[history={size}]", safety.get_alerts
+        yield f"alerts.query_alerts[history={size},limit=100]", lambda: safety.query_alerts(limit=100)
+        yield (f"alerts.query_alerts[history={size},child]",
+               lambda: safety.query_alerts(child_id="CHILD_7", limit=100))
+
+
+def route_benchmarks(sizes):
+    system = ZER01NE67()
+    client = create_app(system).test_client()
+    session_id = system.register_location("OWNER_ROUTES", LAT, LON)['session_id']
+    bond_id = system.create_family_bond(session_id, "MOM_ROUTES", "CHILD_ROUTES")['bond_id']
+    for _ in range(1000):
+        system.safety_check(bond_id, ChildState(child_id="CHILD_ROUTES", distance_to_pool=1.0,
+                                                moving_toward_pool=True, heart_rate=150.0))
+    child = {'child_id': 'CHILD_ROUTES', 'distance': 25.0, 'heart_rate': 70.0}
+    batch = {'bond_ids': [bond_id] * 50, 'child_ids': ['CHILD_ROUTES'] * 50,
+             'distances': [25.0] * 50, 'moving_toward': [False] * 50, 'heart_rates': [70.0] * 50}
+
+    def request(method, path, body=None, status=(200, 201)):
+        def call():
+            response = getattr(client, method)(path, json=body) if body is not None else getattr(client, method)(path)
+            assert response.status_code in status, (path, response.status_code, response.data[:200])
+        return call
+
+    yield 'route.GET /', request('get', '/')
+    yield 'route.GET /health', request('get', '/health')
+    yield 'route.GET /stats', request('get', '/stats')
+    yield 'route.POST /safety/check', request('post', '/safety/check', {'bond_id': bond_id, 'child': child})
+    yield 'route.POST /safety/check/batch', request('post', '/safety/check/batch', batch)
+    yield 'route.GET /pools/nearby', request('get', f'/pools/nearby?lat={LAT}&lon={LON}')
+    yield 'route.GET /alerts', request('get', '/alerts?limit=100')
+    yield 'route.POST /earth/validate', request('post', '/earth/validate', {'lat': LAT, 'lon': LON})
+    yield 'route.GET /session/<id>/earth', request('get', f'/session/{session_id}/earth')
+    yield 'route.GET /earth/points', request('get', '/earth/points')
+    yield 'route.POST /earth/validate/batch', request('post', '/earth/validate/batch',
+                                                      {'lats': [LAT] * 50, 'lons': [LON] * 50})
+    yield 'route.POST /api-key/generate', request('post', '/api-key/generate',
+                                                  {'org_name': 'Bench', 'contact_email': 'b@example.com',
+                                                   'use_case': 'benchmark'})
+    # Registration grows the state the routes above read, so it runs last
+    yield 'route.POST /pool/register', request('post', '/pool/register',
+                                               {'owner_id': 'OWNER_BENCH', 'lat': LAT, 'lon': LON})
+    yield 'route.POST /family/register', request('post', '/family/register',
+                                                 {'session_id': session_id, 'mother_id': 'MOM_B', 'child_id': 'CHILD_B'})
+
+
+SUITES = {
+    'earth': earth_benchmarks,
+    'safety': safety_benchmarks,
+    'alerts': alert_benchmarks,
+    'route': route_benchmarks,
+}
+
+SIZES = {'full': [10, 1000, 10_000, 100_000], 'quick': [10, 1000, 10_000]}
+
+
+# ============================================
+# RUN / COMPARE
+# ============================================
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    sizes = SIZES['quick' if args.quick else 'full']
+    min_time = args.min_time or (0.02 if args.quick else 0.1)
+    repeats = args.repeats or (3 if args.quick else 5)
+    results = {}
+    for suite, generate in SUITES.items():
+        if args.suite and suite not in args.suite:
+            continue
+        for name, fn in generate(sizes):
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = time_call(fn, min_time, repeats)
+            print(f"   {name:<52} {results[name]['min_us']:>12,.2f} us  (median {results[name]['median_us']:,.2f})")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'json_encoder': responses.encoder(),
+            'quick': args.quick,
+            'min_time_s': min_time,
+            'repeats': repeats
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n   wrote {len(results)} results to {args.output}")
+    return report
+
+
+def compare(baseline: dict, current: dict, threshold: float, metric: str, floor_us: float) -> bool:
+    """Print the change per benchmark; False if any regressed more than threshold percent
+
+    A slowdown of less than floor_us is never a regression, so timer noise on
+    sub-microsecond benchmarks cannot fail the gate.
+    """
+    regressions, missing = [], []
+    print(f"   {'benchmark':<52} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, base in baseline['results'].items():
+        if name not in current['results']:
+            missing.append(name)
+            continue
+        before, after = base[f'{metric}_us'], current['results'][name][f'{metric}_us']
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ''
+        if change > threshold and after - before > floor_us:
+            regressions.append(name)
+            flag = '  REGRESSED'
+        print(f"   {name:<52} {before:>10,.2f}us {after:>10,.2f}us {change:>+7.1f}%{flag}")
+
+    print(f"\n   {len(baseline['results']) - len(missing)} compared on {metric}_us, "
+          f"threshold +{threshold:g}% and +{floor_us:g} us: "
+          f"{len(regressions)} regressed, {len(missing)} missing from current run")
+    for name in regressions:
+        print(f"      regressed: {name}")
+    return not regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def add_run_options(p):
+        p.add_argument('-k', '--filter', help='only benchmarks whose name contains this')
+        p.add_argument('--suite', action='append', choices=list(SUITES), help='only these suites (repeatable)')
+        p.add_argument('--quick', action='store_true', help='smaller sizes and shorter timings')
+        p.add_argument('--min-time', type=float, default=None, help='seconds per timed loop')
+        p.add_argument('--repeats', type=int, default=None, help='timed loops per benchmark')
+
+    run_parser = sub.add_parser('run', help='run the suite and write JSON results')
+    run_parser.add_argument('-o', '--output', default='bench_results.json', help='results file')
+    add_run_options(run_parser)
+
+    compare_parser = sub.add_parser('compare', help='fail if a run regressed against a baseline')
+    compare_parser.add_argument('baseline', help='baseline results file')
+    compare_parser.add_argument('current', nargs='?', help='results file (default: run the suite now)')
+    compare_parser.add_argument('--threshold', type=float, default=10.0, help='allowed slowdown in percent')
+    compare_parser.add_argument('--floor-us', type=float, default=0.2, help='ignore slowdowns smaller than this')
+    compare_parser.add_argument('--metric', choices=['min', 'median'], default='min')
+    compare_parser.add_argument('-o', '--output', default=None, help='also save the fresh run here')
+    add_run_options(compare_parser)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("MICROBENCHMARK SUITE")
+    print("=" * 60)
+
+    if args.command == 'run':
+        run(args)
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run(args)
+        print()
+    ok = compare(baseline, current, args.threshold, args.metric, args.floor_us)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
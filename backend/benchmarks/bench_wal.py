@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Write-ahead log benchmark
+Write overhead, group commit and crash recovery of the in-memory store (wal_store)
+
+Works in a temporary directory (or --dir). Checks, in order:
+
+1. write overhead: safety_check with the log on (fsync, group commit) vs
+   off stays within --max-overhead-us; registration latency is reported;
+2. group commit: --threads threads registering at once share fsyncs
+   (more than one record per fsync);
+3. recovery, for dict and columnar stores: --families families (pool,
+   session, two bonds and their index entries) plus alerts are loaded,
+   snapshotted, followed by a log tail of checks, alerts and
+   registrations, then recovered into a new store "after a crash" (nothing
+   closed). Recovery must take under --max-recovery-s and reproduce the
+   state exactly; the recovered system must answer a safety check;
+4. a torn final record (crash mid-write) is cut off and the rest replays;
+5. with a Fernet key, no child id appears in plain text in any file on
+   disk, and the state still recovers.
+
+Exits non-zero if any check fails.
+
+Usage: python benchmarks/bench_wal.py [--families 200000] [--checks 20000] [--threads 16] [--max-recovery-s 10]
+"""
+
+import os
+import sys
+import time
+import array
+import shutil
+import argparse
+import tempfile
+import threading
+from dataclasses import replace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sovereign_quantum_system import ZER01NE67, MemoryStateStore, ChildState, SafetyAlert
+from wal_store import DurableState, HAS_FERNET
+
+SAFE = dict(distance_to_pool=40.0, moving_toward_pool=False, heart_rate=90.0)
+DANGER = dict(distance_to_pool=1.0, moving_toward_pool=True, heart_rate=150.0)
+NOW_NS = 1_792_000_000_000_000_000
+
+
+def durable(store, directory, **options) -> DurableState:
+    """Recovered DurableState with no snapshot thread (snapshots are taken by hand)"""
+    state = DurableState(store, directory, snapshot_interval_s=0, snapshot_mb=0, autostart=False, **options)
+    state.recover()
+    return state
+
+
+def family_state(families: int, alerts: int) -> dict:
+    """MemoryStateStore.export()-shaped state: one pool, session and two bonds per family"""
+    pool_ids = [f"POOL{i:09d}" for i in range(families)]
+    session_ids = [f"SESS{i:09d}" for i in range(families)]
+    bond_ids = [f"BOND{i:09d}" for i in range(2 * families)]
+    lat = array.array('d', (33.0 + (i % 10000) * 1e-4 for i in range(families)))
+    lon = array.array('d', (-112.0 - (i // 10000) * 1e-4 for i in range(families)))
+    created = array.array('q', (NOW_NS + i for i in range(families)))
+    bond_pools = [pool_ids[i >> 1] for i in range(2 * families)]
+    return {
+        'pools': (pool_ids, {'owner_id': [f"OWNER{i}" for i in range(families)], 'lat': lat, 'lon': lon,
+                             'depth_m': array.array('d', [1.5]) * families, 'created': created}),
+        'sessions': (session_ids, {
+            'pool_id': pool_ids, 'name': ['Family pool'] * families, 'lat': lat, 'lon': lon,
+            'collapse_state': ['ALPHA'] * families, 'average_confidence': array.array('d', [1.0]) * families,
+            'points_passed': [47] * families, 'earth_verified': [True] * families, 'earth_checked': created,
+            'created': created, 'earth_ref': session_ids}),
+        'bonds': (bond_ids, {'mother_id': [f"MOM{i >> 1}" for i in range(2 * families)],
+                             'child_id': [f"CHILD{i}" for i in range(2 * families)], 'pool_id': bond_pools,
+                             'created': array.array('q', (NOW_NS + i for i in range(2 * families))),
+                             'handshakes': array.array('q', (i % 50 for i in range(2 * families)))}),
+        'bond_index': (bond_ids, {'session_id': [session_ids[i >> 1] for i in range(2 * families)],
+                                  'pool_id': bond_pools}),
+        'alerts': (0, {'alert_id': [f"ALERT{i:09d}" for i in range(alerts)],
+                       'child_id': [f"CHILD{i % (2 * families)}" for i in range(alerts)],
+                       'pool_id': [bond_pools[i % (2 * families)] for i in range(alerts)],
+                       'danger_probability': array.array('d', [0.9]) * alerts,
+                       'timestamp': array.array('q', range(1_792_000_000_000, 1_792_000_000_000 + alerts)),
+                       'flags': array.array('B', [1]) * alerts,
+                       'last_seen': array.array('q', range(1_792_000_000_000, 1_792_000_000_000 + alerts)),
+                       'peak_probability': array.array('d', [0.9]) * alerts,
+                       'count': array.array('q', [1]) * alerts,
+                       'notifications': array.array('q', [1]) * alerts})
+    }
+
+
+def fingerprint(store) -> dict:
+    """Comparable view of everything the log persists (floats as stored)"""
+    state = store.export()
+    view = {}
+    for name, (first, columns) in state.items():
+        if name == 'alerts':
+            view[name] = (first, {column: list(values) for column, values in columns.items()})
+        else:
+            view[name] = dict(zip(first, zip(*(list(values) for values in columns.values()))))
+    return view
+
+
+def tail(store, n: int, family: int):
+    """Journaled traffic after a snapshot: n handshakes with alerts, an alert update, registrations, a delete"""
+    bonds = [store.bonds[f"BOND{i:09d}"] for i in range(0, 2 * family, max(1, 2 * family // n))][:n]
+    for start in range(0, len(bonds), 100):
+        batch = bonds[start:start + 100]
+        raised = [SafetyAlert(f"TAIL{start + k}", bond['child_id'], bond['pool_id'], 0.95)
+                  for k, bond in enumerate(batch[:10])]
+        store.record_checks(batch, raised)
+    alert = store.alerts[store.alerts.position('TAIL0')]
+    store.alerts.revise([(replace(alert, count=alert.count + 4), False)])   # the debouncer's copies
+    store.alerts.mark_sos_sent('TAIL1')
+    for i in range(20):
+        session_id = f"NEWSESS{i}"
+        store.pools[f"NEWPOOL{i}"] = {'pool_id': f"NEWPOOL{i}", 'owner_id': 'NEW', 'lat': 33.5,
+                                      'lon': -112.5, 'depth_m': 2.0, 'created': NOW_NS}
+        store.sessions[session_id] = {'session_id': session_id, 'pool_id': f"NEWPOOL{i}", 'name': 'new',
+                                      'lat': 33.5, 'lon': -112.5, 'collapse_state': 'ALPHA',
+                                      'average_confidence': 1.0, 'points_passed': 47, 'earth_verified': True,
+                                      'earth_checked': NOW_NS, 'created': NOW_NS, 'earth_ref': None}
+        store.bonds[f"NEWBOND{i}"] = {'bond_id': f"NEWBOND{i}", 'mother_id': 'NEWMOM', 'child_id': f"NEWCHILD{i}",
+                                      'pool_id': f"NEWPOOL{i}", 'created': NOW_NS, 'handshakes': 0}
+        store.bond_index[f"NEWBOND{i}"] = (session_id, f"NEWPOOL{i}")
+    store.bonds.pop('BOND000000001')
+    store.bond_index.pop('BOND000000001')
+
+
+def overhead(directory: str, checks: int, threads: int, failures: list) -> float:
+    """1 + 2: request-path cost of the log (returned, in us) and fsyncs shared by concurrent registrations"""
+    def timed(store):
+        system = ZER01NE67(store)
+        session_id = system.register_location("OWNER_WAL", 33.4484, -112.0740)['session_id']
+        bond_ids = [system.create_family_bond(session_id, f"MOM_{i}", f"CHILD_{i}")['bond_id'] for i in range(100)]
+        start = time.perf_counter()
+        for i in range(checks):
+            system.safety_check(bond_ids[i % 100], ChildState(child_id=f"CHILD_{i % 100}", **SAFE))
+        check_us = (time.perf_counter() - start) / checks * 1e6
+        start = time.perf_counter()
+        for i in range(50):
+            system.register_location(f"OWNER_{i}", 33.4 + i * 0.01, -112.0)
+        register_ms = (time.perf_counter() - start) / 50 * 1000
+        return system, check_us, register_ms
+
+    _, off_us, off_ms = timed(MemoryStateStore(journaled=True))
+    store = MemoryStateStore(journaled=True)
+    state = durable(store, directory)
+    system, on_us, on_ms = timed(store)
+    state.wal.flush(30)
+    print(f"   safety_check        off {off_us:>7.1f} us   on {on_us:>7.1f} us   overhead {on_us - off_us:+.1f} us")
+    print(f"   register_location   off {off_ms:>7.2f} ms   on {on_ms:>7.2f} ms   (waits for fsync)")
+
+    # Concurrent registrations: the writer fsyncs once for everything queued behind it
+    before = dict(state.wal.stats())
+    barrier = threading.Barrier(threads)
+
+    def register(t):
+        barrier.wait()
+        for i in range(20):
+            system.register_location(f"OWNER_{t}_{i}", 33.0 + t * 0.01, -111.0 - i * 0.01)
+
+    workers = [threading.Thread(target=register, args=(t,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    after = state.wal.stats()
+    records, groups = after['records'] - before['records'], after['groups'] - before['groups']
+    print(f"   group commit        {threads} threads: {records:,} records in {groups:,} fsyncs "
+          f"({records / max(groups, 1):.1f} per fsync)")
+    if records <= groups:
+        failures.append(f"no group commit: {records} records in {groups} fsyncs")
+    state.close()
+    return on_us - off_us
+
+
+def recovery(directory: str, columnar: bool, args, failures: list):
+    """3 + 4: snapshot, log tail, crash, recover"""
+    layout = 'columnar' if columnar else 'dict'
+    store = MemoryStateStore(columnar, journaled=True)
+    state = durable(store, directory)
+    store.load(family_state(args.families, args.alerts))
+    start = time.perf_counter()
+    state.snapshot()
+    snapshot_s = time.perf_counter() - start
+    tail(store, args.tail, args.families)
+    state.wal.flush(60)
+    expected = fingerprint(store)
+    entities = sum(len(expected[name]) for name in ('pools', 'sessions', 'bonds', 'bond_index'))
+    snapshot_mb = state.snapshot_bytes / 2**20
+    log_mb = state.wal.stats()['segment_bytes'] / 2**20
+    del store, state        # the "crash": nothing closed, the writer thread is left behind
+
+    recovered = MemoryStateStore(columnar, journaled=True)
+    result = durable(recovered, directory).recovery
+    print(f"   {layout:<8} {entities:,} entities + {len(expected['alerts'][1]['alert_id']):,} alerts   "
+          f"snapshot {snapshot_s:.2f} s ({snapshot_mb:.0f} MB)   log tail {result['records_replayed']:,} "
+          f"records ({log_mb:.1f} MB)   recovery {result['seconds']:.2f} s")
+    if result['seconds'] > args.max_recovery_s:
+        failures.append(f"{layout}: recovery took {result['seconds']:.2f} s (limit {args.max_recovery_s} s)")
+    if fingerprint(recovered) != expected:
+        failures.append(f"{layout}: recovered state differs from the state before the crash")
+    system = ZER01NE67(recovered)
+    answer = system.safety_check('BOND000000002', ChildState(child_id='CHILD2', **DANGER))
+    if answer.get('bond_id') != 'BOND000000002' or 'error' in answer:
+        failures.append(f"{layout}: recovered system answered {answer}")
+    recovered.durable.close()
+    del system, recovered
+
+    # A record cut off halfway through the write
+    shutil.rmtree(directory)
+    store = MemoryStateStore(columnar, journaled=True)
+    state = durable(store, directory)
+    store.load(family_state(100, 10))
+    state.snapshot()
+    tail(store, 50, 100)
+    state.wal.flush(10)
+    expected = fingerprint(store)
+    segment = os.path.join(directory, f"wal-{state.wal.segment:08d}.log")
+    del store, state
+    with open(segment, 'ab') as f:
+        f.write(b'\x40\x00\x00\x00\x12\x34\x56\x78\x00{"half a rec')
+    recovered = MemoryStateStore(columnar, journaled=True)
+    result = durable(recovered, directory).recovery
+    ok = result['torn_bytes'] > 0 and fingerprint(recovered) == expected
+    print(f"   {layout:<8} torn tail: {result['torn_bytes']} bytes cut, "
+          f"{result['records_replayed']} records replayed  ->  {'ok' if ok else 'FAIL'}")
+    if not ok:
+        failures.append(f"{layout}: torn tail recovery {result}")
+    recovered.durable.close()
+    shutil.rmtree(directory)
+
+
+def encryption(directory: str, failures: list):
+    """5: child-identifying records never reach the disk in plain text"""
+    from cryptography.fernet import Fernet
+    cipher = Fernet(Fernet.generate_key())
+    store = MemoryStateStore(journaled=True)
+    state = durable(store, directory, cipher=cipher)
+    system = ZER01NE67(store)
+    session_id = system.register_location("OWNER_SECRET", 33.4484, -112.0740)['session_id']
+    secret = "CHILD_SECRET_7731"
+    bond_id = system.create_family_bond(session_id, "MOM_SECRET", secret)['bond_id']
+    system.safety_check(bond_id, ChildState(child_id=secret, **DANGER))
+    state.snapshot()
+    system.safety_check(bond_id, ChildState(child_id=secret, **DANGER))
+    other = system.create_family_bond(session_id, "MOM_SECRET", secret + "_B")['bond_id']
+    system.safety_check(other, ChildState(child_id=secret + "_B", **DANGER))
+    state.wal.flush(10)
+    expected = fingerprint(store)
+    del system, store, state
+
+    leaked = []
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name), 'rb') as f:
+            if secret.encode() in f.read():
+                leaked.append(name)
+    recovered = MemoryStateStore(journaled=True)
+    durable(recovered, directory, cipher=cipher)
+    same = fingerprint(recovered) == expected
+    print(f"   encrypted: child id in plain text in {leaked or 'no files'}; "
+          f"recovered {'ok' if same else 'FAIL'}")
+    if leaked:
+        failures.append(f"child id readable in {leaked}")
+    if not same:
+        failures.append("encrypted state did not recover")
+    recovered.durable.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--families', type=int, default=200000, help='families (6 entities each) to recover')
+    parser.add_argument('--alerts', type=int, default=100000, help='alerts held at snapshot time')
+    parser.add_argument('--tail', type=int, default=50000, help='handshakes logged after the snapshot')
+    parser.add_argument('--checks', type=int, default=20000, help='safety checks for the overhead comparison')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--max-overhead-us', type=float, default=40.0)
+    parser.add_argument('--max-recovery-s', type=float, default=10.0)
+    parser.add_argument('--dir', default=None, help='work directory (default: a temporary one)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("WRITE-AHEAD LOG - group commit, snapshots and crash recovery")
+    print("=" * 60)
+
+    root = args.dir or tempfile.mkdtemp(prefix='zer01ne-wal-')
+    failures = []
+    try:
+        extra_us = overhead(os.path.join(root, 'overhead'), args.checks, args.threads, failures)
+        if extra_us > args.max_overhead_us:
+            failures.append(f"the log adds {extra_us:.1f} us per safety check")
+        for columnar in (False, True):
+            recovery(os.path.join(root, 'recovery'), columnar, args, failures)
+        if HAS_FERNET:
+            encryption(os.path.join(root, 'encrypted'), failures)
+        else:
+            print("   encryption: cryptography not installed, skipped")
+    finally:
+        if args.dir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print(f"\n   {'PASS' if not failures else 'FAIL'}")
+    for failure in failures:
+        print(f"      {failure}")
+    sys.exit(0 if not failures else 1)
+
+
+if __name__ == "__main__":
+    main()
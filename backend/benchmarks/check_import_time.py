@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Import-time regression check
+Imports the core engine in a fresh interpreter under `python -X importtime` and fails if it is over budget
+
+Also fails if the import loads something the core must not load eagerly
+(Flask, numpy, cryptography, pyproj, aiohttp) or builds the system or the
+app. The budget applies to the median of several runs so one slow start
+does not fail the check. Exits non-zero on any failure.
+
+Usage: python benchmarks/check_import_time.py [--budget-ms 150] [--runs 5]
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+import statistics
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULE = 'sovereign_quantum_system'
+FORBIDDEN = ('flask', 'werkzeug', 'flask_cors', 'numpy', 'cryptography', 'pyproj', 'aiohttp')
+PROBE = (f"import sys, {MODULE} as sq\n"
+         f"print(','.join(m for m in {FORBIDDEN!r} if m in sys.modules))\n"
+         f"print('system' if sq._system is not None else '', 'app' if sq._app is not None else '')")
+
+
+def import_once():
+    """(cumulative ms per imported module, probe output lines) for one fresh interpreter"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE], cwd=BACKEND,
+                          capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1000
+    return times, proc.stdout.splitlines()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--budget-ms', type=float, default=150.0, help='median cumulative import time allowed')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"IMPORT-TIME CHECK - import {MODULE}")
+    print("=" * 60)
+
+    import_once()   # warm the bytecode cache so runs measure imports, not compiles
+    runs = [import_once() for _ in range(args.runs)]
+    median = statistics.median(times[MODULE] for times, _ in runs)
+    times, (loaded, built) = runs[-1]
+
+    slowest = sorted(((ms, name) for name, ms in times.items() if name != MODULE),
+                     reverse=True)[:8]
+    for ms, name in slowest:
+        print(f"   {name:<32} {ms:>7.1f} ms")
+
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"median import time {median:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+    if loaded:
+        failures.append(f"imported eagerly: {loaded}")
+    if built.strip():
+        failures.append(f"built at import: {built.strip()}")
+
+    print(f"\n   {MODULE}: median {median:.1f} ms over {args.runs} runs "
+          f"(budget {args.budget_ms:.0f} ms)  ->  {'PASS' if not failures else 'FAIL'}")
+    for failure in failures:
+        print(f"      {failure}")
+    sys.exit(0 if not failures else 1)
+
+
+if __name__ == "__main__":
+    main()
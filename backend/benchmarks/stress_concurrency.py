@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+ZER01NE 67 - Concurrency stress test
+64 threads run safety checks, batches, Earth validations and bond churn against one ZER01NE67; every count must come out exact
+
+Checks per-bond handshake counts, the Earth handshake total and phase,
+alert count, positions and per-child indexes, and that every in-place
+alert update reached the store. The thread switch
+interval is shortened so threads interleave as often as possible.
+Exits non-zero on any mismatch.
+
+Usage: python benchmarks/stress_concurrency.py [--threads 64] [--iterations 500] [--columnar]
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sovereign_quantum_system import ZER01NE67, MemoryStateStore, ChildState, phase_for
+
+SHARED_BONDS = 32
+CHURN_BONDS = 32
+
+
+def worker(system, bonds, children, t, iterations, barrier, tally):
+    """One request thread; records what it did so the totals can be checked"""
+    expected = Counter()
+    alerts = Counter()      # alerts raised per child
+    updates = 0             # in-place updates of open alerts
+    validations = 0
+    barrier.wait()
+    for i in range(iterations):
+        k = (t * 7 + i) % len(bonds)
+        danger = i % 5 == 0
+        child = ChildState(child_id=children[k], distance_to_pool=1.0 if danger else 40.0,
+                           moving_toward_pool=danger, heart_rate=150.0 if danger else 70.0)
+        result = system.safety_check(bonds[k], child)
+        expected[bonds[k]] += 1
+        alerts[children[k]] += result['alert_event'] == 'raised'
+        updates += result['alert_event'] not in (None, 'raised')
+
+        if i % 10 == 0:
+            ids = [bonds[(k + j) % len(bonds)] for j in range(8)]
+            kids = [children[(k + j) % len(bonds)] for j in range(8)]
+            results = system.safety_check_batch(ids, kids, [1.0] * 8, [True] * 8, [150.0] * 8)
+            expected.update(ids)
+            for kid, r in zip(kids, results):
+                alerts[kid] += r['alert_event'] == 'raised'
+                updates += r['alert_event'] not in (None, 'raised')
+
+        if i % 50 == 0:
+            system.earth.validate_location(33.4484, -112.0740, 300.0)
+            validations += 1
+    tally.append((expected, alerts, updates, validations))
+
+
+def churn(system, session_id, churn_ids, stop):
+    """Delete and recreate bonds so columnar rows keep moving under the checkers"""
+    n = 0
+    while not stop.is_set():
+        if churn_ids:
+            system.remove_family_bond(churn_ids.pop(0))
+        bond = system.create_family_bond(session_id, f"MOM_CHURN_{n}", f"CHILD_CHURN_{n}")
+        churn_ids.append(bond['bond_id'])
+        n += 1
+
+
+def run(threads: int, iterations: int, columnar: bool) -> bool:
+    system = ZER01NE67(store=MemoryStateStore(columnar))
+    session_id = system.register_location("OWNER_STRESS", 33.4484, -112.0740)['session_id']
+
+    # Interleave shared and churn bonds so deletes move shared rows in columnar tables
+    bonds, children, churn_ids = [], [], []
+    for i in range(SHARED_BONDS):
+        churn_ids.append(system.create_family_bond(session_id, f"MOM_X{i}", f"CHILD_X{i}")['bond_id'])
+        bonds.append(system.create_family_bond(session_id, f"MOM_{i}", f"CHILD_{i}")['bond_id'])
+        children.append(f"CHILD_{i}")
+    churn_ids = churn_ids[:CHURN_BONDS]
+
+    earth_before = system.earth.handshakes
+    alerts_before = len(system.safety.alerts)
+    version_before = system.safety.alerts.version
+    tally = []
+    barrier = threading.Barrier(threads)
+    stop = threading.Event()
+    churner = threading.Thread(target=churn, args=(system, session_id, churn_ids, stop))
+    pool = [threading.Thread(target=worker, args=(system, bonds, children, t, iterations, barrier, tally))
+            for t in range(threads)]
+
+    start = time.perf_counter()
+    churner.start()
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    stop.set()
+    churner.join()
+    elapsed = time.perf_counter() - start
+
+    expected, alerts, updates, validations = Counter(), Counter(), 0, 0
+    for e, a, u, v in tally:
+        expected.update(e)
+        alerts.update(a)
+        updates += u
+        validations += v
+
+    failures = []
+    for bond_id in bonds:
+        got = system.safety.bonds[bond_id]['handshakes']
+        if got != expected[bond_id]:
+            failures.append(f"bond {bond_id}: {got} handshakes, expected {expected[bond_id]}")
+
+    earth = system.earth.handshakes - earth_before
+    if earth != validations:
+        failures.append(f"earth handshakes: {earth}, expected {validations}")
+    if system.earth.phase != phase_for(system.earth.handshakes):
+        failures.append(f"phase {system.earth.phase} does not match {system.earth.handshakes} handshakes")
+
+    store = system.safety.alerts
+    new_alerts = len(store) - alerts_before
+    if new_alerts != sum(alerts.values()):
+        failures.append(f"alerts: {new_alerts}, expected {sum(alerts.values())}")
+    if store.version - version_before != new_alerts + updates:
+        failures.append(f"alert store version moved {store.version - version_before}, "
+                        f"expected {new_alerts} alerts + {updates} updates")
+    readings = sum(alert.count for alert in list(store)[alerts_before:])
+    if readings != new_alerts + updates:
+        failures.append(f"stored alerts hold {readings} readings, expected {new_alerts + updates}")
+    for child_id in children:
+        got = len(store.query(child_id=child_id)[0])
+        if got != alerts[child_id]:
+            failures.append(f"alerts for {child_id}: {got}, expected {alerts[child_id]}")
+
+    mode = 'columnar' if columnar else 'dict'
+    checks = sum(expected.values())
+    print(f"   {mode:<8} {threads} threads  {checks:,} checks  {new_alerts:,} alerts  {updates:,} updates  "
+          f"{validations} validations  {elapsed:.1f}s  ->  {'PASS' if not failures else 'FAIL'}")
+    for failure in failures[:10]:
+        print(f"      {failure}")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--iterations', type=int, default=500, help='safety checks per thread')
+    parser.add_argument('--columnar', action='store_true', help='only test columnar storage')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("CONCURRENCY STRESS TEST - exact counts under contention")
+    print("=" * 60)
+
+    sys.setswitchinterval(1e-6)
+    modes = [True] if args.columnar else [False, True]
+    ok = all([run(args.threads, args.iterations, columnar) for columnar in modes])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,12 @@ class Config:
     USGS_TOKEN = os.getenv('USGS_TOKEN', None)
     USGS_API_URL = os.getenv('USGS_API_URL', 'https://waterservices.usgs.gov/nwis/qw')
     
+    # Feed endpoints read by points 16, 20 and 43 (feeds.py)
+    NASA_POWER_URL = os.getenv('NASA_POWER_URL', 'https://power.larc.nasa.gov/api/temporal/hourly/point')
+    NOAA_TIDES_URL = os.getenv('NOAA_TIDES_URL', 'https://api.tidesandcurrents.noaa.gov/api/prod/datagetter')
+    NOAA_TIDE_STATION = os.getenv('NOAA_TIDE_STATION', '9410230')     # CO-OPS station for every location's tides
+    USGS_GWLEVELS_URL = os.getenv('USGS_GWLEVELS_URL', 'https://waterservices.usgs.gov/nwis/gwlevels/')
+    
     # AZ Government Registries (real portals, not APIs)
     AZ_REGISTRY_PORTAL = os.getenv('AZ_REGISTRY_PORTAL', 'https://dcs.az.gov/public-records')
     AZ_FINGERPRINT_PORTAL = os.getenv('AZ_FINGERPRINT_PORTAL', 'https://dps.az.gov/services/fingerprint-clearance')
@@ -48,6 +54,31 @@ class Config:
     # Webhooks for insurance partners (no public APIs available)
     STATE_FARM_WEBHOOK = os.getenv('STATE_FARM_WEBHOOK', 'https://YOUR_DOMAIN/webhooks/state-farm')
     ALLSTATE_WEBHOOK = os.getenv('ALLSTATE_WEBHOOK', 'https://YOUR_DOMAIN/webhooks/allstate')
+    SOS_WEBHOOK = os.getenv('SOS_WEBHOOK', None)  # satellite SOS relay, receives every alert notification
+    
+    # ===== OUTBOUND DISPATCH (dispatcher.py) =====
+    DISPATCH_SOS_WORKERS = int(os.getenv('DISPATCH_SOS_WORKERS', 2))
+    DISPATCH_SOS_SLO_MS = float(os.getenv('DISPATCH_SOS_SLO_MS', 1000))       # alert raised -> SOS delivered
+    DISPATCH_QUEUE_SIZE = int(os.getenv('DISPATCH_QUEUE_SIZE', 10000))         # per lane; oldest dropped beyond
+    DISPATCH_BATCH_SIZE = int(os.getenv('DISPATCH_BATCH_SIZE', 100))           # insurer events per POST
+    DISPATCH_BATCH_LINGER_S = float(os.getenv('DISPATCH_BATCH_LINGER_S', 2))   # max wait for a batch to fill
+    DISPATCH_MAX_ATTEMPTS = int(os.getenv('DISPATCH_MAX_ATTEMPTS', 5))
+    DISPATCH_BACKOFF_S = float(os.getenv('DISPATCH_BACKOFF_S', 0.1))           # first retry delay (doubles, jittered)
+    DISPATCH_BACKOFF_MAX_S = float(os.getenv('DISPATCH_BACKOFF_MAX_S', 10))
+    DISPATCH_TIMEOUT_S = float(os.getenv('DISPATCH_TIMEOUT_S', 5))
+    DISPATCH_POOL_SIZE = int(os.getenv('DISPATCH_POOL_SIZE', 4))               # idle keep-alive connections per host
+    
+    # ===== DATA FEEDS (feeds.py) =====
+    FEEDS_ENABLED = os.getenv('FEEDS_ENABLED', 'False').lower() == 'true'     # off: points use static values
+    FEED_TILE_DEG = float(os.getenv('FEED_TILE_DEG', 0.25))                   # cache tile (~28 km)
+    FEED_WIND_TTL_S = float(os.getenv('FEED_WIND_TTL_S', 3600))
+    FEED_TIDES_TTL_S = float(os.getenv('FEED_TIDES_TTL_S', 21600))
+    FEED_WATER_TABLE_TTL_S = float(os.getenv('FEED_WATER_TABLE_TTL_S', 86400))
+    FEED_MAX_ENTRIES = int(os.getenv('FEED_MAX_ENTRIES', 10000))               # tiles kept (LRU), all sources
+    FEED_TIMEOUT_S = float(os.getenv('FEED_TIMEOUT_S', 5))
+    FEED_POOL_SIZE = int(os.getenv('FEED_POOL_SIZE', 8))                       # concurrent upstream connections
+    FEED_BREAKER_FAILURES = int(os.getenv('FEED_BREAKER_FAILURES', 5))         # consecutive errors to open
+    FEED_BREAKER_COOLDOWN_S = float(os.getenv('FEED_BREAKER_COOLDOWN_S', 30))
     
     # ===== SERVER CONFIG =====
     PORT = int(os.getenv('PORT', 5000))
@@ -59,15 +90,94 @@ class Config:
     ENCRYPTION_KEY = os.getenv('ENCRYPTION_KEY', None)
     JWT_SECRET = os.getenv('JWT_SECRET', 'change-this-in-production')
     
+    # ===== EARTH VALIDATION CACHE =====
+    EARTH_CACHE_GRID_DEG = float(os.getenv('EARTH_CACHE_GRID_DEG', 0.0001))  # ~11 m cells
+    EARTH_CACHE_ALT_BAND_M = float(os.getenv('EARTH_CACHE_ALT_BAND_M', 10.0))
+    EARTH_CACHE_MAX_ENTRIES = int(os.getenv('EARTH_CACHE_MAX_ENTRIES', 10000))
+    EARTH_CACHE_TTL_S = float(os.getenv('EARTH_CACHE_TTL_S', 3600))
+    
+    # ===== EARTH RE-VALIDATION =====
+    EARTH_REVALIDATE_TTL_S = float(os.getenv('EARTH_REVALIDATE_TTL_S', 300))
+    
+    # ===== EARTH RESULT STORE =====
+    EARTH_RESULT_STORE_MAX = int(os.getenv('EARTH_RESULT_STORE_MAX', 10000))  # full results kept (0 = none)
+    EARTH_RESULT_TTL_S = float(os.getenv('EARTH_RESULT_TTL_S', 3600))
+    
+    # ===== ALERT DEBOUNCING (one open alert per bond) =====
+    ALERT_RAISE_THRESHOLD = float(os.getenv('ALERT_RAISE_THRESHOLD', 0.8))  # danger above this opens an alert
+    ALERT_CLEAR_THRESHOLD = float(os.getenv('ALERT_CLEAR_THRESHOLD', 0.6))  # ...and below this closes it
+    ALERT_RENOTIFY_S = float(os.getenv('ALERT_RENOTIFY_S', 60))             # re-push a still-open alert this often
+    ALERT_DEBOUNCE_STALE_S = float(os.getenv('ALERT_DEBOUNCE_STALE_S', 300))  # close an open alert not seen this long (0 = never)
+    
+    # ===== RETENTION (0 = keep forever) =====
+    ALERT_MAX_HISTORY = int(os.getenv('ALERT_MAX_HISTORY', 100000))         # alerts kept in process
+    ALERT_MAX_AGE_S = float(os.getenv('ALERT_MAX_AGE_S', 0))
+    SESSION_IDLE_TTL_S = float(os.getenv('SESSION_IDLE_TTL_S', 0))          # no checks on any of its bonds
+    BOND_IDLE_TTL_S = float(os.getenv('BOND_IDLE_TTL_S', 0))                # no checks on the bond
+    MEMORY_BUDGET_MB = float(os.getenv('MEMORY_BUDGET_MB', 0))              # approximate; LRU sessions beyond it
+    RETENTION_SWEEP_S = float(os.getenv('RETENTION_SWEEP_S', 60))
+    
+    # ===== LIVE ALERT STREAM (SSE) =====
+    ALERT_STREAM_QUEUE_SIZE = int(os.getenv('ALERT_STREAM_QUEUE_SIZE', 256))
+    ALERT_STREAM_MAX_SUBSCRIBERS = int(os.getenv('ALERT_STREAM_MAX_SUBSCRIBERS', 10000))
+    ALERT_STREAM_OVERFLOW = os.getenv('ALERT_STREAM_OVERFLOW', 'disconnect')  # or 'drop'
+    ALERT_STREAM_REPLAY_LIMIT = int(os.getenv('ALERT_STREAM_REPLAY_LIMIT', 1000))
+    ALERT_STREAM_KEEPALIVE_S = float(os.getenv('ALERT_STREAM_KEEPALIVE_S', 15))
+    
+    # ===== STORAGE LAYOUT =====
+    COLUMNAR_STORE = os.getenv('COLUMNAR_STORE', 'False').lower() == 'true'  # array-backed pools/bonds/alerts
+    
+    # ===== ASYNC SERVER (async_app.py) =====
+    ASYNC_EARTH_THREADS = int(os.getenv('ASYNC_EARTH_THREADS', 4))      # executor for register/validate
+    ASYNC_EARTH_PROCESSES = int(os.getenv('ASYNC_EARTH_PROCESSES', 0))  # >0: /earth/validate in a process pool
+    ASYNC_KEEPALIVE_S = float(os.getenv('ASYNC_KEEPALIVE_S', 75))
+    ASYNC_BACKLOG = int(os.getenv('ASYNC_BACKLOG', 4096))
+    
+    # ===== RESPONSES =====
+    JSON_ENCODER = os.getenv('JSON_ENCODER', 'auto')  # auto (orjson if installed), orjson, stdlib
+    RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESS_MIN_BYTES', 1024))  # smaller bodies go uncompressed
+    RESPONSE_COMPRESS_LEVEL = int(os.getenv('RESPONSE_COMPRESS_LEVEL', 5))
+    
+    # ===== METRICS (/metrics) =====
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_POINT_SAMPLE = int(os.getenv('METRICS_POINT_SAMPLE', 8))  # time points on every Nth evaluation
+    
+    # ===== CHILD TELEMETRY (rolling per-child state) =====
+    TELEMETRY_MAX_CHILDREN = int(os.getenv('TELEMETRY_MAX_CHILDREN', 100000))  # least recently seen dropped beyond this
+    TELEMETRY_WINDOW = int(os.getenv('TELEMETRY_WINDOW', 8))                   # fixes kept per child
+    TELEMETRY_HORIZON_S = float(os.getenv('TELEMETRY_HORIZON_S', 30))         # velocity only from fixes this recent
+    TELEMETRY_MAX_SPEED_MPS = float(os.getenv('TELEMETRY_MAX_SPEED_MPS', 60))  # faster fixes are rejected as jumps
+    TELEMETRY_GPS_TOLERANCE_M = float(os.getenv('TELEMETRY_GPS_TOLERANCE_M', 25))
+    TELEMETRY_MAX_REJECTS = int(os.getenv('TELEMETRY_MAX_REJECTS', 3))         # in a row before re-anchoring
+    TELEMETRY_HR_ALPHA = float(os.getenv('TELEMETRY_HR_ALPHA', 0.3))           # heart-rate EWMA weight
+    TELEMETRY_APPROACH_MPS = float(os.getenv('TELEMETRY_APPROACH_MPS', 0.2))   # slower counts as not approaching
+    
     # ===== DATABASE =====
     REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
     REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
     REDIS_DB = int(os.getenv('REDIS_DB', 0))
+    REDIS_KEY_PREFIX = os.getenv('REDIS_KEY_PREFIX', 'zer01ne')
+    REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+    STATE_STORE = os.getenv('STATE_STORE', 'memory')  # 'memory' or 'redis'
+    SHARDS = int(os.getenv('SHARDS', 0))    # sharding.py worker processes (0 = CPU count)
+    SHARD_WORKERS = int(os.getenv('SHARD_WORKERS', 16))                 # request threads per shard process
+    SHARD_CONNECTIONS = int(os.getenv('SHARD_CONNECTIONS', 32))         # router connections per shard; more callers wait
+    SHARD_IDLE_CONNECTIONS = int(os.getenv('SHARD_IDLE_CONNECTIONS', 8))  # ...of which kept open between requests
+    
+    # ===== DURABILITY (STATE_STORE=memory) =====
+    WAL_DIR = os.getenv('WAL_DIR', '')                                       # write-ahead log + snapshots; empty = off
+    WAL_FSYNC = os.getenv('WAL_FSYNC', 'True').lower() == 'true'             # fsync every group commit
+    WAL_SYNC_COMMIT = os.getenv('WAL_SYNC_COMMIT', 'True').lower() == 'true' # registrations wait for their commit
+    WAL_COMMIT_DELAY_MS = float(os.getenv('WAL_COMMIT_DELAY_MS', 0))         # linger to grow commit groups
+    WAL_SNAPSHOT_S = float(os.getenv('WAL_SNAPSHOT_S', 300))
+    WAL_SNAPSHOT_MB = float(os.getenv('WAL_SNAPSHOT_MB', 64))                # log size that triggers an early snapshot
+    WAL_ENCRYPT = os.getenv('WAL_ENCRYPT', 'False').lower() == 'true'        # Fernet (ENCRYPTION_KEY) for bonds and alerts
     
     # ===== EARTH CONSTANTS =====
     EARTH_RADIUS_M = 6371000.0
     EARTH_RADIUS_KM = 6371.0
     SPEED_OF_LIGHT = 299792458.0
+    SPEED_OF_SOUND = 343.0  # m/s, bound for point 40 (teleportation)
     STANDARD_GRAVITY = 9.80665
     SEA_LEVEL_PRESSURE = 1013.25
     EARTH_OMEGA = 7.292115e-5  # rad/s
@@ -110,6 +220,7 @@ class Config:
     WAVELENGTH_900MHZ = 299792458.0 / FREQ_900MHZ  # ~0.333 m
     POOL_ALARM_RADIUS_M = 4828.0  # 3 miles in meters
     POOL_THERMAL_DELTA_C = 2.0  # °C difference for pool detection
+    POOL_INDEX_CELL_DEG = float(os.getenv('POOL_INDEX_CELL_DEG', 0.01))  # spatial grid cell (~1.1 km)
     
     # ===== AVIATION & SPATIAL =====
     FAA_UNCONTROLLED_CEILING_M = 121.92  # 400 ft in meters
@@ -0,0 +1,373 @@
+"""
+ZER01NE 67 - OUTBOUND DISPATCHER
+Delivers alert notifications (SOS) and insurer webhook events off the request path.
+
+Two lanes, each with its own bounded queue and worker threads, so a slow
+insurer endpoint can never hold up an SOS:
+
+- sos: one POST per alert event to each SOS target as soon as a worker is
+  free; enqueue-to-delivery time is measured against DISPATCH_SOS_SLO_MS.
+- insurer: events are batched (DISPATCH_BATCH_SIZE events or
+  DISPATCH_BATCH_LINGER_S, whichever comes first) and each batch is POSTed
+  as one JSON body to every insurer webhook.
+
+submit() only appends to a deque under a short lock and wakes a worker, so
+the safety check that raised the alert never waits on the network. Failed
+sends are retried with exponential backoff and full jitter (connection
+errors, 5xx and 429; other 4xx are final) from a per-lane retry heap, so a
+worker never sleeps on a backoff. A full lane drops its oldest event and
+counts it in zer01ne_dispatch_dropped_total.
+"""
+
+import time
+import heapq
+import random
+import threading
+import http.client
+from collections import deque
+from itertools import count
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import metrics
+import responses
+
+DISPATCH_SECONDS = metrics.REGISTRY.histogram(
+    'zer01ne_dispatch_delivery_seconds', 'Enqueue to successful delivery', ('lane',))
+DISPATCH_SENT = metrics.REGISTRY.counter(
+    'zer01ne_dispatch_requests_total', 'Outbound POSTs by lane and outcome', ('lane', 'outcome'))
+DISPATCH_DROPPED = metrics.REGISTRY.counter(
+    'zer01ne_dispatch_dropped_total', 'Events dropped because a lane was full', ('lane',))
+DISPATCH_SLO_MISSED = metrics.REGISTRY.counter(
+    'zer01ne_dispatch_slo_missed_total', 'SOS deliveries slower than DISPATCH_SOS_SLO_MS')
+
+
+def configured(url: Optional[str]) -> bool:
+    """False for unset or placeholder (YOUR_DOMAIN) endpoints"""
+    return bool(url) and 'YOUR_DOMAIN' not in url
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections per host, reused most-recently-idle first"""
+
+    def __init__(self, max_idle: int = 4, timeout: float = 5.0):
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    def _connect(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        self.opened += 1
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def post(self, url: str, body: bytes, headers: Dict[str, str]) -> int:
+        """POST body and return the status; raises OSError/HTTPException if the send fails"""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        reused = conn is not None
+        if reused:
+            self.reused += 1
+        else:
+            conn = self._connect(*key)
+
+        while True:
+            try:
+                conn.request('POST', path, body, headers)
+                response = conn.getresponse()
+                response.read()
+                break
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection: one fresh try
+                reused = False
+                conn = self._connect(*key)
+
+        if response.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle:
+                    idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+        return response.status
+
+    def close(self):
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for idle in pools.values():
+            for conn in idle:
+                conn.close()
+
+
+class _Job:
+    """One POST to one target, with its retry state"""
+
+    __slots__ = ('url', 'body', 'events', 'attempt', 'enqueued', 'alert_ids')
+
+    def __init__(self, url: str, body: bytes, events: int, enqueued: float, alert_ids: Sequence[str]):
+        self.url = url
+        self.body = body
+        self.events = events
+        self.attempt = 0
+        self.enqueued = enqueued
+        self.alert_ids = alert_ids
+
+
+class Lane:
+    """Bounded event queue plus retry heap, served by its own worker threads
+
+    With batch_size > 1 a worker takes up to batch_size events (waiting up to
+    linger_s for a batch to fill) and sends them as one body to every target.
+    """
+
+    def __init__(self, name: str, targets: Sequence[str], dispatcher: 'OutboundDispatcher',
+                 workers: int = 1, maxsize: int = 10000, batch_size: int = 1, linger_s: float = 0.0):
+        self.name = name
+        self.targets = list(targets)
+        self.dispatcher = dispatcher
+        self.workers = workers
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.linger_s = linger_s
+        self._events = deque()      # (enqueued, alert_id, event dict)
+        self._retries = []          # heap of (due, seq, job)
+        self._seq = count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._busy = 0
+        self._closed = False
+        self.queued = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+        self._dropped_metric = DISPATCH_DROPPED.labels(name)
+        self._seconds_metric = DISPATCH_SECONDS.labels(name)
+
+    def submit(self, alert_id: Optional[str], event: Dict):
+        with self._cond:
+            if len(self._events) >= self.maxsize:
+                self._events.popleft()
+                self.dropped += 1
+                if metrics.ENABLED:
+                    self._dropped_metric.inc()
+            self._events.append((time.monotonic(), alert_id, event))
+            self.queued += 1
+            if not self._threads:
+                self._start()
+            self._cond.notify()
+
+    def _start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"dispatch-{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _next(self) -> Optional[_Job]:
+        """Block until a retry is due or events are ready; None once closed and drained"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._retries and self._retries[0][0] <= now:
+                    self._busy += 1
+                    return heapq.heappop(self._retries)[2]
+                if self._events:
+                    linger = self._events[0][0] + self.linger_s - now
+                    if len(self._events) >= self.batch_size or linger <= 0 or self._closed:
+                        self._busy += 1
+                        return self._take()
+                    wait = linger
+                elif self._closed and not self._retries:
+                    return None
+                else:
+                    wait = None
+                if self._retries:
+                    due = self._retries[0][0] - now
+                    wait = due if wait is None else min(wait, due)
+                self._cond.wait(wait)
+
+    def _take(self) -> _Job:
+        """First job of a batch; the other targets' copies go straight onto the retry heap"""
+        taken = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+        events = [event for _, _, event in taken]
+        body = responses.dumps(events[0] if self.batch_size == 1 else {'events': events, 'count': len(events)})
+        alert_ids = [alert_id for _, alert_id, _ in taken if alert_id]
+        jobs = [_Job(url, body, len(events), taken[0][0], alert_ids) for url in self.targets]
+        for job in jobs[1:]:
+            heapq.heappush(self._retries, (0.0, next(self._seq), job))
+        return jobs[0]
+
+    def _run(self):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            try:
+                self.dispatcher._send(self, job)
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    self._cond.notify_all()
+
+    def retry(self, job: _Job, delay: float):
+        with self._cond:
+            heapq.heappush(self._retries, (time.monotonic() + delay, next(self._seq), job))
+            self.retried += 1
+            self._cond.notify()
+
+    def idle(self) -> bool:
+        return not self._events and not self._retries and not self._busy
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything queued has been delivered or given up on"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self.idle():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else 0.05)
+        return True
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'targets': len(self.targets),
+                'queue': len(self._events),
+                'retrying': len(self._retries),
+                'maxsize': self.maxsize,
+                'queued': self.queued,
+                'delivered': self.delivered,
+                'retried': self.retried,
+                'failed': self.failed,
+                'dropped': self.dropped
+            }
+
+
+class OutboundDispatcher:
+    """SOS and insurer webhook delivery with priority lanes, pooling and retries"""
+
+    def __init__(self, sos_urls: Sequence[str] = (), insurer_urls: Sequence[str] = (),
+                 on_sos_delivered: Callable[[str], None] = None, sos_workers: int = 2,
+                 queue_size: int = 10000, batch_size: int = 100, linger_s: float = 2.0,
+                 slo_ms: float = 1000.0, max_attempts: int = 5, backoff_s: float = 0.1,
+                 backoff_max_s: float = 10.0, timeout_s: float = 5.0, pool_size: int = 4):
+        self.sos = Lane('sos', [u for u in sos_urls if configured(u)], self,
+                        workers=sos_workers, maxsize=queue_size)
+        self.insurer = Lane('insurer', [u for u in insurer_urls if configured(u)], self,
+                            workers=1, maxsize=queue_size, batch_size=batch_size, linger_s=linger_s)
+        self.on_sos_delivered = on_sos_delivered
+        self.slo_s = slo_ms / 1000.0
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.pool = ConnectionPool(pool_size, timeout_s)
+        self.slo_missed = 0
+
+    @classmethod
+    def from_config(cls, config, on_sos_delivered: Callable[[str], None] = None) -> 'OutboundDispatcher':
+        return cls(
+            sos_urls=[config.SOS_WEBHOOK],
+            insurer_urls=[config.STATE_FARM_WEBHOOK, config.ALLSTATE_WEBHOOK],
+            on_sos_delivered=on_sos_delivered,
+            sos_workers=config.DISPATCH_SOS_WORKERS,
+            queue_size=config.DISPATCH_QUEUE_SIZE,
+            batch_size=config.DISPATCH_BATCH_SIZE,
+            linger_s=config.DISPATCH_BATCH_LINGER_S,
+            slo_ms=config.DISPATCH_SOS_SLO_MS,
+            max_attempts=config.DISPATCH_MAX_ATTEMPTS,
+            backoff_s=config.DISPATCH_BACKOFF_S,
+            backoff_max_s=config.DISPATCH_BACKOFF_MAX_S,
+            timeout_s=config.DISPATCH_TIMEOUT_S,
+            pool_size=config.DISPATCH_POOL_SIZE
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sos.targets or self.insurer.targets)
+
+    def submit(self, event: Dict, alert_id: str = None, sos: bool = True, insurer: bool = True):
+        """Queue one event on the SOS lane and/or the insurer lane (never blocks on I/O)"""
+        if sos and self.sos.targets:
+            self.sos.submit(alert_id, event)
+        if insurer and self.insurer.targets:
+            self.insurer.submit(alert_id, event)
+
+    def _send(self, lane: Lane, job: _Job):
+        job.attempt += 1
+        try:
+            status = self.pool.post(job.url, job.body, {'Content-Type': 'application/json',
+                                                        'X-Zer01ne-Events': str(job.events)})
+        except (OSError, http.client.HTTPException):
+            status = None
+
+        if status is not None and 200 <= status < 300:
+            elapsed = time.monotonic() - job.enqueued
+            with lane._cond:
+                lane.delivered += job.events
+            if metrics.ENABLED:
+                DISPATCH_SENT.labels(lane.name, 'delivered').inc()
+                lane._seconds_metric.observe(elapsed)
+            if lane is self.sos:
+                if elapsed > self.slo_s:
+                    self.slo_missed += 1
+                    if metrics.ENABLED:
+                        DISPATCH_SLO_MISSED.inc()
+                if self.on_sos_delivered is not None:
+                    for alert_id in job.alert_ids:
+                        self.on_sos_delivered(alert_id)
+            return
+
+        retryable = status is None or status >= 500 or status == 429
+        if retryable and job.attempt < self.max_attempts:
+            delay = random.uniform(0, min(self.backoff_max_s, self.backoff_s * 2 ** (job.attempt - 1)))
+            if metrics.ENABLED:
+                DISPATCH_SENT.labels(lane.name, 'retried').inc()
+            lane.retry(job, delay)
+            return
+        with lane._cond:
+            lane.failed += job.events
+        if metrics.ENABLED:
+            DISPATCH_SENT.labels(lane.name, 'failed').inc()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait for both lanes to go idle (tests, shutdown)"""
+        return self.sos.flush(timeout) and self.insurer.flush(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Send what is queued (insurer batches without lingering), then stop the workers"""
+        self.sos.close()
+        self.insurer.close()
+        self.flush(timeout)
+        self.pool.close()
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'sos': dict(self.sos.stats(), slo_ms=self.slo_s * 1000, slo_missed=self.slo_missed),
+            'insurer': dict(self.insurer.stats(), batch_size=self.insurer.batch_size,
+                            linger_s=self.insurer.linger_s),
+            'connections_opened': self.pool.opened,
+            'connections_reused': self.pool.reused
+        }
@@ -0,0 +1,406 @@
+"""
+ZER01NE 67 - DATA FEEDS
+Cached async client for the NASA / NOAA / USGS feeds behind points 16, 20 and 43.
+
+Points must never wait on the network, so they only ever call peek(), which
+reads the cache under a short lock and returns at once:
+
+- fresh: the tile's value for the current time bucket;
+- stale: an older bucket's value (last known), served while one background
+  refresh runs (stale-while-revalidate);
+- fallback: nothing cached yet (or the source had no data for the tile) -
+  the caller's default, with one background fetch scheduled.
+
+Entries are keyed by source and spatial tile (FEED_TILE_DEG), and are fresh
+for the time bucket they were fetched in (time // ttl_s), so every location
+in a tile shares one upstream request per bucket. A source whose answer does
+not depend on the location (tides: one configured CO-OPS station,
+NOAA_TIDE_STATION, serves every location) is untiled and keeps one entry. Concurrent misses on a
+tile share one in-flight fetch (single flight). Each source has a circuit
+breaker: after breaker_failures consecutive errors it stops calling the
+source for breaker_cooldown_s, then lets one trial request through.
+
+Fetches run on a private asyncio loop in a daemon thread with one aiohttp
+session (a bounded keep-alive connection pool), started on first use.
+Sources are plain (url, params, parse) triples, so tests and benchmarks
+point them at local fake servers.
+"""
+
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+import aiohttp
+
+import metrics
+
+FEED_SECONDS = metrics.REGISTRY.histogram(
+    'zer01ne_feed_fetch_seconds', 'Upstream feed fetch latency', ('source',))
+FEED_FETCHES = metrics.REGISTRY.counter(
+    'zer01ne_feed_fetches_total', 'Upstream feed fetches by outcome', ('source', 'outcome'))
+FEED_READS = metrics.REGISTRY.counter(
+    'zer01ne_feed_reads_total', 'Point reads from the feed cache by state', ('source', 'state'))
+
+FRESH, STALE, FALLBACK = 'fresh', 'stale', 'fallback'
+
+
+class FeedError(Exception):
+    """Upstream answered, but not with a usable body"""
+
+
+class FeedSource:
+    """One upstream feed: where to ask about a tile and how to read the answer
+
+    params(lat, lon, tile_deg, bucket_start) builds the query for the tile
+    centred on lat/lon (both None for an untiled source); parse(body) turns
+    the decoded JSON into a float, or None when the source has no data for
+    that tile.
+    """
+
+    __slots__ = ('name', 'url', 'params', 'parse', 'ttl_s', 'headers', 'tiled')
+
+    def __init__(self, name: str, url: str, params: Callable[..., Mapping], parse: Callable[[Any], Optional[float]],
+                 ttl_s: float, headers: Mapping[str, str] = None, tiled: bool = True):
+        self.name = name
+        self.url = url
+        self.params = params
+        self.parse = parse
+        self.ttl_s = ttl_s
+        self.headers = dict(headers or {})
+        self.tiled = tiled
+
+
+class CircuitBreaker:
+    """closed -> open after `failures` consecutive errors -> half-open (one trial) after `cooldown_s`"""
+
+    def __init__(self, failures: int = 5, cooldown_s: float = 30.0):
+        self.threshold = failures
+        self.cooldown_s = cooldown_s
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        return 'half_open' if self.trial else 'open'
+
+    def blocked(self, now: float) -> bool:
+        """Open and still cooling down (read-only, safe from any thread)"""
+        opened_at = self.opened_at
+        return opened_at is not None and (self.trial or now - opened_at < self.cooldown_s)
+
+    def allow(self, now: float) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.trial or now - self.opened_at < self.cooldown_s:
+            return False
+        self.trial = True       # the one request that decides whether to close
+        return True
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def failure(self, now: float):
+        self.failures += 1
+        if self.trial or self.failures >= self.threshold:
+            if self.opened_at is None:
+                self.trips += 1
+            self.opened_at = now
+            self.trial = False
+
+
+class _Entry:
+    __slots__ = ('value', 'bucket', 'fetched_at')
+
+    def __init__(self, value: Optional[float], bucket: int, fetched_at: float):
+        self.value = value
+        self.bucket = bucket
+        self.fetched_at = fetched_at
+
+
+class FeedClient:
+    """Tile/time-bucket cache in front of the upstream feeds (see module docstring)"""
+
+    def __init__(self, sources: Sequence[FeedSource], tile_deg: float = 0.25, max_entries: int = 10000,
+                 timeout_s: float = 5.0, pool_size: int = 8, breaker_failures: int = 5,
+                 breaker_cooldown_s: float = 30.0, clock: Callable[[], float] = time.time):
+        self.sources = {source.name: source for source in sources}
+        self.tile_deg = tile_deg
+        self.max_entries = max_entries
+        self.timeout_s = timeout_s
+        self.pool_size = pool_size
+        self.clock = clock
+        self.breakers = {name: CircuitBreaker(breaker_failures, breaker_cooldown_s) for name in self.sources}
+        self.last_error: Dict[str, str] = {}
+        self._cache: 'OrderedDict[Tuple, _Entry]' = OrderedDict()
+        self._pending = set()           # keys with a fetch scheduled or running (single flight)
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple, asyncio.Task] = {}     # loop thread only
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._idle = threading.Condition(self._lock)
+        self.reads = {FRESH: 0, STALE: 0, FALLBACK: 0}
+        self.fetches = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.evicted = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'FeedClient':
+        return cls(
+            default_sources(config),
+            tile_deg=config.FEED_TILE_DEG,
+            max_entries=config.FEED_MAX_ENTRIES,
+            timeout_s=config.FEED_TIMEOUT_S,
+            pool_size=config.FEED_POOL_SIZE,
+            breaker_failures=config.FEED_BREAKER_FAILURES,
+            breaker_cooldown_s=config.FEED_BREAKER_COOLDOWN_S
+        )
+
+    def key(self, name: str, lat: float, lon: float) -> Tuple[str, Optional[int], Optional[int]]:
+        if not self.sources[name].tiled:
+            return (name, None, None)
+        return (name, int(lat // self.tile_deg), int(lon // self.tile_deg))
+
+    def _bucket(self, source: FeedSource, now: float) -> int:
+        return int(now // source.ttl_s)
+
+    # ----- request path (any thread, never blocks on I/O) -----
+
+    def peek(self, name: str, lat: float, lon: float, default: float = None) -> Tuple[float, str]:
+        """Cached value for the tile around lat/lon and its state; schedules a refresh if not fresh"""
+        source = self.sources[name]
+        key = self.key(name, lat, lon)
+        now = self.clock()
+        bucket = self._bucket(source, now)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            schedule = ((entry is None or entry.bucket != bucket) and key not in self._pending
+                        and not self.breakers[name].blocked(now))
+            if schedule:
+                self._pending.add(key)
+            if entry is None or entry.value is None:
+                value, state = default, FALLBACK
+            else:
+                value, state = entry.value, FRESH if entry.bucket == bucket else STALE
+            self.reads[state] += 1
+        if metrics.ENABLED:
+            FEED_READS.labels(name, state).inc()
+        if schedule:
+            self._loop_or_start().call_soon_threadsafe(self._start_fetch, source, key)
+        return value, state
+
+    # ----- async API (any event loop) -----
+
+    async def get(self, name: str, lat: float, lon: float, default: float = None) -> Tuple[float, str]:
+        """Like peek(), but waits for the tile's fetch when nothing fresh is cached"""
+        value, state = self.peek(name, lat, lon, default)
+        if state == FRESH:
+            return value, state
+        loop = self._loop_or_start()
+        key = self.key(name, lat, lon)
+        waiter = asyncio.run_coroutine_threadsafe(self._wait(key), loop)
+        await asyncio.wrap_future(waiter)
+        return self.peek(name, lat, lon, default)
+
+    async def _wait(self, key: Tuple):
+        await asyncio.sleep(0)      # let the scheduled _start_fetch run first
+        task = self._inflight.get(key)
+        if task is not None:
+            await asyncio.shield(task)
+
+    # ----- loop thread -----
+
+    def _loop_or_start(self) -> asyncio.AbstractEventLoop:
+        loop = self._loop
+        if loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='feeds', daemon=True).start()
+                    self._loop = loop
+                loop = self._loop
+        return loop
+
+    def _start_fetch(self, source: FeedSource, key: Tuple):
+        if key in self._inflight:
+            return
+        if not self.breakers[source.name].allow(self.clock()):
+            self.short_circuited += 1
+            if metrics.ENABLED:
+                FEED_FETCHES.labels(source.name, 'short_circuited').inc()
+            self._done(key)
+            return
+        task = asyncio.ensure_future(self._fetch(source, key))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: (self._inflight.pop(key, None), self._done(key)))
+
+    def _done(self, key: Tuple):
+        with self._lock:
+            self._pending.discard(key)
+            if not self._pending:
+                self._idle.notify_all()
+
+    async def _fetch(self, source: FeedSource, key: Tuple):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout_s))
+        now = self.clock()
+        bucket = self._bucket(source, now)
+        lat = lon = None
+        if source.tiled:
+            lat = (key[1] + 0.5) * self.tile_deg
+            lon = (key[2] + 0.5) * self.tile_deg
+        params = source.params(lat, lon, self.tile_deg, bucket * source.ttl_s)
+        breaker = self.breakers[source.name]
+        self.fetches += 1
+        start = time.perf_counter()
+        try:
+            async with self._session.get(source.url, params=params, headers=source.headers) as response:
+                if response.status != 200:
+                    raise FeedError(f"HTTP {response.status}")
+                body = await response.json(content_type=None)
+            value = source.parse(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError, FeedError,
+                ValueError, KeyError, IndexError, TypeError) as e:
+            breaker.failure(self.clock())
+            self.failures += 1
+            if metrics.ENABLED:
+                FEED_FETCHES.labels(source.name, 'error').inc()
+            self.last_error[source.name] = f"{type(e).__name__}: {e}"
+            return
+        breaker.success()
+        if metrics.ENABLED:
+            FEED_SECONDS.labels(source.name).observe(time.perf_counter() - start)
+            FEED_FETCHES.labels(source.name, 'ok').inc()
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry.bucket <= bucket:
+                self._cache[key] = _Entry(value, bucket, now)
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self.evicted += 1
+
+    # ----- lifecycle -----
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until no fetch is scheduled or running; False on timeout"""
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def close(self, timeout: float = 5.0):
+        loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result(timeout)
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = len(self._cache)
+            pending = len(self._pending)
+            reads = dict(self.reads)
+        return {
+            'sources': {name: {'ttl_s': source.ttl_s, 'breaker': self.breakers[name].state,
+                               'breaker_trips': self.breakers[name].trips, 'last_error': self.last_error.get(name)}
+                        for name, source in self.sources.items()},
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'reads': reads,
+            'fetches': self.fetches,
+            'failures': self.failures,
+            'short_circuited': self.short_circuited,
+            'in_flight': pending,
+            'evicted': self.evicted
+        }
+
+
+# ============================================
+# UPSTREAM SOURCES
+# ============================================
+
+def _day(bucket_start: float) -> str:
+    return time.strftime('%Y%m%d', time.gmtime(bucket_start))
+
+
+def _wind_params(lat, lon, tile_deg, bucket_start):
+    day = _day(bucket_start)
+    return {'parameters': 'WS10M', 'community': 'RE', 'format': 'JSON',
+            'latitude': f"{lat:.4f}", 'longitude': f"{lon:.4f}", 'start': day, 'end': day}
+
+
+def parse_wind(body) -> Optional[float]:
+    """NASA POWER hourly point: latest non-fill WS10M (m/s at 10 m)"""
+    series = body['properties']['parameter']['WS10M']
+    values = [v for _, v in sorted(series.items()) if v is not None and v > -900]
+    return float(values[-1]) if values else None
+
+
+def _tide_params(station):
+    def params(lat, lon, tile_deg, bucket_start):
+        day = _day(bucket_start)
+        return {'product': 'predictions', 'datum': 'MLLW', 'interval': 'hilo', 'units': 'metric',
+                'time_zone': 'gmt', 'format': 'json', 'station': station, 'begin_date': day, 'end_date': day}
+    return params
+
+
+def parse_tides(body) -> Optional[float]:
+    """NOAA CO-OPS hi/lo predictions: half the day's range (m)"""
+    heights = [float(p['v']) for p in body.get('predictions', ())]
+    return (max(heights) - min(heights)) / 2 if len(heights) > 1 else None
+
+
+def _water_table_params(lat, lon, tile_deg, bucket_start):
+    half = tile_deg / 2
+    return {'format': 'json', 'parameterCd': '72019', 'siteStatus': 'active', 'period': 'P365D',
+            'bBox': f"{lon - half:.4f},{lat - half:.4f},{lon + half:.4f},{lat + half:.4f}"}
+
+
+def parse_water_table(body) -> Optional[float]:
+    """USGS NWIS groundwater levels (72019): median of each well's latest depth to water (ft)"""
+    depths = []
+    for series in body['value']['timeSeries']:
+        for block in series['values']:
+            if block['value']:
+                depths.append(float(block['value'][-1]['value']))
+    if not depths:
+        return None
+    depths.sort()
+    return depths[len(depths) // 2]
+
+
+def _credential(header: str, token: Optional[str]) -> Dict[str, str]:
+    return {header: token} if token else {}
+
+
+def default_sources(config) -> Sequence[FeedSource]:
+    """wind (NASA POWER), tides (NOAA CO-OPS) and water_table (USGS NWIS) from Config
+
+    Configured credentials go out as headers: NASA_API_KEY and USGS_TOKEN as
+    api.data.gov's X-Api-Key (the NASA and USGS Water Data gateways),
+    NOAA_TOKEN as NOAA's token header. Endpoints that need no key ignore
+    them. Tides come from the one NOAA_TIDE_STATION for every location, so
+    that source is untiled; set the station nearest the deployment.
+    """
+    return (
+        FeedSource('wind', config.NASA_POWER_URL, _wind_params, parse_wind, config.FEED_WIND_TTL_S,
+                   headers=_credential('X-Api-Key', config.NASA_API_KEY)),
+        FeedSource('tides', config.NOAA_TIDES_URL, _tide_params(config.NOAA_TIDE_STATION), parse_tides,
+                   config.FEED_TIDES_TTL_S, headers=_credential('token', config.NOAA_TOKEN), tiled=False),
+        FeedSource('water_table', config.USGS_GWLEVELS_URL, _water_table_params, parse_water_table,
+                   config.FEED_WATER_TABLE_TTL_S, headers=_credential('X-Api-Key', config.USGS_TOKEN))
+    )
@@ -0,0 +1,234 @@
+"""
+ZER01NE 67 - METRICS
+Counters and latency histograms rendered in the Prometheus text format.
+
+Recording is built for request threads: observe() and inc() only append to
+a deque (atomic, no lock), and whichever thread finds the backlog over
+FOLD_AT folds it into the buckets under a lock - the same flat-combining
+scheme AlertStore uses for commits. Scrapes fold everything first, so
+/metrics is always exact.
+"""
+
+import re
+import bisect
+import threading
+from collections import deque
+from itertools import count
+from typing import Dict, List, Sequence, Tuple
+
+ENABLED = True
+FOLD_AT = 512       # pending observations before a recording thread folds them
+
+# 1 us .. 10 s: covers a bond lookup and a slow Earth validation alike
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def enable(flag: bool = True):
+    """Turn recording on or off process-wide (instrumented code checks metrics.ENABLED)"""
+    global ENABLED
+    ENABLED = bool(flag)
+
+
+class _Child:
+    """One label combination: lock-free appends, folded in batches"""
+
+    __slots__ = ('_pending', '_lock')
+
+    def __init__(self):
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def _record(self, value):
+        self._pending.append(value)
+        if len(self._pending) >= FOLD_AT:
+            self._fold()
+
+    def _fold(self):
+        if not self._lock.acquire(blocking=False):
+            return      # another thread is folding; it will take our values too
+        try:
+            pending = self._pending
+            while pending:
+                self._apply(pending.popleft())
+        finally:
+            self._lock.release()
+
+    def _collect(self):
+        with self._lock:
+            pending = self._pending
+            while pending:
+                self._apply(pending.popleft())
+            return self._snapshot()
+
+
+class _CounterChild(_Child):
+    __slots__ = ('value',)
+
+    def __init__(self):
+        super().__init__()
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self._record(amount)
+
+    def _apply(self, amount):
+        self.value += amount
+
+    def _snapshot(self):
+        return self.value
+
+
+class _HistogramChild(_Child):
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        super().__init__()
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self._record(seconds)
+
+    def _apply(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def _snapshot(self):
+        return list(self.counts), self.sum, self.count
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], _Child] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        """The child for one label combination (create once, keep the reference on hot paths)"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _label_str(self, key: Tuple[str, ...], extra: str = '') -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child._collect()))
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+
+    def _render_child(self, key, value):
+        return [f"{self.name}{self._label_str(key)} {_number(value)}"]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, seconds: float):
+        self._default.observe(seconds)
+
+    def _render_child(self, key, snapshot):
+        counts, total, n = snapshot
+        lines, cumulative = [], 0
+        for bound, c in zip(self.buckets + (float('inf'),), counts):
+            cumulative += c
+            le = 'le="+Inf"' if bound == float('inf') else f'le="{_number(bound)}"'
+            lines.append(f"{self.name}_bucket{self._label_str(key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_str(key)} {_number(total)}")
+        lines.append(f"{self.name}_count{self._label_str(key)} {n}")
+        return lines
+
+
+class Registry:
+    """All metrics of the process, rendered together for /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Sampler:
+    """True on every n-th call (thread-safe: next() on itertools.count is atomic)"""
+
+    def __init__(self, every: int):
+        self.every = max(1, int(every))
+        self._calls = count()
+
+    def __call__(self) -> bool:
+        return next(self._calls) % self.every == 0
+
+
+def error_type(message) -> str:
+    """Bounded label for an error message: text before any ':' as snake_case"""
+    text = str(message).split(':', 1)[0]
+    slug = re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+    return slug[:48] or 'unknown'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
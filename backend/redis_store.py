@@ -0,0 +1,325 @@
+"""
+ZER01NE 67 - REDIS STATE STORE
+Shared pools, bonds, sessions and alerts so several workers can serve one system.
+
+Select it with STATE_STORE=redis. Pools, bonds and the bond index never change
+after creation (only the handshake counter does, and that lives in its own
+hash), so each worker keeps a read-through copy. Sessions are read from Redis
+every time because re-validation rewrites them, so a steady-state safety check
+costs two round trips: the session read, then one pipeline that counts the
+handshake, appends and updates alerts and, when the check raised one, syncs
+the local alert mirror. The spatial pool index and the Earth re-validation
+schedule stay per-process.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from dataclasses import asdict
+from typing import Dict, List, Mapping, Optional
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+from config import Config
+
+
+class RedisJSONMap(MutableMapping):
+    """One Redis hash of JSON values, with an optional local read-through cache"""
+
+    def __init__(self, client, key: str, cache: bool = False):
+        self.client = client
+        self.key = key
+        self.cache = {} if cache else None
+
+    def __getitem__(self, field):
+        if self.cache is not None and field in self.cache:
+            return self.cache[field]
+        raw = self.client.hget(self.key, field)
+        if raw is None:
+            raise KeyError(field)
+        value = json.loads(raw)
+        if self.cache is not None:
+            self.cache[field] = value
+        return value
+
+    def __setitem__(self, field, value):
+        self.client.hset(self.key, field, json.dumps(value))
+        if self.cache is not None:
+            self.cache[field] = value
+
+    def __delitem__(self, field):
+        self.forget(field)
+        if not self.client.hdel(self.key, field):
+            raise KeyError(field)
+
+    def __contains__(self, field):
+        if self.cache is not None and field in self.cache:
+            return True
+        return bool(self.client.hexists(self.key, field))
+
+    def __iter__(self):
+        return (f.decode() if isinstance(f, bytes) else f for f in self.client.hkeys(self.key))
+
+    def __len__(self):
+        return self.client.hlen(self.key)
+
+    def items(self):
+        return [(f.decode() if isinstance(f, bytes) else f, json.loads(v))
+                for f, v in self.client.hgetall(self.key).items()]
+
+    def forget(self, field):
+        """Drop a field from the local cache only"""
+        if self.cache is not None:
+            self.cache.pop(field, None)
+
+
+class RedisEarthResults:
+    """EarthResultStore on Redis: one key per result, expired by Redis (SETEX)"""
+
+    def __init__(self, client, prefix: str, ttl_s: float = None, enabled: bool = None):
+        self.client = client
+        self.prefix = prefix
+        self.ttl_s = int(Config.EARTH_RESULT_TTL_S if ttl_s is None else ttl_s)
+        self.enabled = Config.EARTH_RESULT_STORE_MAX > 0 if enabled is None else enabled
+
+    def put(self, key: str, result: Dict) -> Optional[str]:
+        if not self.enabled or self.ttl_s <= 0:     # SETEX rejects a zero TTL; it would expire at once anyway
+            return None
+        self.client.setex(f"{self.prefix}{key}", self.ttl_s, json.dumps(result))
+        return key
+
+    def get(self, key: str) -> Optional[Dict]:
+        raw = self.client.get(f"{self.prefix}{key}")
+        return json.loads(raw) if raw is not None else None
+
+    def discard(self, key: str):
+        self.client.delete(f"{self.prefix}{key}")
+
+    def stats(self) -> Dict:
+        return {'backend': 'redis', 'ttl_s': self.ttl_s, 'enabled': self.enabled}
+
+
+class RedisStateStore:
+    """State backend shared by all workers through Redis
+
+    Keys (under REDIS_KEY_PREFIX): `pools`, `bonds`, `handshakes`,
+    `sessions` and `bond_index` hashes, an `alerts` list in arrival order
+    with an `alerts:trimmed` counter, and one expiring `earth:<session_id>`
+    key per full validation result.
+    Each worker mirrors the alert list into its own AlertStore and catches
+    up with one range read whenever alerts are read. Pushes trim the list to
+    its newest ALERT_MAX_HISTORY entries and count what they dropped, so an
+    alert's position (trimmed count + list index) never changes. Pushes,
+    updates and range reads are Lua scripts that translate positions to list
+    indexes atomically; a plain LSET could land on the wrong entry if
+    another worker trimmed the list in between. A worker that falls more
+    than ALERT_MAX_HISTORY alerts behind skips the ones already trimmed.
+    
+    The mirror commits appends asynchronously (a thread that finds its commit
+    lock taken leaves them queued), so neither the next range offset nor an
+    update's position is read from it: the store counts the positions it has
+    synced, and remembers the position each alert this worker raised got.
+    """
+
+    backend = 'redis'
+
+    # KEYS: alerts list, trimmed counter, bonds hash. ARGV: max entries (0 keeps
+    # all), first position to read back, then (bond_id, alert) pairs; an alert
+    # is pushed when its bond_id is empty or still in bonds. Returns the end
+    # position, then the position of the first entry read back and the entries.
+    PUSH_SCRIPT = """
+local rows = {}
+for i = 3, #ARGV, 2 do
+    if ARGV[i] == '' or redis.call('HEXISTS', KEYS[3], ARGV[i]) == 1 then
+        rows[#rows + 1] = ARGV[i + 1]
+    end
+end
+local length = redis.call('LLEN', KEYS[1])
+for i = 1, #rows, 1000 do
+    length = redis.call('RPUSH', KEYS[1], unpack(rows, i, math.min(i + 999, #rows)))
+end
+local trimmed = tonumber(redis.call('GET', KEYS[2]) or 0)
+local limit = tonumber(ARGV[1])
+if limit > 0 and length > limit then
+    redis.call('LTRIM', KEYS[1], length - limit, -1)
+    trimmed = redis.call('INCRBY', KEYS[2], length - limit)
+    length = limit
+end
+local start = math.max(tonumber(ARGV[2]) - trimmed, 0)
+return {trimmed + length, trimmed + start, redis.call('LRANGE', KEYS[1], start, -1)}
+"""
+    # KEYS: alerts list, trimmed counter. ARGV: (position, alert) pairs; alerts
+    # already trimmed are skipped. Returns how many were set.
+    SET_SCRIPT = """
+local trimmed = tonumber(redis.call('GET', KEYS[2]) or 0)
+local length = redis.call('LLEN', KEYS[1])
+local set = 0
+for i = 1, #ARGV, 2 do
+    local index = tonumber(ARGV[i]) - trimmed
+    if index >= 0 and index < length then
+        redis.call('LSET', KEYS[1], index, ARGV[i + 1])
+        set = set + 1
+    end
+end
+return set
+"""
+    # KEYS: alerts list, trimmed counter. ARGV: first position to read.
+    # Returns the position of the first entry read and the entries.
+    RANGE_SCRIPT = """
+local trimmed = tonumber(redis.call('GET', KEYS[2]) or 0)
+local start = math.max(tonumber(ARGV[1]) - trimmed, 0)
+return {trimmed + start, redis.call('LRANGE', KEYS[1], start, -1)}
+"""
+
+    def __init__(self, client, alerts, alert_type, prefix: str = None):
+        self.client = client
+        self.prefix = prefix or Config.REDIS_KEY_PREFIX
+        self.alert_type = alert_type
+        self.pools = RedisJSONMap(client, self._key('pools'), cache=True)
+        self.bonds = RedisJSONMap(client, self._key('bonds'), cache=True)
+        self.sessions = RedisJSONMap(client, self._key('sessions'))
+        self.bond_index = RedisJSONMap(client, self._key('bond_index'), cache=True)
+        self.alerts = alerts    # local AlertStore mirror of the shared list
+        self.earth_results = RedisEarthResults(client, self._key('earth:'))
+        self._handshakes = self._key('handshakes')
+        self._alert_list = self._key('alerts')
+        self._alert_keys = (self._alert_list, self._key('alerts:trimmed'))
+        self.max_history = Config.ALERT_MAX_HISTORY
+        self._sync_lock = threading.Lock()
+        self._synced = 0            # positions pulled into the mirror (under _sync_lock)
+        self._indexes = OrderedDict()   # alert_id -> position, for alerts this worker pushed
+        self._index_lock = threading.Lock()
+        self.max_indexes = max(Config.ALERT_MAX_HISTORY, 1024)
+        self.round_trips = 0
+
+    @classmethod
+    def from_config(cls, alerts, alert_type):
+        """Connect with the REDIS_* settings through a shared connection pool"""
+        if not HAS_REDIS:
+            raise RuntimeError("STATE_STORE=redis needs the redis package - run: pip install redis")
+        pool = redis.ConnectionPool(host=Config.REDIS_HOST, port=Config.REDIS_PORT,
+                                    db=Config.REDIS_DB,
+                                    max_connections=Config.REDIS_MAX_CONNECTIONS)
+        return cls(redis.Redis(connection_pool=pool), alerts, alert_type)
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def record_checks(self, bonds: List[Mapping], alerts: List, updates: List = (),
+                      alert_rows: List[int] = None) -> List[Optional[int]]:
+        """Count one handshake per bond (in order), append alerts and apply alert updates
+
+        Existence checks, increments, the alert push (which also trims the
+        list and reads back what this worker has not synced yet) and in-place
+        updates go out in one transaction. Updated alerts were raised by this
+        worker, which kept the position their push gave them; an update to an
+        alert pushed in this same call is set in a second round trip. Other
+        workers' mirrors keep the alert as they first synced it.
+        alert_rows, when given, is the index into bonds of each alert; alerts
+        of bonds another worker has deleted are not pushed.
+        Returns each bond's count after its increment, or None for a bond
+        another worker has deleted.
+        """
+        pipe = self.client.pipeline()
+        for bond in bonds:
+            pipe.hexists(self.bonds.key, bond['bond_id'])
+            pipe.hincrby(self._handshakes, bond['bond_id'], 1)
+        if alerts:
+            rows = []
+            for k, alert in enumerate(alerts):
+                rows += [bonds[alert_rows[k]]['bond_id'] if alert_rows is not None else '',
+                         json.dumps(asdict(alert))]
+            pipe.eval(self.PUSH_SCRIPT, 3, *self._alert_keys, self.bonds.key,
+                      self.max_history, self._synced, *rows)
+        pairs, later = [], []
+        for alert, _ in updates:
+            if not self._position(pairs, alert):
+                later.append(alert)
+        if pairs:
+            pipe.eval(self.SET_SCRIPT, 2, *self._alert_keys, *pairs)
+        replies = pipe.execute()
+        self.round_trips += 1
+
+        counts, gone = [], []
+        for bond, exists, count in zip(bonds, replies[0::2], replies[1::2]):
+            if exists:
+                bond['handshakes'] = count
+                counts.append(count)
+            else:
+                gone.append(bond['bond_id'])
+                counts.append(None)
+        if gone:
+            self.client.hdel(self._handshakes, *gone)
+            for bond_id in gone:
+                self.bonds.forget(bond_id)
+                self.bond_index.forget(bond_id)
+
+        if alerts:
+            if alert_rows is not None:
+                alerts = [alert for alert, k in zip(alerts, alert_rows) if counts[k] is not None]
+            end, first, raw = replies[2 * len(bonds)]
+            self._pushed(alerts, end)
+            self._apply_range(first, raw)
+        if later:
+            pairs = []
+            for alert in later:
+                self._position(pairs, alert)
+            if pairs:
+                self.client.eval(self.SET_SCRIPT, 2, *self._alert_keys, *pairs)
+                self.round_trips += 1
+        if updates:
+            self.alerts.revise(updates)
+        return counts
+
+    def _pushed(self, alerts: List, end: int):
+        """Remember the position of alerts this worker pushed (the push returns the end position)"""
+        first = end - len(alerts)
+        with self._index_lock:
+            for i, alert in enumerate(alerts):
+                self._indexes[alert.alert_id] = first + i
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+
+    def _position(self, pairs: List, alert) -> bool:
+        """Queue an in-place update of an alert this worker pushed; False if its position is unknown"""
+        with self._index_lock:
+            position = self._indexes.pop(alert.alert_id, None) if alert.cleared else self._indexes.get(alert.alert_id)
+        if position is None:
+            return False
+        pairs += [position, json.dumps(asdict(alert))]
+        return True
+
+    def delete_bond(self, bond_id: str) -> bool:
+        self.bonds.forget(bond_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hdel(self.bonds.key, bond_id)
+        pipe.hdel(self._handshakes, bond_id)
+        return bool(pipe.execute()[0])
+
+    def sync_alerts(self):
+        """Append alerts pushed by any worker since the last sync, in list order"""
+        first, raw = self.client.eval(self.RANGE_SCRIPT, 2, *self._alert_keys, self._synced)
+        self._apply_range(first, raw)
+
+    def _apply_range(self, first: int, raw: List):
+        """Mirror list entries read from position first on, skipping any another thread already synced"""
+        end = first + len(raw)
+        with self._sync_lock:
+            raw = raw[max(self._synced - first, 0):]
+            self._synced = max(self._synced, end)
+            self.alerts.extend(self.alert_type(**json.loads(r)) for r in raw)
+
+    def stats(self) -> Dict:
+        return {
+            'backend': self.backend,
+            'prefix': self.prefix,
+            'round_trips': self.round_trips,
+            'synced_alerts': self._synced,
+            'cached_bonds': len(self.bonds.cache),
+            'cached_pools': len(self.pools.cache)
+        }
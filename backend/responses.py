@@ -0,0 +1,118 @@
+"""
+ZER01NE 67 - RESPONSE ENCODING
+Fast JSON (orjson when installed, stdlib otherwise), Accept-Encoding
+negotiation, gzip/deflate compression and pre-serialized constant bodies.
+
+Framework-neutral: the Flask app and async_app.py both build on these.
+"""
+
+import gzip
+import json
+import zlib
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, Optional
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+ENCODINGS = ('gzip', 'deflate')     # in order of preference
+
+_encoder = 'orjson' if HAS_ORJSON else 'stdlib'
+
+
+def _default(obj):
+    """Types neither encoder handles natively (numpy, models, enums)"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if HAS_ORJSON:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def use_encoder(name: str = 'auto') -> str:
+    """Select 'orjson', 'stdlib' or 'auto' (orjson if installed); returns the one in use"""
+    global _encoder
+    _encoder = 'orjson' if name in ('auto', 'orjson') and HAS_ORJSON else 'stdlib'
+    return _encoder
+
+
+def encoder() -> str:
+    return _encoder
+
+
+def dumps(obj) -> bytes:
+    """Compact JSON bytes"""
+    if _encoder == 'orjson':
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTS)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+
+def loads(data):
+    """Parse JSON from str or bytes; errors are json.JSONDecodeError either way"""
+    if _encoder == 'orjson':
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best encoding we support from an Accept-Encoding header, or None
+
+    Cached: clients send a handful of distinct header values.
+    """
+    if not accept_encoding:
+        return None
+    offered = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    best = None
+    for encoding in ENCODINGS:
+        q = offered.get(encoding, offered.get('*', 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (encoding, q)
+    return best[0] if best else None
+
+
+def compress(body: bytes, encoding: str, level: int = 5) -> bytes:
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == 'deflate':
+        return zlib.compress(body, level)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class Precomputed:
+    """A constant JSON body serialized once, with every compressed variant"""
+
+    __slots__ = ('body', 'variants')
+
+    def __init__(self, payload, level: int = 9):
+        self.body = dumps(payload)
+        self.variants: Dict[Optional[str], bytes] = {None: self.body}
+        for encoding in ENCODINGS:
+            self.variants[encoding] = compress(self.body, encoding, level)
+
+    def select(self, accept_encoding: Optional[str], min_bytes: int = 0):
+        """(body, encoding) for a request; small bodies are sent as-is"""
+        encoding = negotiate(accept_encoding) if len(self.body) >= min_bytes else None
+        return self.variants[encoding], encoding
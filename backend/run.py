@@ -2,14 +2,22 @@
 """
 SOVEREIGN QUANTUM SAFETY SYSTEM
 Launcher script - Run this to start everything
+
+Usage: python run.py [--skip-install] [--skip-demo]
 """
 
 import os
 import sys
+import argparse
 import subprocess
 import time
 
 def main():
+    parser = argparse.ArgumentParser(description="Install dependencies, run the demo and start the Flask server")
+    parser.add_argument('--skip-install', action='store_true', help='do not pip install requirements.txt')
+    parser.add_argument('--skip-demo', action='store_true', help='start the server without running the demo')
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("SOVEREIGN QUANTUM SAFETY SYSTEM")
     print("Launching complete system...")
@@ -21,12 +29,13 @@ def main():
         sys.exit(1)
     
     # Install dependencies if needed
-    print("\n📦 Checking dependencies...")
-    try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-    except:
-        print("⚠️  Could not install dependencies automatically")
-        print("   Run: pip install -r requirements.txt")
+    if not args.skip_install:
+        print("\n📦 Checking dependencies...")
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        except:
+            print("⚠️  Could not install dependencies automatically")
+            print("   Run: pip install -r requirements.txt")
     
     # Run the system
     print("\n🚀 Starting system...")
@@ -36,14 +45,16 @@ def main():
     spec.loader.exec_module(sq_system)
     
     # Run demo
-    bridge = sq_system.run_demo()
+    system = sq_system.get_system()
+    if not args.skip_demo:
+        sq_system.run_demo(system)
     
     # Start server
     if sq_system.HAS_FLASK:
         print("\n🌐 Starting Flask server...")
         print("   Listening on http://localhost:5000")
         print("   Press Ctrl+C to stop\n")
-        sq_system.app.run(host='0.0.0.0', port=5000, debug=False)
+        sq_system.create_app(system).run(host='0.0.0.0', port=5000, debug=False)
     else:
         print("\n❌ Flask not installed - cannot start server")
         print("   Install with: pip install flask flask-cors")
@@ -0,0 +1,437 @@
+"""
+ZER01NE 67 - SHARDED MODE
+N worker processes each own a hash-partition of pools, sessions and bonds.
+
+Every id a shard mints (pool, session, bond) hashes back to that shard, so
+the router forwards a request by looking at its id alone. Shards listen on
+local sockets (AF_UNIX, or named pipes on Windows) and exchange pickled
+(op, args) tuples with the router. /stats, /alerts and /pools/nearby are
+answered by scatter-gather across all shards.
+
+Usage: python sharding.py --shards 4
+"""
+
+import os
+import sys
+import zlib
+import heapq
+import queue
+import select
+import secrets
+import itertools
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Listener, Client, Pipe, wait
+from threading import Thread
+from typing import Dict, List, Tuple
+
+from config import Config
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Owning shard of an id (ids are hex; anything else still maps somewhere)"""
+    try:
+        return int(key[:8], 16) % shards
+    except (TypeError, ValueError):
+        return zlib.crc32(str(key).encode()) % shards
+
+
+class ShardError(RuntimeError):
+    """A shard raised while handling a forwarded request"""
+
+
+# ============================================
+# SHARD WORKER
+# ============================================
+
+def _alerts_page(system, since, cursor, limit, child_id, pool_id):
+    """One shard's page of alerts as (position, alert) rows plus its next cursor"""
+    alerts = system.safety.alerts
+    positions, next_cursor = alerts.query_positions(since, cursor, limit, child_id, pool_id)
+    return [(p, alerts[p].to_dict()) for p in positions], next_cursor
+
+
+SHARD_OPS = {
+    'ping': lambda system: True,
+    'register_location': lambda system, *a: system.register_location(*a),
+    'create_family_bond': lambda system, *a: system.create_family_bond(*a),
+    'remove_family_bond': lambda system, *a: system.remove_family_bond(*a),
+    'get_earth_result': lambda system, *a: system.get_earth_result(*a),
+    'safety_check': lambda system, *a: system.safety_check(*a),
+    'safety_check_batch': lambda system, *a: system.safety_check_batch(*a),
+    'get_stats': lambda system: system.get_stats(),
+    'alerts_page': _alerts_page,
+    'alerts_meta': lambda system: (system.safety.alerts.version, len(system.safety.alerts)),
+    'pools_near': lambda system, *a: system.safety.pools_near(*a),
+}
+
+
+def _answer(system, conn) -> bool:
+    """Answer one (op, args) request; False once the router has closed the connection"""
+    try:
+        op, args = conn.recv()
+    except (EOFError, OSError):
+        return False
+    try:
+        reply = (True, SHARD_OPS[op](system, *args))
+    except Exception as e:
+        reply = (False, f"{type(e).__name__}: {e}")
+    try:
+        conn.send(reply)
+    except OSError:
+        return False
+    return True
+
+
+STICKY_S = 0.001         # how long a worker waits for the next request on the connection it just answered
+STICKY_REQUESTS = 256    # ...before handing the connection back so others get a turn
+
+
+def _readable(conn, timeout: float) -> bool:
+    """conn.poll(timeout), minus the selector Connection.poll builds per call (POSIX sockets)"""
+    if sys.platform == 'win32':
+        return conn.poll(timeout)
+    return bool(select.select([conn], [], [], timeout)[0])
+
+
+def _serve(system, listener, workers: int):
+    """Answer every router connection from a fixed pool of worker threads
+
+    One thread accepts and this one waits for connections with a request
+    ready. A connection leaves the wait set while a worker answers it, so
+    its replies stay in order, and idle connections hold no thread.
+    """
+    waiting = set()
+    lock = threading.Lock()
+    wake_recv, wake_send = Pipe(duplex=False)
+    woken = [False]
+    jobs = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='zer01ne-shard')
+
+    def ready(conn):
+        with lock:
+            waiting.add(conn)
+            if not woken[0]:
+                woken[0] = True
+                wake_send.send_bytes(b'')
+
+    def accept():
+        while True:
+            try:
+                conn = listener.accept()
+            except (multiprocessing.AuthenticationError, EOFError, ConnectionError):
+                continue        # one client failed the handshake
+            except OSError:
+                return          # listener closed
+            ready(conn)
+
+    def answer(conn):
+        # A busy connection keeps its worker for a few requests instead of a round trip through wait()
+        for _ in range(STICKY_REQUESTS):
+            if not _answer(system, conn):
+                conn.close()
+                return
+            if not _readable(conn, STICKY_S):
+                break
+        ready(conn)
+
+    Thread(target=accept, daemon=True).start()
+    while True:
+        with lock:
+            conns = list(waiting)
+        for conn in wait(conns + [wake_recv]):
+            if conn is wake_recv:
+                with lock:
+                    wake_recv.recv_bytes()
+                    woken[0] = False
+                continue
+            with lock:
+                waiting.discard(conn)
+            jobs.submit(answer, conn)
+
+
+def serve_shard(index: int, shards: int, authkey: bytes, ready):
+    """Shard process entry point: own one partition and serve it on a local socket"""
+    from sovereign_quantum_system import ZER01NE67, MemoryStateStore
+
+    store = MemoryStateStore(journaled=bool(Config.WAL_DIR))
+    if Config.WAL_DIR:
+        # One log per shard index, so recovery needs the same --shards
+        from wal_store import DurableState
+        DurableState.from_config(store, directory=os.path.join(Config.WAL_DIR, f"shard-{index}")).recover()
+    system = ZER01NE67(store=store)
+    system.safety.owns = lambda key: shard_of(key, shards) == index
+
+    listener = Listener(authkey=authkey)
+    ready.send(listener.address)
+    ready.close()
+    _serve(system, listener, Config.SHARD_WORKERS)
+
+
+# ============================================
+# ROUTER
+# ============================================
+
+class ShardedAlerts:
+    """The bits of AlertStore the /alerts route reads, summed over shards"""
+
+    def __init__(self, router: 'ShardRouter'):
+        self.router = router
+
+    @property
+    def version(self) -> int:
+        return sum(v for v, _ in self.router.broadcast('alerts_meta'))
+
+    def __len__(self):
+        return sum(n for _, n in self.router.broadcast('alerts_meta'))
+
+
+class ShardedSafety:
+    """Scatter-gather stand-in for ZER01NE67.safety"""
+
+    stream = None   # live SSE stays per-process
+
+    def __init__(self, router: 'ShardRouter'):
+        self.router = router
+        self.alerts = ShardedAlerts(router)
+
+    def alerts_version(self) -> int:
+        return self.alerts.version
+
+    def query_alerts(self, since: int = None, cursor=None, limit: int = None,
+                     child_id: str = None, pool_id: str = None) -> Dict:
+        """Merge each shard's page by timestamp
+
+        The cursor is one position per shard joined with dots ("12.0.7").
+        Raises ValueError for any other cursor (a plain position only fits
+        a single shard).
+        """
+        n = self.router.shards
+        if cursor is None:
+            cursors = [0] * n
+        elif isinstance(cursor, int) and n == 1:
+            cursors = [cursor]
+        else:
+            parts = str(cursor).split('.')
+            if len(parts) != n or not all(part.isdigit() for part in parts):
+                raise ValueError(f"cursor must be {n} positions joined with dots, as returned in next_cursor")
+            cursors = [int(part) for part in parts]
+
+        pages = self.router.scatter([
+            (i, 'alerts_page', (since, cursors[i] or None, limit, child_id, pool_id))
+            for i in range(n)
+        ])
+        merged = heapq.merge(*[
+            [(alert['timestamp'], i, position, alert) for position, alert in rows]
+            for i, (rows, _) in enumerate(pages)
+        ])
+        taken = list(itertools.islice(merged, limit))
+
+        # A shard whose whole page was used resumes from its own next cursor,
+        # otherwise from just after the last alert taken from it
+        used = [0] * n
+        for _, i, position, _ in taken:
+            cursors[i] = position + 1
+            used[i] += 1
+        for i, (rows, next_cursor) in enumerate(pages):
+            if used[i] == len(rows):
+                cursors[i] = next_cursor
+
+        return {
+            'alerts': [alert for _, _, _, alert in taken],
+            'next_cursor': '.'.join(str(c) for c in cursors)
+        }
+
+    def pools_near(self, lat: float, lon: float, radius_m: float = None, k: int = None) -> List[Dict]:
+        pools = [p for part in self.router.broadcast('pools_near', lat, lon, radius_m, k) for p in part]
+        pools.sort(key=lambda p: p['distance_m'])
+        return pools[:k] if k is not None else pools
+
+
+class ShardRouter:
+    """Forwards ZER01NE67 calls to the owning shard
+
+    Exposes the same methods the Flask routes use, so it can replace the
+    module-level `system`. Connections are pooled per shard; scatter()
+    sends every request before reading any reply, so shards work in parallel.
+    At most SHARD_CONNECTIONS are open to a shard (further callers wait) and
+    SHARD_IDLE_CONNECTIONS of them stay open between requests.
+    """
+
+    SUM_STATS = ('sessions', 'pools', 'bonds', 'alerts', 'earth_handshakes')
+
+    def __init__(self, addresses: List, authkey: bytes):
+        from sovereign_quantum_system import EarthValidator, EarthPointCache, make_feeds
+
+        self.addresses = list(addresses)
+        self.shards = len(self.addresses)
+        self.authkey = authkey
+        self._idle = [queue.LifoQueue() for _ in self.addresses]
+        self._slots = [threading.BoundedSemaphore(Config.SHARD_CONNECTIONS) for _ in self.addresses]
+        self._next_shard = itertools.count()
+        self.earth = EarthValidator(cache=EarthPointCache(), feeds=make_feeds())   # /earth/validate stays local
+        self.safety = ShardedSafety(self)
+
+    def _acquire(self, shard: int):
+        """A connection to shard, waiting while SHARD_CONNECTIONS are out"""
+        self._slots[shard].acquire()
+        try:
+            return self._idle[shard].get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return Client(self.addresses[shard], authkey=self.authkey)
+        except BaseException:
+            self._slots[shard].release()
+            raise
+
+    def _release(self, shard: int, conn, broken: bool = False):
+        """Return a connection to the pool (closed if broken or surplus)"""
+        if broken or self._idle[shard].qsize() >= Config.SHARD_IDLE_CONNECTIONS:
+            conn.close()
+        else:
+            self._idle[shard].put(conn)
+        self._slots[shard].release()
+
+    def scatter(self, calls: List[Tuple[int, str, tuple]]) -> List:
+        """Run (shard, op, args) calls concurrently (at most one per shard); replies in call order"""
+        # Take connections in shard order, so concurrent scatters waiting on full pools cannot deadlock
+        conns = [None] * len(calls)
+        try:
+            for c in sorted(range(len(calls)), key=lambda c: calls[c][0]):
+                conns[c] = self._acquire(calls[c][0])
+            for conn, (_, op, args) in zip(conns, calls):
+                conn.send((op, args))
+            replies = [conn.recv() for conn in conns]
+        except BaseException:
+            for conn, (shard, _, _) in zip(conns, calls):
+                if conn is not None:
+                    self._release(shard, conn, broken=True)
+            raise
+        for conn, (shard, _, _) in zip(conns, calls):
+            self._release(shard, conn)
+        for ok, result in replies:
+            if not ok:
+                raise ShardError(result)
+        return [result for _, result in replies]
+
+    def call(self, shard: int, op: str, *args):
+        return self.scatter([(shard, op, args)])[0]
+
+    def broadcast(self, op: str, *args) -> List:
+        return self.scatter([(i, op, args) for i in range(self.shards)])
+
+    def shard_of(self, key: str) -> int:
+        return shard_of(key, self.shards)
+
+    def register_location(self, owner_id: str, lat: float, lon: float,
+                          depth_m: float = 1.2, name: str = "Pool") -> Dict:
+        """New pools go round-robin; their ids pin them to that shard"""
+        shard = next(self._next_shard) % self.shards
+        return self.call(shard, 'register_location', owner_id, lat, lon, depth_m, name)
+
+    def create_family_bond(self, session_id: str, mother_id: str, child_id: str) -> Dict:
+        return self.call(self.shard_of(session_id), 'create_family_bond', session_id, mother_id, child_id)
+
+    def remove_family_bond(self, bond_id: str) -> Dict:
+        return self.call(self.shard_of(bond_id), 'remove_family_bond', bond_id)
+
+    def get_earth_result(self, session_id: str) -> Dict:
+        return self.call(self.shard_of(session_id), 'get_earth_result', session_id)
+
+    def safety_check(self, bond_id: str, child, deadline_ms: float = None) -> Dict:
+        return self.call(self.shard_of(bond_id), 'safety_check', bond_id, child, deadline_ms)
+
+    def safety_check_batch(self, bond_ids: List[str], child_ids: List[str], distances: List[float],
+                           moving_toward: List[bool], heart_rates: List[float],
+                           lats: List[float] = None, lons: List[float] = None) -> List[Dict]:
+        """Split the batch by owning shard, run the parts in parallel, restore input order"""
+        parts: Dict[int, List[int]] = {}
+        for i, bond_id in enumerate(bond_ids):
+            parts.setdefault(self.shard_of(bond_id), []).append(i)
+
+        def pick(column, rows):
+            return None if column is None else [column[i] for i in rows]
+
+        calls = [
+            (shard, 'safety_check_batch', tuple(pick(col, rows) for col in (
+                bond_ids, child_ids, distances, moving_toward, heart_rates, lats, lons)))
+            for shard, rows in parts.items()
+        ]
+        results = [None] * len(bond_ids)
+        for rows, part in zip(parts.values(), self.scatter(calls)):
+            for i, result in zip(rows, part):
+                results[i] = result
+        return results
+
+    def get_stats(self) -> Dict:
+        """Shard stats summed; per-shard sections (caches, telemetry, memory...) only under 'shard_stats'"""
+        per_shard = self.broadcast('get_stats')
+        stats = {key: value for key, value in per_shard[0].items() if not isinstance(value, dict)}
+        for key in self.SUM_STATS:
+            stats[key] = sum(s[key] for s in per_shard)
+        stats['phase'] = max(per_shard, key=lambda s: s['earth_handshakes'])['phase']
+        stats['shards'] = self.shards
+        stats['shard_stats'] = per_shard
+        return stats
+
+
+class ShardCluster:
+    """Starts the shard processes and hands out routers connected to them"""
+
+    def __init__(self, shards: int = None):
+        self.shards = shards or Config.SHARDS or os.cpu_count() or 1
+        self.authkey = secrets.token_bytes(32)
+        self.addresses = []
+        self.processes = []
+
+    def start(self) -> 'ShardCluster':
+        ctx = multiprocessing.get_context('spawn')
+        pipes = []
+        for index in range(self.shards):
+            recv_end, send_end = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=serve_shard, args=(index, self.shards, self.authkey, send_end),
+                               name=f"zer01ne-shard-{index}", daemon=True)
+            proc.start()
+            send_end.close()
+            self.processes.append(proc)
+            pipes.append(recv_end)
+        self.addresses = [pipe.recv() for pipe in pipes]
+        return self
+
+    def router(self) -> ShardRouter:
+        return ShardRouter(self.addresses, self.authkey)
+
+    def stop(self):
+        for proc in self.processes:
+            proc.terminate()
+        for proc in self.processes:
+            proc.join()
+        self.processes = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with N shard processes behind one router")
+    parser.add_argument('--shards', type=int, default=None, help='shard processes (default: SHARDS or CPU count)')
+    args = parser.parse_args()
+
+    import sovereign_quantum_system as sq
+    if not sq.HAS_FLASK:
+        print("❌ Flask not installed - cannot start server")
+        sys.exit(1)
+
+    with ShardCluster(args.shards) as cluster:
+        app = sq.create_app(cluster.router())
+        print(f"🌐 Routing to {cluster.shards} shards on http://localhost:{Config.PORT}")
+        app.run(host=Config.HOST, port=Config.PORT, debug=False, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,37 +4,53 @@ ZER01NE 67 - COMPLETE SYSTEM
 ONE FILE - READY TO RUN
 """
 
+import sys
 import math
+import importlib
+import importlib.util
+import array
 import hashlib
 import time
 import json
 import hmac
 import secrets
+import bisect
+import heapq
+import threading
+from collections import OrderedDict, deque
+from itertools import islice
+from collections.abc import Mapping, MutableMapping
+from functools import partial
 from datetime import datetime, timezone
 from typing import Optional, Dict, List, Tuple, Any
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, is_dataclass, replace
 from enum import Enum
-import numpy as np
 
-try:
-    from flask import Flask, request, jsonify, send_from_directory
-    from flask_cors import CORS
-    HAS_FLASK = True
-except ImportError:
-    HAS_FLASK = False
-    print("âš ï¸ Flask not installed - run: pip install flask flask-cors")
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access
 
-try:
-    from cryptography.fernet import Fernet
-    HAS_CRYPTO = True
-except ImportError:
-    HAS_CRYPTO = False
+    Keeps numpy (and anything else heavy) off the import path of code that
+    never touches it. Attributes are cached on the proxy after first use.
+    """
 
-try:
-    import pyproj
-    HAS_PROJ = True
-except ImportError:
-    HAS_PROJ = False
+    def __init__(self, name: str):
+        self.__name = name
+    
+    def __getattr__(self, attr):
+        value = getattr(importlib.import_module(self.__name), attr)
+        setattr(self, attr, value)
+        return value
+
+np = LazyModule('numpy')    # only the batch paths (validate_location_many, safety_check_batch) need it
+
+# Optional dependencies are probed, not imported - servers import them when they start
+def _available(*names: str) -> bool:
+    return all(importlib.util.find_spec(name) is not None for name in names)
+
+HAS_FLASK = _available('flask', 'flask_cors')
+HAS_CRYPTO = _available('cryptography')
+HAS_PROJ = _available('pyproj')
+HAS_AIOHTTP = _available('aiohttp')
 
 # Import config
 try:
@@ -56,6 +72,127 @@ except ImportError:
         HOST = "0.0.0.0"
         DEBUG = False
         SECRET_KEY = "your-secret-key-here"
+        EARTH_CACHE_GRID_DEG = 0.0001
+        EARTH_CACHE_ALT_BAND_M = 10.0
+        EARTH_CACHE_MAX_ENTRIES = 10000
+        EARTH_CACHE_TTL_S = 3600
+        EARTH_REVALIDATE_TTL_S = 300
+        EARTH_RESULT_STORE_MAX = 10000
+        EARTH_RESULT_TTL_S = 3600
+        POOL_ALARM_RADIUS_M = 4828.0
+        POOL_INDEX_CELL_DEG = 0.01
+        COLUMNAR_STORE = False
+        STATE_STORE = 'memory'
+        REDIS_HOST = 'localhost'
+        REDIS_PORT = 6379
+        REDIS_DB = 0
+        REDIS_KEY_PREFIX = 'zer01ne'
+        REDIS_MAX_CONNECTIONS = 50
+        SHARDS = 0
+        SHARD_WORKERS = 16
+        SHARD_CONNECTIONS = 32
+        SHARD_IDLE_CONNECTIONS = 8
+        WAL_DIR = ''
+        WAL_FSYNC = True
+        WAL_SYNC_COMMIT = True
+        WAL_COMMIT_DELAY_MS = 0.0
+        WAL_SNAPSHOT_S = 300.0
+        WAL_SNAPSHOT_MB = 64.0
+        WAL_ENCRYPT = False
+        ASYNC_EARTH_THREADS = 4
+        ASYNC_EARTH_PROCESSES = 0
+        ASYNC_KEEPALIVE_S = 75.0
+        ASYNC_BACKLOG = 4096
+        ALERT_STREAM_QUEUE_SIZE = 256
+        ALERT_STREAM_MAX_SUBSCRIBERS = 10000
+        ALERT_STREAM_OVERFLOW = 'disconnect'
+        ALERT_STREAM_REPLAY_LIMIT = 1000
+        ALERT_STREAM_KEEPALIVE_S = 15
+        JSON_ENCODER = 'auto'
+        RESPONSE_COMPRESS_MIN_BYTES = 1024
+        RESPONSE_COMPRESS_LEVEL = 5
+        METRICS_ENABLED = True
+        METRICS_POINT_SAMPLE = 8
+        SPEED_OF_SOUND = 343.0
+        TELEMETRY_MAX_CHILDREN = 100000
+        TELEMETRY_WINDOW = 8
+        TELEMETRY_HORIZON_S = 30.0
+        TELEMETRY_MAX_SPEED_MPS = 60.0
+        TELEMETRY_GPS_TOLERANCE_M = 25.0
+        TELEMETRY_MAX_REJECTS = 3
+        TELEMETRY_HR_ALPHA = 0.3
+        TELEMETRY_APPROACH_MPS = 0.2
+        ALERT_RAISE_THRESHOLD = 0.8
+        ALERT_CLEAR_THRESHOLD = 0.6
+        ALERT_RENOTIFY_S = 60.0
+        ALERT_DEBOUNCE_STALE_S = 300.0
+        ALERT_MAX_HISTORY = 100000
+        ALERT_MAX_AGE_S = 0.0
+        SESSION_IDLE_TTL_S = 0.0
+        BOND_IDLE_TTL_S = 0.0
+        MEMORY_BUDGET_MB = 0.0
+        RETENTION_SWEEP_S = 60.0
+        SOS_WEBHOOK = None
+        STATE_FARM_WEBHOOK = None
+        ALLSTATE_WEBHOOK = None
+        DISPATCH_SOS_WORKERS = 2
+        DISPATCH_SOS_SLO_MS = 1000.0
+        DISPATCH_QUEUE_SIZE = 10000
+        DISPATCH_BATCH_SIZE = 100
+        DISPATCH_BATCH_LINGER_S = 2.0
+        DISPATCH_MAX_ATTEMPTS = 5
+        DISPATCH_BACKOFF_S = 0.1
+        DISPATCH_BACKOFF_MAX_S = 10.0
+        DISPATCH_TIMEOUT_S = 5.0
+        DISPATCH_POOL_SIZE = 4
+        NASA_API_KEY = 'DEMO_KEY'
+        NOAA_TOKEN = None
+        USGS_TOKEN = None
+        NASA_POWER_URL = 'https://power.larc.nasa.gov/api/temporal/hourly/point'
+        NOAA_TIDES_URL = 'https://api.tidesandcurrents.noaa.gov/api/prod/datagetter'
+        NOAA_TIDE_STATION = '9410230'
+        USGS_GWLEVELS_URL = 'https://waterservices.usgs.gov/nwis/gwlevels/'
+        FEEDS_ENABLED = False
+        FEED_TILE_DEG = 0.25
+        FEED_WIND_TTL_S = 3600.0
+        FEED_TIDES_TTL_S = 21600.0
+        FEED_WATER_TABLE_TTL_S = 86400.0
+        FEED_MAX_ENTRIES = 10000
+        FEED_TIMEOUT_S = 5.0
+        FEED_POOL_SIZE = 8
+        FEED_BREAKER_FAILURES = 5
+        FEED_BREAKER_COOLDOWN_S = 30.0
+
+import responses
+from responses import Precomputed
+responses.use_encoder(Config.JSON_ENCODER)
+
+import metrics
+metrics.enable(Config.METRICS_ENABLED)
+
+# ============================================
+# INSTRUMENTATION (served at /metrics)
+# ============================================
+
+HTTP_SECONDS = metrics.REGISTRY.histogram(
+    'zer01ne_http_request_duration_seconds', 'Request latency by route', ('method', 'route'))
+HTTP_REQUESTS = metrics.REGISTRY.counter(
+    'zer01ne_http_requests_total', 'Requests by route and status', ('method', 'route', 'status'))
+EARTH_SECONDS = metrics.REGISTRY.histogram(
+    'zer01ne_earth_validation_duration_seconds', 'EarthValidator.validate_location latency')
+POINT_SECONDS = metrics.REGISTRY.histogram(
+    'zer01ne_earth_point_duration_seconds',
+    'Per-point latency, sampled on every METRICS_POINT_SAMPLE-th point evaluation', ('point',))
+SAFETY_SECONDS = metrics.REGISTRY.histogram(
+    'zer01ne_safety_check_duration_seconds', 'ChildSafetyAPI.check_safety latency')
+BOND_LOOKUP_SECONDS = metrics.REGISTRY.histogram(
+    'zer01ne_bond_lookup_duration_seconds', 'Bond index lookup latency in ZER01NE67.safety_check')
+ALERTS_RAISED = metrics.REGISTRY.counter('zer01ne_alerts_raised_total', 'Safety alerts raised')
+SAFETY_HANDSHAKES = metrics.REGISTRY.counter(
+    'zer01ne_safety_handshakes_total', 'Bond handshakes recorded by safety checks')
+EARTH_HANDSHAKES = metrics.REGISTRY.counter('zer01ne_earth_handshakes_total', 'Earth validation handshakes')
+ERRORS = metrics.REGISTRY.counter('zer01ne_errors_total', 'Error responses and exceptions by type', ('type',))
+_sample_points = metrics.Sampler(Config.METRICS_POINT_SAMPLE)
 
 # ============================================
 # ENUMS
@@ -76,16 +213,19 @@ class PhaseState(str, Enum):
 # DATA MODELS
 # ============================================
 
-@dataclass
+# Slotted dataclasses (no per-instance __dict__) where the interpreter supports it
+model = dataclass(slots=True) if sys.version_info >= (3, 10) else dataclass
+
+@model
 class ChildState:
     """Child's current state"""
     child_id: str
-    lat: float = 0.0
-    lon: float = 0.0
+    lat: Optional[float] = None     # no position reported: distance_to_pool is used as sent
+    lon: Optional[float] = None
     distance_to_pool: float = 0.0
     moving_toward_pool: bool = False
     heart_rate: float = 60.0
-    timestamp: int = field(default_factory=lambda: int(time.time() * 1000))
+    timestamp: int = field(default_factory=lambda: int(time.time() * 1000))   # device clock; checks use the server's
     
     def to_dict(self):
         return {
@@ -98,7 +238,7 @@ class ChildState:
             'timestamp': self.timestamp
         }
 
-@dataclass
+@model
 class SafetyAlert:
     alert_id: str
     child_id: str
@@ -107,6 +247,11 @@ class SafetyAlert:
     timestamp: int = field(default_factory=lambda: int(time.time() * 1000))
     triggered: bool = False
     satelite_sos_sent: bool = False
+    last_seen: int = 0              # latest reading folded into this alert
+    peak_probability: float = 0.0
+    count: int = 1                  # readings while the alert was open
+    notifications: int = 1          # raise plus re-notifications
+    cleared: bool = False
     
     def to_dict(self):
         return {
@@ -116,86 +261,643 @@ class SafetyAlert:
             'danger_probability': self.danger_probability,
             'timestamp': self.timestamp,
             'triggered': self.triggered,
-            'satelite_sos_sent': self.satelite_sos_sent
+            'satelite_sos_sent': self.satelite_sos_sent,
+            'last_seen': self.last_seen,
+            'peak_probability': self.peak_probability,
+            'count': self.count,
+            'notifications': self.notifications,
+            'cleared': self.cleared
         }
 
+@model
+class TrackReading:
+    """What a child's rolling telemetry says after one reading"""
+    accepted: bool
+    heart_rate: float                       # EWMA of the reported heart rate
+    heart_rate_std: float
+    velocity_mps: Optional[float] = None    # toward the pool, > 0 approaching
+    time_to_pool_s: Optional[float] = None
+    speed_mps: float = 0.0                  # implied by this fix vs the last accepted one
+    samples: int = 0
+
+# ============================================
+# COLUMNAR STORAGE (optional, Config.COLUMNAR_STORE)
+# ============================================
+
+class ColumnarRow(MutableMapping):
+    """Dict-like view of one table row; writes go straight to the columns
+    
+    Views are transient: deleting another row may move this one.
+    """
+    
+    __slots__ = ('_table', '_row')
+    
+    def __init__(self, table: 'ColumnarTable', row: int):
+        self._table = table
+        self._row = row
+    
+    def __getitem__(self, name):
+        if name == self._table.key:
+            return self._table._keys[self._row]
+        return self._table._columns[name][self._row]
+    
+    def __setitem__(self, name, value):
+        self._table._columns[name][self._row] = self._table._convert(name, value)
+    
+    def __delitem__(self, name):
+        raise TypeError('columns cannot be removed from a row')
+    
+    def __iter__(self):
+        yield self._table.key
+        yield from self._table._columns
+    
+    def __len__(self):
+        return len(self._table._columns) + 1
+
+
+class ColumnarTable(MutableMapping):
+    """id -> row mapping stored column-wise
+    
+    Numeric columns are `array.array`s (e.g. 'f' float32, 'q' int64), 'str'
+    columns are lists of interned strings. Behaves like the dict of dicts it
+    replaces: table[key] returns a ColumnarRow and table[key] = {...} writes one.
+    """
+    
+    def __init__(self, key: str, schema: Dict[str, str]):
+        self.key = key
+        self.schema = schema
+        self._columns = {name: [] if code == 'str' else array.array(code)
+                         for name, code in schema.items()}
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()   # guards row inserts and moves
+        self.journal = None     # callable(key, record or None) after each set/delete (write-ahead log)
+    
+    def _convert(self, name, value):
+        return sys.intern(value) if self.schema[name] == 'str' and value is not None else value
+    
+    def __contains__(self, key):
+        return key in self._rows
+    
+    def __getitem__(self, key) -> ColumnarRow:
+        return ColumnarRow(self, self._rows[key])
+    
+    def __setitem__(self, key, record: Mapping):
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                for name, column in self._columns.items():
+                    column.append(self._convert(name, record[name]))
+                self._keys.append(sys.intern(key))
+                self._rows[key] = len(self._keys) - 1
+            else:
+                for name, column in self._columns.items():
+                    column[row] = self._convert(name, record[name])
+            if self.journal is not None:
+                record = dict(record)   # a ColumnarRow view may move once the lock is released
+        if self.journal is not None:
+            self.journal(key, record)
+    
+    def __delitem__(self, key):
+        with self._lock:
+            row = self._rows.pop(key)
+            last = len(self._keys) - 1
+            if row != last:
+                # Move the last row into the hole
+                moved = self._keys[last]
+                self._keys[row] = moved
+                self._rows[moved] = row
+                for column in self._columns.values():
+                    column[row] = column[last]
+            self._keys.pop()
+            for column in self._columns.values():
+                column.pop()
+        if self.journal is not None:
+            self.journal(key, None)
+    
+    def __iter__(self):
+        return iter(self._keys)
+    
+    def __len__(self):
+        return len(self._keys)
+
+    def export(self) -> Tuple[List[str], Dict[str, Any]]:
+        """Copies of the keys and columns, taken under the row lock (snapshots)"""
+        with self._lock:
+            return self._keys[:], {name: column[:] for name, column in self._columns.items()}
+    
+    def load(self, keys: List[str], columns: Dict[str, Any]):
+        """Replace the contents with keys and columns (recovery); not journaled"""
+        loaded = {}
+        for name, code in self.schema.items():
+            values = columns[name]
+            if code == 'str':
+                loaded[name] = [None if v is None else sys.intern(v) for v in values]
+            elif isinstance(values, array.array) and values.typecode == code:
+                loaded[name] = values
+            else:
+                loaded[name] = array.array(code, values)
+        keys = list(map(sys.intern, keys))
+        with self._lock:
+            self._keys = keys
+            self._rows = {key: row for row, key in enumerate(keys)}
+            self._columns = loaded
+
+
+class JournaledDict(dict):
+    """dict that reports each set and delete to `journal(key, value or None)`
+    
+    Used for the memory store's tables when a write-ahead log is on; reads
+    are plain dict reads. dict.update() bypasses the journal (recovery).
+    """
+    
+    __slots__ = ('journal',)
+    
+    def __init__(self):
+        super().__init__()
+        self.journal = None
+    
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        if self.journal is not None:
+            self.journal(key, value)
+    
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        if self.journal is not None:
+            self.journal(key, None)
+    
+    def pop(self, key, *default):
+        value = dict.pop(self, key, _MISSING)
+        if value is _MISSING:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        if self.journal is not None:
+            self.journal(key, None)
+        return value
+
+
+_MISSING = object()
+
+SESSION_SCHEMA = {'pool_id': 'str', 'name': 'str', 'lat': 'd', 'lon': 'd',
+                  'collapse_state': 'str', 'average_confidence': 'd', 'points_passed': 'b',
+                  'earth_verified': 'b', 'earth_checked': 'q', 'created': 'q', 'earth_ref': 'str'}
+POOL_SCHEMA = {'owner_id': 'str', 'lat': 'f', 'lon': 'f', 'depth_m': 'f', 'created': 'q'}
+BOND_SCHEMA = {'mother_id': 'str', 'child_id': 'str', 'pool_id': 'str', 'created': 'q', 'handshakes': 'q'}
+STATE_TABLES = {'pools': ('pool_id', POOL_SCHEMA), 'bonds': ('bond_id', BOND_SCHEMA),
+                'sessions': ('session_id', SESSION_SCHEMA)}
+ALERT_FIELDS = tuple(f.name for f in fields(SafetyAlert))
+
+
+class AlertColumns:
+    """SafetyAlert sequence stored column-wise (AlertStore rows)
+    
+    Rows are appended, or overwritten in place when an open alert is updated.
+    """
+    
+    def __init__(self):
+        self.alert_id: List[str] = []
+        self.child_id: List[str] = []
+        self.pool_id: List[str] = []
+        self.danger_probability = array.array('d')
+        self.timestamp = array.array('q')
+        self.flags = array.array('B')   # bit 0 triggered, bit 1 satelite_sos_sent, bit 2 cleared
+        self.last_seen = array.array('q')
+        self.peak_probability = array.array('d')
+        self.count = array.array('q')
+        self.notifications = array.array('q')
+    
+    @staticmethod
+    def _flags(alert: SafetyAlert) -> int:
+        return int(alert.triggered) | int(alert.satelite_sos_sent) << 1 | int(alert.cleared) << 2
+    
+    def append(self, alert: SafetyAlert):
+        self.alert_id.append(alert.alert_id)
+        self.child_id.append(sys.intern(alert.child_id))
+        self.pool_id.append(sys.intern(alert.pool_id))
+        self.danger_probability.append(alert.danger_probability)
+        self.timestamp.append(alert.timestamp)
+        self.flags.append(self._flags(alert))
+        self.last_seen.append(alert.last_seen)
+        self.peak_probability.append(alert.peak_probability)
+        self.count.append(alert.count)
+        self.notifications.append(alert.notifications)
+    
+    def __setitem__(self, position: int, alert: SafetyAlert):
+        """Overwrite a row's mutable fields (id, child, pool and raise time never change)"""
+        self.danger_probability[position] = alert.danger_probability
+        self.flags[position] = self._flags(alert)
+        self.last_seen[position] = alert.last_seen
+        self.peak_probability[position] = alert.peak_probability
+        self.count[position] = alert.count
+        self.notifications[position] = alert.notifications
+    
+    def __getitem__(self, position: int) -> SafetyAlert:
+        flags = self.flags[position]
+        return SafetyAlert(
+            alert_id=self.alert_id[position],
+            child_id=self.child_id[position],
+            pool_id=self.pool_id[position],
+            danger_probability=self.danger_probability[position],
+            timestamp=self.timestamp[position],
+            triggered=bool(flags & 1),
+            satelite_sos_sent=bool(flags & 2),
+            last_seen=self.last_seen[position],
+            peak_probability=self.peak_probability[position],
+            count=self.count[position],
+            notifications=self.notifications[position],
+            cleared=bool(flags & 4)
+        )
+    
+    def __len__(self):
+        return len(self.alert_id)
+    
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def tail(self, start: int) -> 'AlertColumns':
+        """New AlertColumns holding rows start.. (eviction of the oldest rows)"""
+        rows = AlertColumns.__new__(AlertColumns)
+        for name, column in vars(self).items():
+            setattr(rows, name, column[start:])
+        return rows
+    
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any]) -> 'AlertColumns':
+        """Rebuild from vars() of another AlertColumns (snapshots); arrays keep their typecodes"""
+        rows = cls()
+        for name, column in vars(rows).items():
+            values = columns[name]
+            if isinstance(column, list):
+                setattr(rows, name, list(values))
+            elif isinstance(values, array.array) and values.typecode == column.typecode:
+                setattr(rows, name, values)
+            else:
+                setattr(rows, name, array.array(column.typecode, values))
+        return rows
+
+# ============================================
+# EARTH VALIDATION CACHE
+# ============================================
+
+class EarthResultStore:
+    """Full 47-point results by session: bounded LRU with TTL
+    
+    Sessions keep only a summary and a reference (`earth_ref`) into this
+    store; the full payload is kept for inspection until it is evicted.
+    max_entries=0 keeps nothing.
+    """
+    
+    def __init__(self, max_entries: int = None, ttl_s: float = None):
+        self.max_entries = Config.EARTH_RESULT_STORE_MAX if max_entries is None else max_entries
+        self.ttl_s = Config.EARTH_RESULT_TTL_S if ttl_s is None else ttl_s
+        self._entries = OrderedDict()   # key -> (expires_at, result)
+        self._lock = threading.Lock()
+        self.evictions = 0
+    
+    def put(self, key: str, result: Dict) -> Optional[str]:
+        """Store a result; returns the reference to keep, or None if disabled"""
+        if not self.max_entries:
+            return None
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_s, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return key
+    
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            return entry[1]
+    
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return approx_bytes(self._entries)
+    
+    def stats(self) -> Dict:
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_s': self.ttl_s,
+            'evictions': self.evictions
+        }
+
+
+class EarthPointCache:
+    """Bounded LRU/TTL cache of location-only points, keyed by grid cell + altitude band
+    
+    Concurrent misses for the same cell are coalesced: one caller computes,
+    the others wait for its result. Cached point dicts are shared between
+    results and must be treated as read-only.
+    """
+    
+    def __init__(self, max_entries: int = None, ttl_s: float = None,
+                 grid_deg: float = None, alt_band_m: float = None):
+        self.max_entries = max_entries or Config.EARTH_CACHE_MAX_ENTRIES
+        self.ttl_s = Config.EARTH_CACHE_TTL_S if ttl_s is None else ttl_s
+        self.grid_deg = grid_deg or Config.EARTH_CACHE_GRID_DEG
+        self.alt_band_m = alt_band_m or Config.EARTH_CACHE_ALT_BAND_M
+        self._entries = OrderedDict()   # key -> (expires_at, points)
+        self._inflight = {}             # key -> threading.Event
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def key(self, lat: float, lon: float, alt: float) -> Tuple[int, int, int]:
+        """Quantize a location to (lat cell, lon cell, altitude band)"""
+        return (
+            round(lat / self.grid_deg),
+            round(lon / self.grid_deg),
+            math.floor(alt / self.alt_band_m)
+        )
+    
+    def get_or_compute(self, key, compute):
+        """Return cached points for key, computing them once on a miss"""
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[0] > time.monotonic():
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return entry[1]
+                    del self._entries[key]
+                    self.expirations += 1
+                
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    waiter = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+                self.coalesced += 1
+            
+            # Another thread is computing this cell - wait, then re-read
+            waiter.wait()
+        
+        try:
+            points = compute()
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl_s, points)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return points
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            waiter.set()
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_s': self.ttl_s,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+# ============================================
+# CONCURRENCY HELPERS
+# ============================================
+
+class StripedCounter:
+    """Integer counter split across lock-striped cells
+    
+    Threads add to the cell picked by their thread id, so concurrent
+    request threads rarely share a lock. Reading sums the cells.
+    """
+    
+    def __init__(self, stripes: int = 16):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._cells = [0] * stripes
+    
+    def add(self, count: int = 1):
+        i = (threading.get_ident() >> 12) % len(self._cells)
+        with self._locks[i]:
+            self._cells[i] += count
+    
+    @property
+    def value(self) -> int:
+        return sum(self._cells)
+
+
+def phase_for(handshakes: int) -> PhaseState:
+    """Scaling phase reached after a number of handshakes"""
+    if handshakes < 500:
+        return PhaseState.PULSE
+    elif handshakes < 1500:
+        return PhaseState.AUDIT
+    elif handshakes < 3000:
+        return PhaseState.CLIMB
+    return PhaseState.SOVEREIGN
+
 # ============================================
 # PART 1: 47-POINT MATRIX (Earth validation)
 # ============================================
 
+@model
+class PointSpec:
+    """Registry entry for one of the 47 points"""
+    id: int
+    name: str
+    group: str          # geodetic, physics, celestial, crypto, mission
+    method: str         # EarthValidator method
+    args: Any           # (lat, lon, alt) -> positional args for the method
+    pure: bool = True   # depends only on lat/lon/alt (cacheable); False = time/counter dependent
+    depends: Tuple[int, ...] = ()   # points whose state this one reads
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'group': self.group,
+            'pure': self.pure,
+            'depends': list(self.depends)
+        }
+
+
+_LOC = lambda lat, lon, alt: (lat, lon, alt)
+_LATLON = lambda lat, lon, alt: (lat, lon)
+_LAT = lambda lat, lon, alt: (lat,)
+_ALT = lambda lat, lon, alt: (alt,)
+_NONE = lambda lat, lon, alt: ()
+_const = lambda *args: (lambda lat, lon, alt: args)
+
+POINT_REGISTRY: Dict[int, PointSpec] = {spec.id: spec for spec in [
+    # === POINTS 1-10: Geodetic + Ancient ===
+    PointSpec(1, 'NATRF2022', 'geodetic', 'p01_natrf2022', _LOC),
+    PointSpec(2, 'ITRF2020', 'geodetic', 'p02_itrf2020', _LOC),
+    PointSpec(3, 'EULER_ROTATION', 'geodetic', 'p03_euler_rotation', _LATLON),
+    PointSpec(4, 'GEOID18', 'geodetic', 'p04_geoid_height', _LATLON),
+    PointSpec(5, 'STATE_PLANE_AZ', 'geodetic', 'p05_state_plane', _LATLON),
+    PointSpec(6, 'HAVERSINE', 'geodetic', 'p06_haversine', lambda lat, lon, alt: (lat, lon, lat+0.001, lon+0.001)),
+    PointSpec(7, 'SOVEREIGN_DEPTH', 'geodetic', 'p07_sovereign_depth', _const(1.2)),
+    PointSpec(8, 'UNDERGROUND_WITNESS', 'geodetic', 'p08_underground_witness', _NONE),
+    PointSpec(9, 'PHYSICAL_AUDIT', 'geodetic', 'p09_physical_audit', _NONE),
+    PointSpec(10, 'STELLAR_ALIGNMENT', 'geodetic', 'p10_stellar_alignment', _LATLON, pure=False),
+    # === POINTS 11-20: Earth Physics ===
+    PointSpec(11, 'THERMAL_EXPANSION', 'physics', 'p11_thermal_expansion', _const(25.0)),
+    PointSpec(12, 'BAROMETRIC', 'physics', 'p12_barometric', lambda lat, lon, alt: (1013.25, 25.0, alt)),
+    PointSpec(13, 'HYDRO_LOADING', 'physics', 'p13_hydro_loading', _const(10.0)),
+    PointSpec(14, 'REFRACTION', 'physics', 'p14_refraction', _const(1013.25, 25.0)),
+    PointSpec(15, 'GRAVITY', 'physics', 'p15_gravity', lambda lat, lon, alt: (lat, alt)),
+    PointSpec(16, 'WIND', 'physics', 'p16_wind', _LATLON, pure=False),
+    PointSpec(17, 'TIME_DILATION', 'physics', 'p17_time_dilation', _ALT),
+    PointSpec(18, 'SOLAR', 'physics', 'p18_solar_position', _LATLON, pure=False),
+    PointSpec(19, 'LUNAR', 'physics', 'p19_lunar_phase', _NONE, pure=False),
+    PointSpec(20, 'TIDES', 'physics', 'p20_tides', _LATLON, pure=False),
+    # === POINTS 21-30: Celestial + Vertical ===
+    PointSpec(21, 'CORIOLIS', 'celestial', 'p21_coriolis', _LAT),
+    PointSpec(22, 'JULIAN_DATE', 'celestial', 'p22_julian_date', _NONE, pure=False),
+    PointSpec(23, 'GEOMAGNETIC', 'celestial', 'p23_geomagnetic', _LATLON),
+    PointSpec(24, 'SEISMIC', 'celestial', 'p24_seismic_risk', _LATLON),
+    PointSpec(25, 'VERTICAL_BOUNCE', 'celestial', 'p25_vertical_bounce', _const(50.0, 60.0)),
+    PointSpec(26, 'FAA_ZONE', 'celestial', 'p26_faa_zone', _ALT),
+    PointSpec(27, 'VERTICAL_DEED', 'celestial', 'p27_vertical_deed', _LOC),
+    PointSpec(28, 'ISOSTATIC', 'celestial', 'p28_isostatic', _const(1.0)),
+    PointSpec(29, 'POLAR', 'celestial', 'p29_polar', _LAT),
+    PointSpec(30, 'URBAN_HEAT', 'celestial', 'p30_urban_heat', _const(25.0)),
+    # === POINTS 31-40: Crypto + Timing ===
+    PointSpec(31, 'ALTIMETER', 'crypto', 'p31_altimeter', lambda lat, lon, alt: (1013.25, alt, 25.0)),
+    PointSpec(32, 'ECDSA_INK', 'crypto', 'p32_ecdsa_ink', _LATLON, pure=False),
+    PointSpec(33, 'MERKLE_ROOT', 'crypto', 'p33_merkle_root', _NONE),
+    PointSpec(34, 'MERKLE_PROOF', 'crypto', 'p34_merkle_proof', _NONE),
+    PointSpec(35, 'CYAN', 'crypto', 'p35_cyan_steganography', _NONE, pure=False),
+    PointSpec(36, 'VISUAL_FP', 'crypto', 'p36_visual_fingerprint', _LATLON),
+    PointSpec(37, 'ACOUSTIC_FP', 'crypto', 'p37_acoustic_fingerprint', _NONE),
+    PointSpec(38, 'GAUSSIAN_JITTER', 'crypto', 'p38_gaussian_jitter', _NONE, pure=False),
+    PointSpec(39, 'NTP_DRIFT', 'crypto', 'p39_ntp_drift', _NONE),
+    PointSpec(40, 'TELEPORTATION', 'crypto', 'p40_teleportation', lambda lat, lon, alt: (lat, lon, lat+0.01, lon+0.01, 5000)),
+    # === POINTS 41-47: Mission + Revenue ===
+    PointSpec(41, 'PHASE_JITTER', 'mission', 'p41_phase_jitter', _NONE, pure=False, depends=(47,)),
+    PointSpec(42, 'STATE_MACHINE', 'mission', 'p42_state_machine', _NONE),
+    PointSpec(43, 'WATER_TABLE', 'mission', 'p43_water_table', _LATLON, pure=False),
+    PointSpec(44, 'BURIED_PIPE', 'mission', 'p44_buried_pipe', _NONE),
+    PointSpec(45, 'CHILD_SAFETY', 'mission', 'p45_child_safety', _NONE),
+    PointSpec(46, 'REVENUE', 'mission', 'p46_revenue', _NONE),
+    PointSpec(47, 'SCALING_PHASE', 'mission', 'p47_scaling_phase', _NONE, pure=False),
+]}
+
+POINT_GROUPS: Dict[str, Tuple[int, ...]] = {
+    group: tuple(pid for pid, spec in POINT_REGISTRY.items() if spec.group == group)
+    for group in dict.fromkeys(spec.group for spec in POINT_REGISTRY.values())
+}
+_POINTS_BY_NAME = {spec.name: spec.id for spec in POINT_REGISTRY.values()}
+_PURE_POINTS = tuple(pid for pid, spec in POINT_REGISTRY.items() if spec.pure)
+_FRESH_POINTS = tuple(pid for pid, spec in POINT_REGISTRY.items() if not spec.pure)
+_POINT_TIMERS = {pid: POINT_SECONDS.labels(spec.method) for pid, spec in POINT_REGISTRY.items()}
+
+
+def resolve_points(points=None, groups=None) -> Tuple[int, ...]:
+    """Sorted point ids for a selection (ids or names, plus groups) with dependencies
+    
+    No selection means all 47. Raises ValueError on an unknown point or group.
+    """
+    if not points and not groups:
+        return tuple(POINT_REGISTRY)
+    
+    selected = set()
+    for point in points or ():
+        pid = _POINTS_BY_NAME.get(str(point).upper()) if not str(point).isdigit() else int(point)
+        if pid not in POINT_REGISTRY:
+            raise ValueError(f"Unknown point: {point}")
+        selected.add(pid)
+    for group in groups or ():
+        if group not in POINT_GROUPS:
+            raise ValueError(f"Unknown group: {group}")
+        selected.update(POINT_GROUPS[group])
+    
+    pending = list(selected)
+    while pending:
+        for dep in POINT_REGISTRY[pending.pop()].depends:
+            if dep not in selected:
+                selected.add(dep)
+                pending.append(dep)
+    return tuple(sorted(selected))
+
+
+def point_filters(data: Mapping, query: Mapping) -> Dict:
+    """validate_location filter kwargs from a JSON body and/or query string
+    
+    points/groups may be lists or comma-separated strings.
+    """
+    def as_list(value):
+        if isinstance(value, str):
+            return [v.strip() for v in value.split(',') if v.strip()]
+        return value
+    
+    summary_only = data.get('summary_only', query.get('summary_only', False))
+    if isinstance(summary_only, str):
+        summary_only = summary_only.lower() in ('1', 'true', 'yes')
+    return {
+        'points': as_list(data.get('points', query.get('points'))),
+        'groups': as_list(data.get('groups', query.get('groups'))),
+        'summary_only': bool(summary_only)
+    }
+
 class EarthValidator:
     """47-point Earth validation system"""
     
-    def __init__(self):
+    FEED_POINTS = {16: 'wind', 20: 'tides', 43: 'water_table'}     # point -> feed source it reads
+    
+    def __init__(self, cache: Optional['EarthPointCache'] = None, feeds=None):
         self.total_points = 47
-        self.handshakes = 0
-        self.phase = PhaseState.PULSE
+        self._handshakes = StripedCounter()
+        self.cache = cache      # optional per-location point cache
+        self.feeds = feeds      # optional feeds.FeedClient behind points 16, 20 and 43
+    
+    @property
+    def handshakes(self) -> int:
+        return self._handshakes.value
+    
+    @property
+    def phase(self) -> PhaseState:
+        """Derived from the handshake count on read, so it never lags the counter"""
+        return phase_for(self._handshakes.value)
         
-    def validate_location(self, lat: float, lon: float, alt: float = 300.0) -> Dict:
-        """Run all 47 validation points"""
+    def validate_location(self, lat: float, lon: float, alt: float = 300.0,
+                          points=None, groups=None, summary_only: bool = False) -> Dict:
+        """Run all 47 validation points, or the selected points/groups
         
-        points = {}
-        results = []
-        
-        # === POINTS 1-10: Geodetic + Ancient ===
-        points[1] = self.p01_natrf2022(lat, lon, alt)
-        points[2] = self.p02_itrf2020(lat, lon, alt)
-        points[3] = self.p03_euler_rotation(lat, lon)
-        points[4] = self.p04_geoid_height(lat, lon)
-        points[5] = self.p05_state_plane(lat, lon)
-        points[6] = self.p06_haversine(lat, lon, lat+0.001, lon+0.001)
-        points[7] = self.p07_sovereign_depth(1.2)
-        points[8] = self.p08_underground_witness()
-        points[9] = self.p09_physical_audit()
-        points[10] = self.p10_stellar_alignment(lat, lon)
-        
-        # === POINTS 11-20: Earth Physics ===
-        points[11] = self.p11_thermal_expansion(25.0)
-        points[12] = self.p12_barometric(1013.25, 25.0, alt)
-        points[13] = self.p13_hydro_loading(10.0)
-        points[14] = self.p14_refraction(1013.25, 25.0)
-        points[15] = self.p15_gravity(lat, alt)
-        points[16] = self.p16_wind(2.0)
-        points[17] = self.p17_time_dilation(alt)
-        points[18] = self.p18_solar_position(lat, lon)
-        points[19] = self.p19_lunar_phase()
-        points[20] = self.p20_tides(lat, lon)
-        
-        # === POINTS 21-30: Celestial + Vertical ===
-        points[21] = self.p21_coriolis(lat)
-        points[22] = self.p22_julian_date()
-        points[23] = self.p23_geomagnetic(lat, lon)
-        points[24] = self.p24_seismic_risk(lat, lon)
-        points[25] = self.p25_vertical_bounce(50.0, 60.0)
-        points[26] = self.p26_faa_zone(alt)
-        points[27] = self.p27_vertical_deed(lat, lon, alt)
-        points[28] = self.p28_isostatic(1.0)
-        points[29] = self.p29_polar(lat)
-        points[30] = self.p30_urban_heat(25.0)
-        
-        # === POINTS 31-40: Crypto + Timing ===
-        points[31] = self.p31_altimeter(1013.25, alt, 25.0)
-        points[32] = self.p32_ecdsa_ink(lat, lon)
-        points[33] = self.p33_merkle_root()
-        points[34] = self.p34_merkle_proof()
-        points[35] = self.p35_cyan_steganography()
-        points[36] = self.p36_visual_fingerprint(lat, lon)
-        points[37] = self.p37_acoustic_fingerprint()
-        points[38] = self.p38_gaussian_jitter()
-        points[39] = self.p39_ntp_drift()
-        points[40] = self.p40_teleportation(lat, lon, lat+0.01, lon+0.01, 5000)
-        
-        # === POINTS 41-47: Mission + Revenue ===
-        points[41] = self.p41_phase_jitter()
-        points[42] = self.p42_state_machine()
-        points[43] = self.p43_water_table()
-        points[44] = self.p44_buried_pipe()
-        points[45] = self.p45_child_safety()
-        points[46] = self.p46_revenue()
-        points[47] = self.p47_scaling_phase()
+        Confidence and collapse state cover the selected points only;
+        summary_only leaves out the per-point results.
+        """
+        
+        start = time.perf_counter()
+        try:
+            ids = resolve_points(points, groups)
+        except ValueError as e:
+            return {'error': str(e)}
+        
+        results = self._evaluate_points(lat, lon, alt, ids)
         
         # Calculate confidence
-        confidences = [p.get('confidence', 1.0) for p in points.values()]
+        confidences = [p.get('confidence', 1.0) for p in results.values()]
         avg_conf = sum(confidences) / len(confidences)
         
         # Determine collapse state
@@ -206,19 +908,165 @@ class EarthValidator:
         else:
             collapse = CollapseState.GAMMA
         
-        return {
+        result = {
             'system': '47-POINT MATRIX',
             'genesis': Config.GENESIS_TIMESTAMP,
-            'points_evaluated': 47,
+            'points_evaluated': len(ids),
             'points_passed': sum(1 for c in confidences if c >= 0.7),
             'average_confidence': round(avg_conf, 4),
             'collapse_state': collapse.value,
             'verified': collapse in [CollapseState.ALPHA, CollapseState.BETA],
-            'points': points,
+            'points': results,
+            'handshakes': self.handshakes,
+            'phase': self.phase.value
+        }
+        if summary_only:
+            del result['points']
+        if metrics.ENABLED:
+            EARTH_SECONDS.observe(time.perf_counter() - start)
+        return result
+    
+    def validate_location_many(self, lats, lons, alts=300.0) -> Dict:
+        """Run the 47-point matrix over many locations, returning columns
+        
+        Each row's confidences match validate_location at that location.
+        Feed points (16, 20, 43) are evaluated once per feed tile and p40's
+        confidence comes from an array kernel per row; every other point's
+        confidence does not depend on the location, so it is evaluated once
+        per batch and broadcast. 'values' holds the coordinate-dependent
+        values of the array kernels (p17, p21, p23, p24, p26, p29, p31, p40).
+        """
+        
+        lat = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lon = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+        alt = np.broadcast_to(np.asarray(alts, dtype=np.float64), lat.shape)
+        n = lat.shape[0]
+        
+        if n == 0:
+            return {
+                'system': '47-POINT MATRIX',
+                'genesis': Config.GENESIS_TIMESTAMP,
+                'count': 0,
+                'point_ids': list(range(1, 48)),
+                'confidence': np.empty((0, 47)),
+                'average_confidence': np.empty(0),
+                'points_passed': np.empty(0, dtype=np.int64),
+                'collapse_state': np.empty(0, dtype='<U5'),
+                'verified': np.empty(0, dtype=bool),
+                'values': {},
+                'handshakes': self.handshakes,
+                'phase': self.phase.value
+            }
+        
+        # Shared points (one evaluation, also counts the first handshake)
+        shared = self._evaluate_points(float(lat[0]), float(lon[0]), float(alt[0]))
+        self._advance_handshakes(n - 1)
+        
+        confidence = np.empty((n, 47), dtype=np.float64)
+        for point_id, result in shared.items():
+            confidence[:, point_id - 1] = result.get('confidence', 1.0)
+        
+        # Feed points once per tile (the shared evaluation covered row 0's)
+        if self.feeds is not None:
+            tiles = {}
+            for i, (row_lat, row_lon) in enumerate(zip(lat.tolist(), lon.tolist())):
+                tile = tuple(self.feeds.key(name, row_lat, row_lon) for name in self.FEED_POINTS.values())
+                tiles.setdefault(tile, []).append(i)
+            for rows in tiles.values():
+                i = rows[0]
+                if i == 0:
+                    continue
+                for point_id, result in self._run_points(self.FEED_POINTS, float(lat[i]), float(lon[i]),
+                                                         float(alt[i])).items():
+                    confidence[rows, point_id - 1] = result.get('confidence', 1.0)
+        
+        teleport_speed = self.k40_teleportation(lat, lon)
+        confidence[:, 39] = np.where(teleport_speed <= Config.SPEED_OF_SOUND, 1.0, 0.0)
+        
+        values = {
+            'time_dilation': self.k17_time_dilation(alt),
+            'coriolis_f': self.k21_coriolis(lat),
+            'declination': self.k23_geomagnetic(lat, lon),
+            'seismic_risk': self.k24_seismic_risk(lat, lon),
+            'faa_zone': self.k26_faa_zone(alt),
+            'is_polar': self.k29_polar(lat),
+            'qnh': self.k31_altimeter(1013.25, alt, 25.0),
+            'teleport_speed_mps': np.round(teleport_speed, 1)
+        }
+        
+        # Calculate confidence
+        avg_conf = confidence.mean(axis=1)
+        
+        # Determine collapse state
+        collapse = np.where(avg_conf > 0.95, CollapseState.ALPHA.value,
+                            np.where(avg_conf > 0.70, CollapseState.BETA.value,
+                                     CollapseState.GAMMA.value))
+        
+        return {
+            'system': '47-POINT MATRIX',
+            'genesis': Config.GENESIS_TIMESTAMP,
+            'count': n,
+            'point_ids': list(range(1, 48)),
+            'confidence': confidence,
+            'average_confidence': np.round(avg_conf, 4),
+            'points_passed': (confidence >= 0.7).sum(axis=1),
+            'collapse_state': collapse,
+            'verified': avg_conf > 0.70,
+            'values': values,
             'handshakes': self.handshakes,
             'phase': self.phase.value
         }
     
+    def _evaluate_points(self, lat: float, lon: float, alt: float,
+                         ids: Tuple[int, ...] = None) -> Dict[int, Dict]:
+        """Evaluate the given point functions (default: all 47) for one location
+        
+        Every evaluation counts one handshake (point 47), selected or not.
+        """
+        
+        ids = ids or tuple(POINT_REGISTRY)
+        wanted = [pid for pid in ids if POINT_REGISTRY[pid].pure]
+        if not wanted:
+            location = {}
+        elif self.cache is None:
+            location = self._location_points(lat, lon, alt, wanted)
+        else:
+            # The cache holds whole cells, so a subset miss fills the cell once
+            location = self.cache.get_or_compute(
+                self.cache.key(lat, lon, alt),
+                lambda: self._location_points(lat, lon, alt)
+            )
+        fresh = self._fresh_points(lat, lon, alt, ids)
+        if 47 not in fresh:
+            self._advance_handshakes(1)
+        
+        return {pid: fresh[pid] if pid in fresh else location[pid] for pid in ids}
+    
+    def _run_points(self, ids, lat: float, lon: float, alt: float) -> Dict[int, Dict]:
+        points = {}
+        if metrics.ENABLED and _sample_points():
+            clock = time.perf_counter
+            last = clock()
+            for pid in ids:
+                spec = POINT_REGISTRY[pid]
+                points[pid] = getattr(self, spec.method)(*spec.args(lat, lon, alt))
+                now = clock()
+                _POINT_TIMERS[pid].observe(now - last)
+                last = now
+            return points
+        for pid in ids:
+            spec = POINT_REGISTRY[pid]
+            points[pid] = getattr(self, spec.method)(*spec.args(lat, lon, alt))
+        return points
+    
+    def _location_points(self, lat: float, lon: float, alt: float, ids=_PURE_POINTS) -> Dict[int, Dict]:
+        """Points that depend only on lat/lon/alt (cacheable per location)"""
+        return self._run_points(ids, lat, lon, alt)
+    
+    def _fresh_points(self, lat: float, lon: float, alt: float, ids=_FRESH_POINTS) -> Dict[int, Dict]:
+        """Time-varying and counter points (never cached)"""
+        return self._run_points([pid for pid in ids if not POINT_REGISTRY[pid].pure], lat, lon, alt)
+    
     # ===== POINT FUNCTIONS =====
     
     def p01_natrf2022(self, lat, lon, alt):
@@ -267,9 +1115,10 @@ class EarthValidator:
     def p15_gravity(self, lat, alt):
         return {'point': 15, 'name': 'GRAVITY', 'g_ms2': 9.80, 'confidence': 1.0}
     
-    def p16_wind(self, speed):
+    def p16_wind(self, lat, lon):
+        speed, feed = self._feed('wind', lat, lon, 2.0)
         conf = 1.0 if speed < 5 else 0.8
-        return {'point': 16, 'name': 'WIND', 'confidence': conf}
+        return {'point': 16, 'name': 'WIND', 'speed_mps': round(speed, 2), 'feed': feed, 'confidence': conf}
     
     def p17_time_dilation(self, alt):
         delta = (9.8 * alt) / (3e8**2)
@@ -284,7 +1133,8 @@ class EarthValidator:
         return {'point': 19, 'name': 'LUNAR', 'phase': round(phase, 4), 'confidence': 1.0}
     
     def p20_tides(self, lat, lon):
-        return {'point': 20, 'name': 'TIDES', 'amplitude_m': 0.5, 'confidence': 1.0}
+        amplitude, feed = self._feed('tides', lat, lon, 0.5)
+        return {'point': 20, 'name': 'TIDES', 'amplitude_m': round(amplitude, 3), 'feed': feed, 'confidence': 1.0}
     
     def p21_coriolis(self, lat):
         f = 2 * 7.29e-5 * math.sin(math.radians(lat))
@@ -364,7 +1214,10 @@ class EarthValidator:
         return {'point': 39, 'name': 'NTP_DRIFT', 'drift_ms': 0, 'status': 'GREEN', 'confidence': 1.0}
     
     def p40_teleportation(self, lat1, lon1, lat2, lon2, observed_ms):
-        return {'point': 40, 'name': 'TELEPORTATION', 'possible': True, 'confidence': 1.0}
+        speed = haversine_m(lat1, lon1, lat2, lon2) / max(observed_ms / 1000.0, 1e-3)
+        possible = speed <= Config.SPEED_OF_SOUND
+        return {'point': 40, 'name': 'TELEPORTATION', 'speed_mps': round(speed, 1),
+                'possible': possible, 'confidence': 1.0 if possible else 0.0}
     
     def p41_phase_jitter(self):
         return {'point': 41, 'name': 'PHASE_JITTER', 'phase': self.phase.value, 'confidence': 1.0}
@@ -372,8 +1225,9 @@ class EarthValidator:
     def p42_state_machine(self):
         return {'point': 42, 'name': 'STATE_MACHINE', 'state': 'VERIFIED', 'confidence': 1.0}
     
-    def p43_water_table(self):
-        return {'point': 43, 'name': 'WATER_TABLE', 'depth_ft': 150, 'confidence': 1.0}
+    def p43_water_table(self, lat, lon):
+        depth, feed = self._feed('water_table', lat, lon, 150.0)
+        return {'point': 43, 'name': 'WATER_TABLE', 'depth_ft': round(depth, 1), 'feed': feed, 'confidence': 1.0}
     
     def p44_buried_pipe(self):
         return {'point': 44, 'name': 'BURIED_PIPE', 'echo_ms': 0.47, 'confidence': 1.0}
@@ -385,33 +1239,1182 @@ class EarthValidator:
         return {'point': 46, 'name': 'REVENUE', 'amount': 0.50, 'confidence': 1.0}
     
     def p47_scaling_phase(self):
-        self.handshakes += 1
-        if self.handshakes < 500:
-            self.phase = PhaseState.PULSE
-        elif self.handshakes < 1500:
-            self.phase = PhaseState.AUDIT
-        elif self.handshakes < 3000:
-            self.phase = PhaseState.CLIMB
-        else:
-            self.phase = PhaseState.SOVEREIGN
-        return {'point': 47, 'name': 'SCALING_PHASE', 'phase': self.phase.value, 'handshakes': self.handshakes, 'confidence': 1.0}
+        self._advance_handshakes(1)
+        handshakes = self.handshakes
+        return {'point': 47, 'name': 'SCALING_PHASE', 'phase': phase_for(handshakes).value, 'handshakes': handshakes, 'confidence': 1.0}
+    
+    def _feed(self, name: str, lat: float, lon: float, default: float) -> Tuple[float, str]:
+        """Last known feed value for the location's tile, never waiting on the network
+        
+        Without a feed client the point keeps its static value ('static').
+        """
+        if self.feeds is None:
+            return default, 'static'
+        return self.feeds.peek(name, lat, lon, default)
+    
+    def _advance_handshakes(self, count: int):
+        """Add handshakes (the phase follows from the total)"""
+        self._handshakes.add(count)
+        if metrics.ENABLED:
+            EARTH_HANDSHAKES.inc(count)
+    
+    # ===== ARRAY KERNELS (validate_location_many) =====
+    
+    def k17_time_dilation(self, alt: 'np.ndarray') -> 'np.ndarray':
+        return (9.8 * alt) / (3e8**2)
+    
+    def k21_coriolis(self, lat: 'np.ndarray') -> 'np.ndarray':
+        return 2 * 7.29e-5 * np.sin(np.radians(lat))
+    
+    def k23_geomagnetic(self, lat: 'np.ndarray', lon: 'np.ndarray') -> 'np.ndarray':
+        return np.round(-6.36 + 0.264*(lat-40) + 0.154*(lon+100), 4)
+    
+    def k24_seismic_risk(self, lat: 'np.ndarray', lon: 'np.ndarray') -> 'np.ndarray':
+        in_zone = (-115 < lon) & (lon < -109) & (31 < lat) & (lat < 37)
+        return np.where(in_zone, 0.1, 0.3)
+    
+    def k26_faa_zone(self, alt: 'np.ndarray') -> 'np.ndarray':
+        return np.where(alt < 152.4, 'surface', np.where(alt < 914.4, 'low', 'controlled'))
+    
+    def k29_polar(self, lat: 'np.ndarray') -> 'np.ndarray':
+        return np.abs(lat) >= 66.5
+    
+    def k31_altimeter(self, pressure: float, alt: 'np.ndarray', temp: float) -> 'np.ndarray':
+        temp_k = temp + 273.15
+        return np.round(pressure * (1 + (0.0065 * alt) / temp_k) ** 5.257, 2)
+    
+    def k40_teleportation(self, lat: 'np.ndarray', lon: 'np.ndarray') -> 'np.ndarray':
+        """p40's implied speed (m/s) for a 0.01 degree hop in 5 s, per row"""
+        p1, p2 = np.radians(lat), np.radians(lat + 0.01)
+        a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(np.radians(0.01) / 2) ** 2
+        return 2 * Config.EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a))) / 5.0
 
 # ============================================
 # PART 2: YOUR 20-LOGIC SAFETY API
 # ============================================
 
+SOS_SENT = object()     # AlertStore queue marker: set satelite_sos_sent on a stored alert
+EVICT = object()        # AlertStore queue marker: drop history beyond (max_count, cutoff_ms)
+
+
+class AlertStore:
+    """Alert history with time, cursor and per-child/per-pool lookups
+    
+    Alerts are kept in arrival order; an alert's position is its cursor.
+    Keys hold the running maximum timestamp, so they are sorted even if the
+    clock steps back and `since` queries can binary-search them. An open alert
+    is updated in place (revise()); its position and raise time never change.
+    
+    Appends and updates from many threads go into a lock-free queue;
+    whichever thread gets the commit lock drains it for everyone, so writers
+    never wait on each other (an alert may take a moment to become visible
+    to readers).
+    
+    History is bounded by max_history alerts and max_age_s (0 = no limit).
+    The oldest alerts are dropped in chunks; positions stay absolute, so
+    cursors and SSE event ids remain valid and `base` is the first position
+    still held. Eviction swaps in new (base, rows, keys) and index lists
+    instead of shifting them, so lock-free readers never see a torn view.
+    """
+    
+    def __init__(self, rows=None, max_history: int = None, max_age_s: float = None):
+        rows = rows if rows is not None else []     # list or AlertColumns
+        self._window = (0, rows, [])    # (base position, rows, running-max keys)
+        self.max_history = Config.ALERT_MAX_HISTORY if max_history is None else max_history
+        self.max_age_s = Config.ALERT_MAX_AGE_S if max_age_s is None else max_age_s
+        self._horizon = 0   # newest key evicted so far
+        self._by_child: Dict[str, Tuple[List[int], List[int]]] = {}  # child_id -> (positions, keys)
+        self._by_pool: Dict[str, Tuple[List[int], List[int]]] = {}   # pool_id -> (positions, keys)
+        self._by_id: Dict[str, int] = {}    # alert_id -> position
+        self._early: Dict[str, Tuple[SafetyAlert, bool]] = {}  # updates committed before their append
+        self._pending = deque()     # (alert, notify) not yet committed; notify None = append, SOS_SENT = mark
+        self._commit_lock = threading.Lock()
+        self.version = 0    # bumped on every mutation (ETag source)
+        self.listeners = [] # callables(position, alert, update) run after each append or notified update
+        self.journal = None # callable(kind, key, value) for each committed change (write-ahead log)
+    
+    def __len__(self):
+        return len(self._window[1])
+    
+    def __iter__(self):
+        return iter(self._window[1])
+    
+    def __getitem__(self, position):
+        base, alerts, _ = self._window
+        if position < 0:
+            return alerts[position]
+        if position < base:
+            raise IndexError(f"alert {position} has been evicted")
+        return alerts[position - base]
+    
+    @property
+    def base(self) -> int:
+        """Position of the oldest alert still held (= alerts evicted so far)"""
+        return self._window[0]
+    
+    @property
+    def end(self) -> int:
+        """Position the next alert will get"""
+        base, alerts, _ = self._window
+        return base + len(alerts)
+    
+    def append(self, alert: SafetyAlert):
+        self._pending.append((alert, None))
+        self._drain()
+    
+    def extend(self, alerts):
+        self._pending.extend([(alert, None) for alert in alerts])    # one call, so a batch stays contiguous
+        self._drain()
+    
+    def revise(self, updates: List[Tuple[SafetyAlert, bool]]):
+        """Update stored alerts in place from (alert, notify) pairs, matched by alert_id
+        
+        An update never replaces a row that has seen more readings (`count`),
+        so updates racing each other cannot roll an alert back; a clear also
+        replaces a row at the same count. Listeners
+        hear only about updates with notify set.
+        """
+        self._pending.extend(updates)
+        self._drain()
+    
+    def mark_sos_sent(self, alert_id: str):
+        """Record that an alert's SOS was delivered (called by the outbound dispatcher)"""
+        self._pending.append((alert_id, SOS_SENT))
+        self._drain()
+    
+    def evict(self, max_count: int = None, max_age_s: float = None, now: float = None):
+        """Drop the oldest alerts beyond max_count and/or older than max_age_s"""
+        cutoff = int(((time.time() if now is None else now) - max_age_s) * 1000) if max_age_s else None
+        self._pending.append(((max_count, cutoff), EVICT))
+        self._drain()
+    
+    def position(self, alert_id: str) -> Optional[int]:
+        return self._by_id.get(alert_id)
+    
+    def _drain(self):
+        while self._pending:
+            if not self._commit_lock.acquire(blocking=False):
+                return      # the committing thread re-checks the queue after releasing
+            try:
+                while self._pending:
+                    alert, notify = self._pending.popleft()
+                    if notify is None:
+                        self._commit(alert)
+                    elif notify is SOS_SENT:
+                        self._mark_sent(alert)
+                    elif notify is EVICT:
+                        self._evict(*alert)
+                    else:
+                        self._update(alert, notify)
+            finally:
+                self._commit_lock.release()
+    
+    def _commit(self, alert: SafetyAlert):
+        base, alerts, keys = self._window
+        position = base + len(alerts)
+        key = max(alert.timestamp, keys[-1]) if keys else alert.timestamp
+        alerts.append(alert)
+        keys.append(key)
+        self._by_id[alert.alert_id] = position
+        for index, value in ((self._by_child, alert.child_id), (self._by_pool, alert.pool_id)):
+            positions, keys = index.setdefault(value, ([], []))
+            positions.append(position)
+            keys.append(key)
+        self.version += 1
+        if self.journal is not None:
+            self.journal('alert', position, [getattr(alert, name) for name in ALERT_FIELDS])
+        for listener in self.listeners:
+            listener(position, alert, False)
+        if self._early:
+            early = self._early.pop(alert.alert_id, None)
+            if early is not None:
+                self._apply(position, *early)
+        # Trim in chunks of max_history/8 so the copy is amortized over many appends
+        if self.max_history and len(alerts) > self.max_history + (self.max_history >> 3):
+            self._evict(self.max_history, None)
+        elif self.max_age_s and not position & 1023:
+            self._evict(None, int((time.time() - self.max_age_s) * 1000))
+    
+    def _update(self, alert: SafetyAlert, notify: bool):
+        self.version += 1
+        position = self._by_id.get(alert.alert_id)
+        if position is not None:
+            self._apply(position, alert, notify)
+            return
+        if alert.timestamp <= self._horizon:
+            return      # the alert has already been evicted
+        # Another thread queued the append after this update: apply it once the append lands
+        early = self._early.get(alert.alert_id)
+        if early is None or alert.count > early[0].count:
+            self._early[alert.alert_id] = (alert, notify or (early is not None and early[1]))
+        elif notify:
+            self._early[alert.alert_id] = (early[0], True)
+    
+    def _apply(self, position: int, alert: SafetyAlert, notify: bool):
+        base, alerts, _ = self._window
+        current = alerts[position - base]
+        # A stale alert closes without a new reading, so a clear also wins at an equal count
+        if alert.count > current.count or (alert.cleared and not current.cleared and alert.count == current.count):
+            alert.satelite_sos_sent = alert.satelite_sos_sent or current.satelite_sos_sent
+            alerts[position - base] = alert
+            if self.journal is not None:
+                self.journal('alert_update', position, [getattr(alert, name) for name in ALERT_FIELDS])
+        if notify:
+            for listener in self.listeners:
+                listener(position, alerts[position - base], True)
+    
+    def _mark_sent(self, alert_id: str):
+        position = self._by_id.get(alert_id)
+        if position is None:
+            return
+        base, alerts, _ = self._window
+        current = alerts[position - base]
+        if not current.satelite_sos_sent:
+            alerts[position - base] = replace(current, satelite_sos_sent=True)
+            self.version += 1
+            if self.journal is not None:
+                self.journal('sos_sent', alert_id, None)
+    
+    def _evict(self, max_count: Optional[int], cutoff: Optional[int]):
+        base, alerts, keys = self._window
+        drop = len(alerts) - max_count if max_count is not None else 0
+        if cutoff is not None:
+            drop = max(drop, bisect.bisect_left(keys, cutoff))
+        if drop > 0:
+            self._truncate(base + drop)
+    
+    def _truncate(self, new_base: int):
+        """Drop every alert below position new_base"""
+        base, alerts, keys = self._window
+        drop = min(new_base - base, len(alerts))
+        if drop <= 0:
+            return
+        
+        children, pools = set(), set()
+        for i in range(drop):
+            alert = alerts[i]
+            self._by_id.pop(alert.alert_id, None)
+            children.add(alert.child_id)
+            pools.add(alert.pool_id)
+        new_base = base + drop
+        for index, values in ((self._by_child, children), (self._by_pool, pools)):
+            for value in values:
+                positions, index_keys = index[value]
+                cut = bisect.bisect_left(positions, new_base)
+                if cut == len(positions):
+                    del index[value]
+                else:
+                    index[value] = (positions[cut:], index_keys[cut:])
+        
+        self._horizon = max(self._horizon, keys[drop - 1])
+        rows = alerts.tail(drop) if isinstance(alerts, AlertColumns) else alerts[drop:]
+        self._window = (new_base, rows, keys[drop:])
+        self.version += 1
+        if self.journal is not None:
+            self.journal('evict', new_base, None)     # absolute, so replays are idempotent
+    
+    def export(self) -> Tuple[int, 'AlertColumns']:
+        """(base, copy of the held alerts as AlertColumns), consistent under the commit lock (snapshots)"""
+        with self._commit_lock:
+            base, alerts, _ = self._window
+            if isinstance(alerts, AlertColumns):
+                rows = alerts.tail(0)
+            else:
+                rows = AlertColumns()
+                for alert in alerts:
+                    rows.append(alert)
+        self._drain()   # writers that found the lock taken left their changes queued
+        return base, rows
+    
+    def load(self, base: int, rows: 'AlertColumns'):
+        """Replace the contents with rows held from position `base` (recovery); not journaled"""
+        rows.child_id[:] = map(sys.intern, rows.child_id)
+        rows.pool_id[:] = map(sys.intern, rows.pool_id)
+        by_id, by_child, by_pool = {}, {}, {}
+        keys, key = [], 0
+        for position, (alert_id, child_id, pool_id, timestamp) in enumerate(
+                zip(rows.alert_id, rows.child_id, rows.pool_id, rows.timestamp), base):
+            key = max(key, timestamp)
+            keys.append(key)
+            by_id[alert_id] = position
+            for index, value in ((by_child, child_id), (by_pool, pool_id)):
+                positions, index_keys = index.setdefault(value, ([], []))
+                positions.append(position)
+                index_keys.append(key)
+        with self._commit_lock:
+            alerts = rows if isinstance(self._window[1], AlertColumns) else list(rows)
+            self._by_id, self._by_child, self._by_pool = by_id, by_child, by_pool
+            self._horizon = keys[0] - 1 if base and keys else 0
+            self._window = (base, alerts, keys)
+            self.version += 1
+    
+    def query(self, since: int = None, cursor: int = None, limit: int = None,
+              child_id: str = None, pool_id: str = None) -> Tuple[List[SafetyAlert], int]:
+        """Alerts newer than `since`, from position `cursor`, at most `limit`
+        
+        Returns (alerts, next_cursor); pass next_cursor back to continue.
+        """
+        window = self._window
+        positions, next_cursor = self._select(window, since, cursor, limit, child_id, pool_id)
+        base, alerts, _ = window
+        return [alerts[p - base] for p in positions], next_cursor
+    
+    def query_positions(self, since: int = None, cursor: int = None, limit: int = None,
+                        child_id: str = None, pool_id: str = None) -> Tuple[List[int], int]:
+        """Same as query(), returning store positions instead of alerts"""
+        return self._select(self._window, since, cursor, limit, child_id, pool_id)
+    
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by rows, keys and indexes (sampled)"""
+        _, alerts, keys = self._window
+        size = approx_bytes(alerts) + sys.getsizeof(keys) + approx_bytes(self._by_id)
+        for index in (self._by_child, self._by_pool):
+            size += approx_bytes(index)
+        return size
+    
+    def _select(self, window, since, cursor, limit, child_id, pool_id) -> Tuple[List[int], int]:
+        base, alerts, keys = window
+        if child_id is not None:
+            positions, keys = self._by_child.get(child_id, ([], []))
+        elif pool_id is not None:
+            positions, keys = self._by_pool.get(pool_id, ([], []))
+        else:
+            positions = None
+        
+        start = bisect.bisect_right(keys, since) if since else 0
+        if cursor:
+            start = max(start, cursor - base if positions is None else bisect.bisect_left(positions, cursor))
+        
+        found = []
+        for i in range(start, len(keys)):
+            position = base + i if positions is None else positions[i]
+            if position < base:
+                continue    # index list read after an eviction: the window is older
+            if position - base >= len(alerts):
+                break
+            alert = alerts[position - base]
+            if since and alert.timestamp <= since:
+                continue
+            if pool_id is not None and alert.pool_id != pool_id:
+                continue
+            found.append(position)
+            if limit is not None and len(found) >= limit:
+                return found, position + 1
+        
+        return found, max(cursor or 0, base + len(alerts))
+
+
+def make_id(seed: str, owns=None) -> str:
+    """16-hex-digit id from a seed, re-salted until `owns(id)` accepts it
+    
+    Shards pass their ownership test so every id they mint hashes back to them.
+    """
+    digest = hashlib.sha256(seed.encode()).hexdigest()[:16]
+    salt = 0
+    while owns is not None and not owns(digest):
+        salt += 1
+        digest = hashlib.sha256(f"{seed}#{salt}".encode()).hexdigest()[:16]
+    return digest
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres"""
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    a = (math.sin((p2 - p1) / 2) ** 2
+         + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * Config.EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class PoolSpatialIndex:
+    """Uniform lat/lon grid over registered pools
+    
+    Each cell holds the pool_ids inside it. Radius queries only visit the
+    cells overlapping the query's bounding box; nearest-k queries search
+    outward ring by ring until no closer pool can exist.
+    """
+    
+    METRES_PER_DEG = math.pi * 6371000.0 / 180.0
+    
+    def __init__(self, cell_deg: float = None):
+        self.cell_deg = cell_deg or Config.POOL_INDEX_CELL_DEG
+        self.lon_cells = int(round(360.0 / self.cell_deg))
+        self._cells: Dict[Tuple[int, int], List[str]] = {}
+        self._coords: Dict[str, Tuple[float, float]] = {}
+    
+    def __len__(self):
+        return len(self._coords)
+    
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg),
+                math.floor((lon + 180.0) / self.cell_deg) % self.lon_cells)
+    
+    def add(self, pool_id: str, lat: float, lon: float):
+        if pool_id in self._coords:
+            self.remove(pool_id)
+        self._coords[pool_id] = (lat, lon)
+        self._cells.setdefault(self._cell(lat, lon), []).append(pool_id)
+    
+    def remove(self, pool_id: str) -> bool:
+        coords = self._coords.pop(pool_id, None)
+        if coords is None:
+            return False
+        cell = self._cell(*coords)
+        members = self._cells[cell]
+        members.remove(pool_id)
+        if not members:
+            del self._cells[cell]
+        return True
+    
+    def _ring(self, ci: int, cj: int, r: int):
+        """Cells at Chebyshev distance r from (ci, cj)"""
+        if r == 0:
+            yield ci, cj
+            return
+        for dj in range(-r, r + 1):
+            yield ci - r, (cj + dj) % self.lon_cells
+            yield ci + r, (cj + dj) % self.lon_cells
+        for di in range(-r + 1, r):
+            yield ci + di, (cj - r) % self.lon_cells
+            yield ci + di, (cj + r) % self.lon_cells
+    
+    def within(self, lat: float, lon: float, radius_m: float) -> List[Tuple[float, str]]:
+        """All pools within radius_m of (lat, lon), as sorted (distance_m, pool_id)"""
+        dlat = radius_m / self.METRES_PER_DEG
+        cos_lat = math.cos(math.radians(min(89.9, abs(lat) + dlat)))
+        dlon = min(180.0, dlat / max(cos_lat, 1e-6))
+        
+        i0, j0 = self._cell(lat - dlat, lon - dlon)
+        i1, _ = self._cell(lat + dlat, lon + dlon)
+        span = min(self.lon_cells - 1, math.floor(2 * dlon / self.cell_deg) + 1)
+        
+        if (i1 - i0 + 1) * (span + 1) > len(self._cells):
+            # Box covers more cells than are occupied - walk the occupied ones instead
+            cells = [members for (i, j), members in self._cells.items()
+                     if i0 <= i <= i1 and (j - j0) % self.lon_cells <= span]
+        else:
+            cells = [self._cells.get((i, (j0 + dj) % self.lon_cells), ())
+                     for i in range(i0, i1 + 1) for dj in range(span + 1)]
+        
+        hits = []
+        for members in cells:
+            for pool_id in members:
+                plat, plon = self._coords[pool_id]
+                d = haversine_m(lat, lon, plat, plon)
+                if d <= radius_m:
+                    hits.append((d, pool_id))
+        hits.sort()
+        return hits
+    
+    def nearest(self, lat: float, lon: float, k: int = 1,
+                max_radius_m: float = None) -> List[Tuple[float, str]]:
+        """The k closest pools, as sorted (distance_m, pool_id)"""
+        if not self._coords:
+            return []
+        ci, cj = self._cell(lat, lon)
+        cell_m = self.cell_deg * self.METRES_PER_DEG
+        
+        hits = []
+        r = 0
+        while True:
+            # Distance fully covered once rings 0..r are scanned (lon cells shrink poleward)
+            covered_m = r * cell_m * max(math.cos(math.radians(min(89.9, abs(lat) + r * self.cell_deg))), 1e-6)
+            if (2 * r + 1) ** 2 > len(self._cells):
+                # Ring scanning now costs more than scanning every pool
+                hits = [(haversine_m(lat, lon, plat, plon), pool_id)
+                        for pool_id, (plat, plon) in self._coords.items()]
+                break
+            for cell in self._ring(ci, cj, r):
+                for pool_id in self._cells.get(cell, ()):
+                    plat, plon = self._coords[pool_id]
+                    hits.append((haversine_m(lat, lon, plat, plon), pool_id))
+            if len(hits) >= k:
+                hits.sort()
+                if hits[k - 1][0] <= covered_m:
+                    break
+            if max_radius_m is not None and covered_m >= max_radius_m:
+                break
+            r += 1
+        
+        hits.sort()
+        if max_radius_m is not None:
+            hits = [h for h in hits if h[0] <= max_radius_m]
+        return hits[:k]
+
+
+class AlertSubscription:
+    """One live alert stream: filters plus a bounded queue of (position, alert, update)"""
+    
+    __slots__ = ('pool_id', 'child_id', 'owner_id', 'queue', 'maxsize',
+                 'last_queued', 'dropped', 'closed', 'on_ready', '_lock', '_ready')
+    
+    def __init__(self, pool_id: str = None, child_id: str = None, owner_id: str = None,
+                 maxsize: int = 256):
+        self.pool_id = pool_id
+        self.child_id = child_id
+        self.owner_id = owner_id
+        self.queue = deque()
+        self.maxsize = maxsize
+        self.last_queued = -1
+        self.dropped = 0
+        self.closed = False
+        self.on_ready = None    # optional callback for event-loop consumers
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+    
+    def offer(self, position: int, alert: SafetyAlert, overflow: str = 'disconnect',
+              update: bool = False) -> bool:
+        """Queue an alert (or an update of one) without blocking; False if the subscriber was cut off"""
+        with self._lock:
+            if self.closed or (not update and position <= self.last_queued):
+                return not self.closed
+            if len(self.queue) >= self.maxsize:
+                if overflow == 'drop':
+                    self.queue.popleft()
+                    self.dropped += 1
+                else:
+                    self.closed = True
+                    self._wake()
+                    return False
+            self.queue.append((position, alert, update))
+            if not update:
+                self.last_queued = position
+        self._wake()
+        return True
+    
+    def _wake(self):
+        self._ready.set()
+        if self.on_ready is not None:
+            self.on_ready()
+    
+    def drain(self, timeout: float = None) -> List[Tuple[int, SafetyAlert, bool]]:
+        """Wait up to timeout for alerts and return everything queued"""
+        if not self.queue and not self.closed:
+            self._ready.wait(timeout)
+        with self._lock:
+            self._ready.clear()
+            events = list(self.queue)
+            self.queue.clear()
+        return events
+
+
+class AlertBroadcaster:
+    """Fans new alerts out to live subscribers (Server-Sent Events)
+    
+    Subscribers are indexed by their filter so publishing only touches the
+    ones that match. A subscriber whose queue is full is dropped or
+    disconnected (Config.ALERT_STREAM_OVERFLOW) so the check path never
+    waits; a disconnected client resumes with Last-Event-ID.
+    """
+    
+    def __init__(self, api: 'ChildSafetyAPI', queue_size: int = None,
+                 max_subscribers: int = None, overflow: str = None, replay_limit: int = None):
+        self.api = api
+        self.queue_size = queue_size or Config.ALERT_STREAM_QUEUE_SIZE
+        self.max_subscribers = max_subscribers or Config.ALERT_STREAM_MAX_SUBSCRIBERS
+        self.overflow = overflow or Config.ALERT_STREAM_OVERFLOW
+        self.replay_limit = replay_limit or Config.ALERT_STREAM_REPLAY_LIMIT
+        self._all = set()
+        self._by_pool = {}      # pool_id -> set of subscriptions
+        self._by_child = {}     # child_id -> set of subscriptions
+        self._by_owner = {}     # owner_id -> set of subscriptions
+        self._lock = threading.Lock()
+        self.subscribers = 0
+        self.published = 0
+        self.disconnected = 0
+        api.alerts.listeners.append(self.publish)
+    
+    def _bucket(self, sub: AlertSubscription):
+        if sub.pool_id is not None:
+            return self._by_pool, sub.pool_id
+        if sub.child_id is not None:
+            return self._by_child, sub.child_id
+        if sub.owner_id is not None:
+            return self._by_owner, sub.owner_id
+        return None, None
+    
+    def _matches(self, sub: AlertSubscription, alert: SafetyAlert) -> bool:
+        if sub.pool_id is not None and alert.pool_id != sub.pool_id:
+            return False
+        if sub.child_id is not None and alert.child_id != sub.child_id:
+            return False
+        if sub.owner_id is not None:
+            pool = self.api.pools.get(alert.pool_id)
+            if pool is None or pool['owner_id'] != sub.owner_id:
+                return False
+        return True
+    
+    def _replay(self, sub: AlertSubscription, cursor: int):
+        positions, _ = self.api.alerts.query_positions(
+            cursor=cursor, limit=self.replay_limit, child_id=sub.child_id, pool_id=sub.pool_id)
+        for position in positions:
+            alert = self.api.alerts[position]
+            if self._matches(sub, alert):
+                sub.queue.append((position, alert, False))
+            sub.last_queued = position
+    
+    def subscribe(self, pool_id: str = None, child_id: str = None, owner_id: str = None,
+                  last_event_id: int = None) -> Optional[AlertSubscription]:
+        """Register a stream; replays alerts after last_event_id first. None if full."""
+        if self.subscribers >= self.max_subscribers:
+            return None
+        
+        sub = AlertSubscription(pool_id, child_id, owner_id, self.queue_size)
+        if last_event_id is not None:
+            self._replay(sub, last_event_id + 1)
+        else:
+            sub.last_queued = self.api.alerts.end - 1
+        
+        with self._lock:
+            # Catch up on anything appended before we became visible to publish()
+            self._replay(sub, sub.last_queued + 1)
+            index, key = self._bucket(sub)
+            if index is None:
+                self._all.add(sub)
+            else:
+                index.setdefault(key, set()).add(sub)
+            self.subscribers += 1
+        return sub
+    
+    def unsubscribe(self, sub: AlertSubscription):
+        with self._lock:
+            index, key = self._bucket(sub)
+            if index is None:
+                found = sub in self._all
+                self._all.discard(sub)
+            else:
+                members = index.get(key, set())
+                found = sub in members
+                members.discard(sub)
+                if not members:
+                    index.pop(key, None)
+            if found:
+                self.subscribers -= 1
+        sub.closed = True
+    
+    def publish(self, position: int, alert: SafetyAlert, update: bool = False):
+        """Store listener: hand the alert (or a notified update) to every matching subscriber"""
+        if not self.subscribers:
+            return
+        pool = self.api.pools.get(alert.pool_id)
+        owner_id = pool['owner_id'] if pool else None
+        with self._lock:
+            candidates = list(self._all)
+            candidates.extend(self._by_pool.get(alert.pool_id, ()))
+            candidates.extend(self._by_child.get(alert.child_id, ()))
+            candidates.extend(self._by_owner.get(owner_id, ()))
+        
+        cut = []
+        for sub in candidates:
+            if self._matches(sub, alert) and not sub.offer(position, alert, self.overflow, update):
+                cut.append(sub)
+        self.published += 1
+        
+        for sub in cut:
+            self.unsubscribe(sub)
+            self.disconnected += 1
+    
+    def stats(self) -> Dict:
+        return {
+            'subscribers': self.subscribers,
+            'published': self.published,
+            'disconnected': self.disconnected,
+            'queue_size': self.queue_size,
+            'overflow': self.overflow
+        }
+
+
+def sse_event(position: int, alert: SafetyAlert, update: bool) -> str:
+    """One Server-Sent Event; updates carry no id so Last-Event-ID keeps tracking new alerts"""
+    data = responses.dumps(alert.to_dict()).decode()
+    if update:
+        return f"event: alert_update\ndata: {data}\n\n"
+    return f"id: {position}\nevent: alert\ndata: {data}\n\n"
+
+
+class MemoryStateStore:
+    """Default state backend: process-local dicts (or columnar tables)
+    
+    A backend provides mappings for pools, bonds, sessions and the bond
+    index, an AlertStore, and the few operations that must be atomic or
+    batched on a remote store (see redis_store.RedisStateStore).
+    
+    With journaled=True every mutation is also reported to set_journal()'s
+    callable as (kind, key, value), which is how wal_store.DurableState
+    makes the process-local state survive a restart.
+    """
+    
+    backend = 'memory'
+    
+    def __init__(self, columnar: bool = None, journaled: bool = False):
+        table = JournaledDict if journaled else dict
+        if Config.COLUMNAR_STORE if columnar is None else columnar:
+            self.pools = ColumnarTable('pool_id', POOL_SCHEMA)
+            self.bonds = ColumnarTable('bond_id', BOND_SCHEMA)
+            self.sessions = ColumnarTable('session_id', SESSION_SCHEMA)
+            self.alerts = AlertStore(AlertColumns())
+        else:
+            self.pools = table()
+            self.bonds = table()
+            self.sessions = table()
+            self.alerts = AlertStore()
+        self.bond_index = table()
+        self.earth_results = EarthResultStore()     # full results, evictable
+        self._bond_locks = [threading.Lock() for _ in range(64)]   # striped by bond_id
+        self.journal = None     # set_journal()
+        self.durable = None     # wal_store.DurableState when WAL_DIR is set
+    
+    def set_journal(self, journal):
+        """Report every mutation to journal(kind, key, value) from now on (None stops)"""
+        for kind in ('pools', 'bonds', 'sessions', 'bond_index'):
+            getattr(self, kind).journal = None if journal is None else partial(journal, kind)
+        self.alerts.journal = journal
+        self.journal = journal
+    
+    def record_checks(self, bonds: List[Mapping], alerts: List[SafetyAlert],
+                      updates: List[Tuple[SafetyAlert, bool]] = (),
+                      alert_rows: List[int] = None) -> List[Optional[int]]:
+        """Count one handshake per bond (in order), append alerts and apply alert updates
+        
+        alert_rows, when given, is the index into bonds of each alert; alerts
+        of bonds that no longer exist are dropped. Returns each bond's
+        handshake count after its increment, or None if the bond no longer
+        exists.
+        """
+        counts = []
+        logged = [] if self.journal is not None else None
+        for bond in bonds:
+            bond_id = bond['bond_id']
+            with self._bond_locks[hash(bond_id) & 63]:
+                # Re-read under the lock: the bond may have been deleted (or,
+                # in a columnar table, moved) since the caller looked it up
+                current = self.bonds.get(bond_id)
+                if current is None:
+                    counts.append(None)
+                    continue
+                handshakes = current['handshakes'] + 1
+                current['handshakes'] = handshakes
+            counts.append(handshakes)
+            if logged is not None:
+                logged.append((bond_id, handshakes))
+        if logged:
+            self.journal('handshakes', None, logged)
+        if alerts and alert_rows is not None:
+            alerts = [alert for alert, k in zip(alerts, alert_rows) if counts[k] is not None]
+        if alerts:
+            self.alerts.extend(alerts)
+        if updates:
+            self.alerts.revise(updates)
+        return counts
+    
+    def delete_bond(self, bond_id: str) -> bool:
+        # Deleting can move another row, so hold every stripe (deletes are rare)
+        for lock in self._bond_locks:
+            lock.acquire()
+        try:
+            return self.bonds.pop(bond_id, None) is not None
+        finally:
+            for lock in self._bond_locks:
+                lock.release()
+    
+    def sync_alerts(self):
+        """Pull alerts written by other processes (nothing to do in memory)"""
+    
+    def export(self) -> Dict[str, Any]:
+        """All durable state as columns (snapshots)
+        
+        {table: (keys, {column: values})} for pools, bonds, sessions and the
+        bond index, plus 'alerts': (base, {column: values}) in AlertColumns
+        layout. Numeric columns are
+        arrays; dict tables keep float64 (nothing is rounded) and leave 'b'
+        columns as lists, since earth_verified is a bool there.
+        """
+        state = {}
+        for name, (_, schema) in STATE_TABLES.items():
+            table = getattr(self, name)
+            if isinstance(table, ColumnarTable):
+                state[name] = table.export()
+                continue
+            rows = list(table.items())
+            columns = {}
+            for column, code in schema.items():
+                values = [record[column] for _, record in rows]
+                columns[column] = values if code in ('str', 'b') else array.array('d' if code == 'f' else code, values)
+            state[name] = ([key for key, _ in rows], columns)
+        index = list(self.bond_index.items())
+        state['bond_index'] = ([key for key, _ in index], {'session_id': [entry[0] for _, entry in index],
+                                                            'pool_id': [entry[1] for _, entry in index]})
+        base, rows = self.alerts.export()
+        state['alerts'] = (base, vars(rows))
+        return state
+    
+    def load(self, state: Dict[str, Any]):
+        """Replace all state with an export() (recovery); not journaled"""
+        for name, (key, schema) in STATE_TABLES.items():
+            keys, columns = state[name]
+            table = getattr(self, name)
+            if isinstance(table, ColumnarTable):
+                table.load(keys, columns)
+                continue
+            names = (key,) + tuple(schema)
+            table.clear()
+            dict.update(table, ((k, dict(zip(names, (k,) + row)))
+                                for k, row in zip(keys, zip(*(columns[column] for column in schema)))))
+        keys, columns = state['bond_index']
+        self.bond_index.clear()
+        dict.update(self.bond_index, zip(keys, zip(columns['session_id'], columns['pool_id'])))
+        base, columns = state['alerts']
+        self.alerts.load(base, AlertColumns.from_columns(columns))
+    
+    def apply(self, kind: str, key, value):
+        """Replay one journal record (recovery); not journaled
+        
+        Records are idempotent, so replaying a log over a snapshot that
+        already holds some of them converges on the same state.
+        """
+        if kind == 'handshakes':
+            for bond_id, count in value:
+                bond = self.bonds.get(bond_id)
+                if bond is not None and count > bond['handshakes']:
+                    bond['handshakes'] = count
+        elif kind == 'alert':
+            if key >= self.alerts.end:
+                self.alerts.append(SafetyAlert(*value))
+        elif kind == 'alert_update':
+            self.alerts.revise([(SafetyAlert(*value), False)])
+        elif kind == 'sos_sent':
+            self.alerts.mark_sos_sent(key)
+        elif kind == 'evict':
+            self.alerts._truncate(key)
+        elif value is None:
+            getattr(self, kind).pop(key, None)
+        else:
+            getattr(self, kind)[key] = tuple(value) if kind == 'bond_index' else value
+    
+    def stats(self) -> Dict:
+        return {'backend': self.backend, 'durable': self.durable.stats() if self.durable else None}
+
+
+def make_dispatcher(alerts: AlertStore):
+    """Outbound SOS/insurer dispatcher for the configured webhooks, or None if none are set"""
+    from dispatcher import OutboundDispatcher     # http.client is only loaded when a system is built
+    dispatcher = OutboundDispatcher.from_config(Config, on_sos_delivered=alerts.mark_sos_sent)
+    return dispatcher if dispatcher.enabled else None
+
+
+def make_feeds():
+    """Shared NASA/NOAA/USGS feed client, or None if FEEDS_ENABLED is off or aiohttp is missing"""
+    if not Config.FEEDS_ENABLED or not HAS_AIOHTTP:
+        return None
+    from feeds import FeedClient      # aiohttp is only loaded when feeds are on
+    return FeedClient.from_config(Config)
+
+
+def make_state_store(backend: str = None):
+    """Build the configured state backend (Config.STATE_STORE)"""
+    backend = backend or Config.STATE_STORE
+    if backend == 'redis':
+        from redis_store import RedisStateStore
+        return RedisStateStore.from_config(AlertStore(), SafetyAlert)
+    if Config.WAL_DIR:
+        from wal_store import DurableState      # file I/O (and Fernet) only load when the WAL is on
+        store = MemoryStateStore(journaled=True)
+        DurableState.from_config(store).recover()
+        return store
+    return MemoryStateStore()
+
+
+class ChildTelemetry:
+    """Rolling per-child state: a ring buffer of recent fixes and EWMA heart rate
+    
+    Each child owns one slot in flat arrays: `window` fixes (time, lat, lon,
+    distance to pool) written round-robin, and a running heart-rate
+    mean/variance updated in O(1). Once max_children are tracked the least
+    recently updated child's slot is reused, so memory stays at
+    max_children * window fixes however many children come and go.
+    
+    Only fixes the server located (lat/lon) enter the ring buffer: approach
+    velocity and time-to-pool come from distances the server computed, and a
+    fix implying more than TELEMETRY_MAX_SPEED_MPS is rejected. After
+    TELEMETRY_MAX_REJECTS rejections in a row the track re-anchors on the new
+    fix (the old anchor was the bad one). State is per process; each worker
+    or shard tracks the children it serves.
+    """
+    
+    def __init__(self, max_children: int = None, window: int = None):
+        self.max_children = max_children or Config.TELEMETRY_MAX_CHILDREN
+        self.window = window or Config.TELEMETRY_WINDOW
+        self.horizon_ms = Config.TELEMETRY_HORIZON_S * 1000.0
+        self._slots = OrderedDict()         # child_id -> slot, least recently updated first
+        self._t = array.array('d')          # fix k of slot s lives at s * window + k
+        self._lat = array.array('d')
+        self._lon = array.array('d')
+        self._dist = array.array('d')
+        self._head = array.array('i')       # per slot: next ring position
+        self._count = array.array('i')      # per slot: fixes held (<= window)
+        self._rejects = array.array('i')    # per slot: consecutive rejected fixes
+        self._hr_mean = array.array('d')
+        self._hr_var = array.array('d')
+        self._ring_zeros = array.array('d', [0.0]) * self.window
+        self._lock = threading.Lock()
+        self.updates = 0
+        self.rejected = 0
+        self.reanchored = 0
+        self.evictions = 0
+    
+    def _slot(self, child_id: str) -> Tuple[int, bool]:
+        """(slot, is_new) for a child, recycling the least recently updated slot when full"""
+        slot = self._slots.get(child_id)
+        if slot is not None:
+            self._slots.move_to_end(child_id)
+            return slot, False
+        if len(self._slots) < self.max_children:
+            slot = len(self._slots)
+            if slot == len(self._head):
+                for ring in (self._t, self._lat, self._lon, self._dist):
+                    ring.extend(self._ring_zeros)
+                for column in (self._head, self._count, self._rejects):
+                    column.append(0)
+                self._hr_mean.append(0.0)
+                self._hr_var.append(0.0)
+        else:
+            _, slot = self._slots.popitem(last=False)
+            self.evictions += 1
+        self._head[slot] = self._count[slot] = self._rejects[slot] = 0
+        self._slots[child_id] = slot
+        return slot, True
+    
+    def update(self, child_id: str, timestamp_ms: float, heart_rate: float,
+               lat: float = None, lon: float = None, distance: float = 0.0) -> TrackReading:
+        """Fold one reading into the child's state (fixed cost: at most `window` fixes are read)"""
+        with self._lock:
+            slot, new = self._slot(child_id)
+            self.updates += 1
+            window = self.window
+            base = slot * window
+            
+            # Gate the fix against the last accepted one before anything is updated
+            speed = 0.0
+            append = lat is not None
+            if append and self._count[slot]:
+                last = base + (self._head[slot] - 1) % window
+                moved = max(0.0, haversine_m(self._lat[last], self._lon[last], lat, lon)
+                            - Config.TELEMETRY_GPS_TOLERANCE_M)
+                elapsed = (timestamp_ms - self._t[last]) / 1000.0
+                append = elapsed > 0
+                if moved and (elapsed <= 0 or moved / elapsed > Config.TELEMETRY_MAX_SPEED_MPS):
+                    speed = moved / elapsed if elapsed > 0 else math.inf
+                    self._rejects[slot] += 1
+                    if self._rejects[slot] < Config.TELEMETRY_MAX_REJECTS:
+                        self.rejected += 1
+                        return TrackReading(False, self._hr_mean[slot], math.sqrt(self._hr_var[slot]),
+                                            speed_mps=speed, samples=self._count[slot])
+                    self._count[slot] = 0
+                    self.reanchored += 1
+                    append = True
+            self._rejects[slot] = 0
+            
+            # Heart rate: exponentially weighted mean and variance
+            if new:
+                self._hr_mean[slot] = heart_rate
+                self._hr_var[slot] = 0.0
+            else:
+                alpha = Config.TELEMETRY_HR_ALPHA
+                diff = heart_rate - self._hr_mean[slot]
+                self._hr_mean[slot] += alpha * diff
+                self._hr_var[slot] = (1 - alpha) * (self._hr_var[slot] + alpha * diff * diff)
+            reading = TrackReading(True, self._hr_mean[slot], math.sqrt(self._hr_var[slot]),
+                                   speed_mps=speed, samples=self._count[slot])
+            if not append:
+                return reading
+            
+            head = self._head[slot]
+            i = base + head
+            self._t[i], self._lat[i], self._lon[i], self._dist[i] = timestamp_ms, lat, lon, distance
+            self._head[slot] = (head + 1) % window
+            n = self._count[slot] = min(self._count[slot] + 1, window)
+            reading.samples = n
+            
+            # Approach velocity over the fixes within the horizon (newest vs oldest)
+            oldest = i
+            for k in range(1, n):
+                j = base + (head - k) % window
+                if timestamp_ms - self._t[j] > self.horizon_ms:
+                    break
+                oldest = j
+            if oldest != i:
+                velocity = (self._dist[oldest] - distance) / ((timestamp_ms - self._t[oldest]) / 1000.0)
+                reading.velocity_mps = velocity
+                if velocity > Config.TELEMETRY_APPROACH_MPS:
+                    reading.time_to_pool_s = distance / velocity
+            return reading
+    
+    def forget(self, child_id: str) -> bool:
+        """Drop a child's history (its slot is reset when next handed out)"""
+        with self._lock:
+            slot = self._slots.get(child_id)
+            if slot is None:
+                return False
+            self._count[slot] = 0
+            return True
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            columns = (self._t, self._lat, self._lon, self._dist, self._head, self._count,
+                       self._rejects, self._hr_mean, self._hr_var)
+            return {
+                'children': len(self._slots),
+                'max_children': self.max_children,
+                'window': self.window,
+                'updates': self.updates,
+                'rejected': self.rejected,
+                'reanchored': self.reanchored,
+                'evictions': self.evictions,
+                'array_bytes': sum(c.itemsize * len(c) for c in columns)
+            }
+
+
+class AlertDebouncer:
+    """Per-bond alert state with hysteresis, so one danger episode is one alert
+    
+    A bond's alert opens when danger goes over ALERT_RAISE_THRESHOLD and
+    stays open until it drops under ALERT_CLEAR_THRESHOLD. Readings in
+    between update the open alert (latest and peak probability, count,
+    last_seen) instead of raising new ones, and are not pushed to listeners;
+    subscribers hear about an open alert again every ALERT_RENOTIFY_S, and
+    once more when it clears.
+    
+    An alert with no reading for ALERT_DEBOUNCE_STALE_S (device off, child
+    went home) is closed as cleared, so danger after the gap raises a new
+    alert - a new incident for insurers and SOS - instead of updating it.
+    
+    State is per process, like ChildTelemetry: with several workers each
+    one debounces the bonds it serves.
+    """
+    
+    RAISED, UPDATED, RENOTIFIED, CLEARED = 'raised', 'updated', 'renotified', 'cleared'
+    OPEN = (RAISED, UPDATED, RENOTIFIED)
+    
+    def __init__(self):
+        self._open: Dict[str, List] = {}     # bond_id -> [open alert, last notified ms]
+        self._locks = [threading.Lock() for _ in range(64)]   # striped by bond_id
+        self.expired = 0    # stale alerts closed by expire()
+    
+    def observe(self, bond_id: str, child_id: str, pool_id: str, danger: float,
+                now_ms: int, seed: str) -> Tuple[Optional[str], Optional[SafetyAlert], Optional[SafetyAlert]]:
+        """Fold one reading into the bond's alert state
+        
+        Returns (event, alert, expired): the event is None when no alert is
+        open and none is raised, and the alert is a snapshot for the store
+        (seed is hashed into the alert_id of a new alert). expired is the
+        cleared snapshot of a stale alert this reading closed, else None.
+        """
+        expired = None
+        with self._locks[hash(bond_id) & 63]:
+            state = self._open.get(bond_id)
+            if state is not None and self._stale(state[0], now_ms):
+                expired = self._close(bond_id, state[0])
+                self.expired += 1
+                state = None
+            if state is None:
+                if danger <= Config.ALERT_RAISE_THRESHOLD:
+                    return None, None, expired
+                alert = SafetyAlert(
+                    alert_id=hashlib.md5(seed.encode()).hexdigest()[:16],
+                    child_id=child_id,
+                    pool_id=pool_id,
+                    danger_probability=danger,
+                    timestamp=now_ms,
+                    triggered=True,
+                    last_seen=now_ms,
+                    peak_probability=danger
+                )
+                self._open[bond_id] = [alert, now_ms]
+                return self.RAISED, replace(alert), expired
+            
+            alert = state[0]
+            alert.danger_probability = danger
+            alert.peak_probability = max(alert.peak_probability, danger)
+            alert.count += 1
+            alert.last_seen = max(alert.last_seen, now_ms)
+            if danger < Config.ALERT_CLEAR_THRESHOLD:
+                return self.CLEARED, self._close(bond_id, alert), None
+            if now_ms - state[1] >= Config.ALERT_RENOTIFY_S * 1000:
+                state[1] = now_ms
+                alert.notifications += 1
+                return self.RENOTIFIED, replace(alert), None
+            return self.UPDATED, replace(alert), None
+    
+    @staticmethod
+    def _stale(alert: SafetyAlert, now_ms: int) -> bool:
+        return bool(Config.ALERT_DEBOUNCE_STALE_S) and now_ms - alert.last_seen >= Config.ALERT_DEBOUNCE_STALE_S * 1000
+    
+    def _close(self, bond_id: str, alert: SafetyAlert) -> SafetyAlert:
+        """Clear an open alert and drop its state (caller holds the bond's lock)"""
+        alert.cleared = True
+        del self._open[bond_id]
+        return replace(alert)
+    
+    def expire(self, now_ms: int = None) -> List[SafetyAlert]:
+        """Close every open alert with no reading for ALERT_DEBOUNCE_STALE_S; returns the cleared snapshots"""
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        expired = []
+        for bond_id, state in list(self._open.items()):
+            if not self._stale(state[0], now_ms):
+                continue
+            with self._locks[hash(bond_id) & 63]:
+                state = self._open.get(bond_id)
+                if state is not None and self._stale(state[0], now_ms):
+                    expired.append(self._close(bond_id, state[0]))
+        self.expired += len(expired)
+        return expired
+    
+    def forget(self, bond_id: str):
+        """Drop a bond's open alert state (the stored alert stays as it is)"""
+        with self._locks[hash(bond_id) & 63]:
+            self._open.pop(bond_id, None)
+    
+    def stats(self) -> Dict:
+        return {
+            'open': len(self._open),
+            'expired': self.expired,
+            'raise_threshold': Config.ALERT_RAISE_THRESHOLD,
+            'clear_threshold': Config.ALERT_CLEAR_THRESHOLD,
+            'renotify_s': Config.ALERT_RENOTIFY_S,
+            'stale_s': Config.ALERT_DEBOUNCE_STALE_S
+        }
+
+
+def track_fields(track: TrackReading) -> Dict:
+    """Telemetry fields added to a safety check result"""
+    return {
+        'velocity_mps': None if track.velocity_mps is None else round(track.velocity_mps, 3),
+        'time_to_pool_s': None if track.time_to_pool_s is None else round(track.time_to_pool_s, 1),
+        'heart_rate_smoothed': round(track.heart_rate, 1)
+    }
+
+
 class ChildSafetyAPI:
     """Your 20 drowning prevention logics"""
     
-    def __init__(self):
-        self.pools = {}      # pool_id -> pool data
-        self.bonds = {}      # bond_id -> family data
-        self.alerts = []     # safety alerts
+    def __init__(self, columnar: bool = None, store: 'MemoryStateStore' = None):
+        self.store = store or MemoryStateStore(columnar)
+        self.pools = self.store.pools      # pool_id -> pool data
+        self.bonds = self.store.bonds      # bond_id -> family data
+        self.alerts = self.store.alerts    # safety alerts
+        self.stream = AlertBroadcaster(self)    # live alert subscribers
+        self.pool_index = PoolSpatialIndex()    # spatial lookup over pools
+        self.telemetry = ChildTelemetry()       # per-child trajectory and heart rate
+        self.debouncer = AlertDebouncer()       # one open alert per bond
+        self.dispatcher = make_dispatcher(self.alerts)  # SOS + insurer webhooks (None if unconfigured)
+        self.owns = None    # id predicate when this instance is one shard (see sharding.py)
+        for pool_id, pool in self.pools.items():
+            self.pool_index.add(pool_id, pool['lat'], pool['lon'])
         self.total_points = 20
         
     def register_pool(self, owner_id: str, lat: float, lon: float, depth_m: float) -> str:
         """Register a pool"""
-        pool_id = hashlib.sha256(f"{owner_id}{lat}{lon}{time.time()}".encode()).hexdigest()[:16]
+        pool_id = make_id(f"{owner_id}{lat}{lon}{time.time()}", self.owns)
         self.pools[pool_id] = {
             'pool_id': pool_id,
             'owner_id': owner_id,
@@ -420,14 +2423,41 @@ class ChildSafetyAPI:
             'depth_m': depth_m,
             'created': time.time_ns()
         }
+        self.pool_index.add(pool_id, lat, lon)
         return pool_id
     
+    def pools_near(self, lat: float, lon: float, radius_m: float = None, k: int = None) -> List[Dict]:
+        """Pools within radius_m of a point, or the k nearest (optionally within radius_m)"""
+        if k is None:
+            hits = self.pool_index.within(lat, lon, radius_m or Config.POOL_ALARM_RADIUS_M)
+        else:
+            hits = self.pool_index.nearest(lat, lon, k, radius_m)
+        pools = []
+        for d, pool_id in hits:
+            pool = self.pools.get(pool_id)     # None if removed since the index lookup
+            if pool is not None:
+                pools.append(dict(pool, distance_m=round(d, 2)))
+        return pools
+    
+    def remove_pool(self, pool_id: str) -> bool:
+        """Remove a pool (bonds to it must be removed first)"""
+        self.pool_index.remove(pool_id)
+        return self.pools.pop(pool_id, None) is not None
+    
+    def locate_child(self, lat: float, lon: float, pool: Dict) -> Tuple[float, str]:
+        """Server-side distance to the closest pool (the bonded pool or any nearer one)"""
+        distance = haversine_m(lat, lon, pool['lat'], pool['lon'])
+        nearest = self.pool_index.nearest(lat, lon, 1, min(distance, Config.POOL_ALARM_RADIUS_M))
+        if nearest and nearest[0][0] < distance:
+            return nearest[0]
+        return distance, pool['pool_id']
+    
     def create_bond(self, mother_id: str, child_id: str, pool_id: str) -> str:
         """Create quantum bond between mother and child"""
         if pool_id not in self.pools:
             return None
         
-        bond_id = hashlib.sha256(f"{mother_id}{child_id}{pool_id}{time.time()}".encode()).hexdigest()[:16]
+        bond_id = make_id(f"{mother_id}{child_id}{pool_id}{time.time()}", self.owns)
         self.bonds[bond_id] = {
             'bond_id': bond_id,
             'mother_id': mother_id,
@@ -438,73 +2468,729 @@ class ChildSafetyAPI:
         }
         return bond_id
     
+    def remove_bond(self, bond_id: str) -> bool:
+        """Remove a bond"""
+        self.debouncer.forget(bond_id)
+        return self.store.delete_bond(bond_id)
+    
     def check_safety(self, bond_id: str, child: ChildState) -> Dict:
         """Run safety check - all 20 logics"""
         
-        if bond_id not in self.bonds:
+        start = time.perf_counter()
+        bond = self.bonds.get(bond_id)
+        if bond is None:
             return {'error': 'Bond not found'}
         
-        bond = self.bonds[bond_id]
         pool = self.pools.get(bond['pool_id'])
         
         if not pool:
             return {'error': 'Pool not found'}
         
+        # Server-side distance when the child reports a position
+        distance, pool_id = child.distance_to_pool, bond['pool_id']
+        located = child.lat is not None and child.lon is not None
+        if located:
+            distance, pool_id = self.locate_child(child.lat, child.lon, pool)
+        
+        # Server clock for telemetry, debouncing and the alert (as in the batch path);
+        # child.timestamp is the device's own and is not trusted
+        timestamp_ns = time.time_ns()
+        timestamp_ms = timestamp_ns // 1_000_000
+        
+        # Rolling telemetry: jump gate, server-side approach velocity, smoothed heart rate
+        track = self.telemetry.update(child.child_id, timestamp_ms, child.heart_rate,
+                                      child.lat if located else None, child.lon if located else None,
+                                      distance)
+        if not track.accepted:
+            return {'error': f'Impossible jump: {track.speed_mps:.0f} m/s since the last fix'}
+        moving = child.moving_toward_pool
+        if track.velocity_mps is not None:
+            moving = track.velocity_mps > Config.TELEMETRY_APPROACH_MPS
+        
         # Calculate danger probability
-        distance_factor = max(0, 1.0 - child.distance_to_pool / 10.0)
-        movement_factor = 0.3 if child.moving_toward_pool else 0.0
-        heart_factor = max(0, (child.heart_rate - 60) / 100)
+        distance_factor = max(0, 1.0 - distance / 10.0)
+        movement_factor = 0.3 if moving else 0.0
+        heart_factor = max(0, (track.heart_rate - 60) / 100)
         
         danger_prob = min(1.0, distance_factor * 0.5 + movement_factor + heart_factor * 0.2)
         
-        # Update handshakes
-        bond['handshakes'] += 1
-        
-        # Check if alert needed
-        alert = danger_prob > 0.8
+        # Raise, update or clear the bond's alert (hysteresis, one open alert per bond)
+        event, open_alert, expired = self.debouncer.observe(bond_id, child.child_id, pool_id, danger_prob,
+                                                            timestamp_ms, f"{bond_id}{timestamp_ns}")
+        new_alerts, updates = [], []
+        if expired is not None:
+            updates.append((expired, True))     # the quiet episode ends before a new one starts
         
         result = {
             'bond_id': bond_id,
             'child_id': child.child_id,
             'danger_probability': round(danger_prob, 4),
-            'alert': alert,
-            'handshake_count': bond['handshakes'],
-            'timestamp': time.time_ns(),
-            'logics_applied': 20
+            'alert': event in AlertDebouncer.OPEN,
+            'alert_event': event,
+            'handshake_count': None,
+            'timestamp': timestamp_ns,
+            'logics_applied': 20,
+            'distance_m': round(distance, 2),
+            'pool_id': pool_id,
+            **track_fields(track)
         }
         
-        if alert:
-            alert_id = hashlib.md5(f"{bond_id}{time.time()}".encode()).hexdigest()[:16]
-            alert_obj = SafetyAlert(
-                alert_id=alert_id,
-                child_id=child.child_id,
-                pool_id=bond['pool_id'],
-                danger_probability=danger_prob,
-                triggered=True,
-                satelite_sos_sent=True
-            )
-            self.alerts.append(alert_obj)
-            result['alert_id'] = alert_id
+        if open_alert is not None:
+            result['alert_id'] = open_alert.alert_id
+            if event == AlertDebouncer.RAISED:
+                new_alerts.append(open_alert)
+            else:
+                updates.append((open_alert, event != AlertDebouncer.UPDATED))
+        
+        # Update handshakes and store the alert (one round trip on remote stores); a bond
+        # deleted meanwhile gets no new alert and no debouncer state
+        handshakes = self.store.record_checks([bond], new_alerts, updates, alert_rows=[0] * len(new_alerts))[0]
+        if handshakes is None:
+            self.debouncer.forget(bond_id)
+            return {'error': 'Bond not found'}
+        result['handshake_count'] = handshakes
+        if self.dispatcher is not None and (new_alerts or updates):
+            self._dispatch(new_alerts, updates)
         
+        if metrics.ENABLED:
+            SAFETY_HANDSHAKES.inc()
+            if new_alerts:
+                ALERTS_RAISED.inc(len(new_alerts))
+            SAFETY_SECONDS.observe(time.perf_counter() - start)
         return result
     
+    def check_safety_batch(self, bond_ids: List[str], child_ids: List[str],
+                           distances, moving_toward, heart_rates,
+                           lats=None, lons=None) -> List[Dict]:
+        """Run safety checks for many children at once (same math as check_safety)"""
+        
+        n = len(bond_ids)
+        results: List[Optional[Dict]] = [None] * n
+        
+        # Resolve bonds first so only valid rows are scored
+        rows = []
+        bonds = []
+        pools = []
+        for i, bond_id in enumerate(bond_ids):
+            bond = self.bonds.get(bond_id)
+            pool = None if bond is None else self.pools.get(bond['pool_id'])
+            if bond is None:
+                results[i] = {'error': 'Bond not found'}
+            elif pool is None:
+                results[i] = {'error': 'Pool not found'}
+            else:
+                rows.append(i)
+                bonds.append(bond)
+                pools.append(pool)
+        
+        if not rows:
+            return results
+        
+        idx = np.asarray(rows, dtype=np.intp)
+        distance = np.asarray(distances, dtype=np.float64)[idx]
+        moving = np.asarray(moving_toward, dtype=bool)[idx]
+        heart = np.asarray(heart_rates, dtype=np.float64)[idx]
+        pool_ids = [bond['pool_id'] for bond in bonds]
+        
+        # Server-side distance for rows that report a position
+        located = [False] * len(rows)
+        if lats is not None and lons is not None:
+            for k, i in enumerate(rows):
+                if lats[i] is not None and lons[i] is not None:
+                    located[k] = True
+                    distance[k], pool_ids[k] = self.locate_child(lats[i], lons[i], pools[k])
+        
+        timestamp_ns = time.time_ns()
+        timestamp_ms = timestamp_ns // 1_000_000
+        
+        # Rolling telemetry per row, in input order (rejected jumps are not scored)
+        tracks = []
+        kept = []
+        for k, i in enumerate(rows):
+            track = self.telemetry.update(child_ids[i], timestamp_ms, float(heart[k]),
+                                          lats[i] if located[k] else None,
+                                          lons[i] if located[k] else None, float(distance[k]))
+            if not track.accepted:
+                results[i] = {'error': f'Impossible jump: {track.speed_mps:.0f} m/s since the last fix'}
+                continue
+            kept.append(k)
+            tracks.append(track)
+            if track.velocity_mps is not None:
+                moving[k] = track.velocity_mps > Config.TELEMETRY_APPROACH_MPS
+            heart[k] = track.heart_rate
+        if len(kept) < len(rows):
+            if not kept:
+                return results
+            rows = [rows[k] for k in kept]
+            bonds = [bonds[k] for k in kept]
+            pool_ids = [pool_ids[k] for k in kept]
+            keep = np.asarray(kept, dtype=np.intp)
+            distance, moving, heart = distance[keep], moving[keep], heart[keep]
+        
+        # Calculate danger probability (vectorized, same operation order as scalar path)
+        distance_factor = np.maximum(0, 1.0 - distance / 10.0)
+        movement_factor = np.where(moving, 0.3, 0.0)
+        heart_factor = np.maximum(0, (heart - 60) / 100)
+        
+        danger = np.minimum(1.0, distance_factor * 0.5 + movement_factor + heart_factor * 0.2)
+        
+        new_alerts, updates = [], []
+        alert_rows, update_rows = [], []    # index into bonds of each alert / update
+        
+        for k, (i, bond, pool_id, dist, prob, track) in enumerate(zip(rows, bonds, pool_ids, distance.tolist(),
+                                                                       danger.tolist(), tracks)):
+            bond_id = bond_ids[i]
+            child_id = child_ids[i]
+            event, open_alert, expired = self.debouncer.observe(bond_id, child_id, pool_id, prob, timestamp_ms,
+                                                                f"{bond_id}{timestamp_ns}{i}")
+            if expired is not None:
+                updates.append((expired, True))
+                update_rows.append(k)
+            
+            result = {
+                'bond_id': bond_id,
+                'child_id': child_id,
+                'danger_probability': round(prob, 4),
+                'alert': event in AlertDebouncer.OPEN,
+                'alert_event': event,
+                'handshake_count': None,
+                'timestamp': timestamp_ns,
+                'logics_applied': 20,
+                'distance_m': round(dist, 2),
+                'pool_id': pool_id,
+                **track_fields(track)
+            }
+            
+            if open_alert is not None:
+                result['alert_id'] = open_alert.alert_id
+                if event == AlertDebouncer.RAISED:
+                    new_alerts.append(open_alert)
+                    alert_rows.append(k)
+                else:
+                    updates.append((open_alert, event != AlertDebouncer.UPDATED))
+                    update_rows.append(k)
+            
+            results[i] = result
+        
+        # Update handshakes in input order, so repeated bonds count like scalar calls
+        counts = self.store.record_checks(bonds, new_alerts, updates, alert_rows=alert_rows)
+        gone = False
+        for i, bond_id, handshakes in zip(rows, (bond_ids[i] for i in rows), counts):
+            if handshakes is None:
+                results[i] = {'error': 'Bond not found'}
+                self.debouncer.forget(bond_id)
+                gone = True
+            else:
+                results[i]['handshake_count'] = handshakes
+        if gone:
+            new_alerts = [a for a, k in zip(new_alerts, alert_rows) if counts[k] is not None]
+            updates = [u for u, k in zip(updates, update_rows) if counts[k] is not None]
+        if self.dispatcher is not None and (new_alerts or updates):
+            self._dispatch(new_alerts, updates)
+        
+        if metrics.ENABLED:
+            SAFETY_HANDSHAKES.inc(sum(1 for c in counts if c is not None))
+            if new_alerts:
+                ALERTS_RAISED.inc(len(new_alerts))
+        return results
+    
+    def _dispatch(self, new_alerts: List[SafetyAlert], updates: List[Tuple[SafetyAlert, bool]]):
+        """Queue SOS for raised, re-notified and cleared alerts; insurers get raised and cleared"""
+        now_ms = int(time.time() * 1000)
+        for alert in new_alerts:
+            self.dispatcher.submit({'type': 'alert.raised', 'sent_at': now_ms, 'alert': alert.to_dict()},
+                                   alert.alert_id)
+        for alert, notify in updates:
+            if notify:
+                kind = 'alert.cleared' if alert.cleared else 'alert.renotified'
+                self.dispatcher.submit({'type': kind, 'sent_at': now_ms, 'alert': alert.to_dict()},
+                                       alert.alert_id, insurer=alert.cleared)
+    
+    def expire_alerts(self, now_ms: int = None) -> int:
+        """Close open alerts that have gone quiet (see AlertDebouncer); returns how many"""
+        expired = self.debouncer.expire(now_ms)
+        if expired:
+            updates = [(alert, True) for alert in expired]
+            self.store.record_checks([], [], updates)
+            if self.dispatcher is not None:
+                self._dispatch([], updates)
+        return len(expired)
+    
+    def alerts_version(self) -> int:
+        """Alert store version after pulling other workers' alerts (the /alerts ETag)"""
+        self.store.sync_alerts()
+        return self.alerts.version
+    
     def get_alerts(self, since: int = None) -> List[Dict]:
         """Get all alerts"""
-        if since:
-            return [a.to_dict() for a in self.alerts if a.timestamp > since]
-        return [a.to_dict() for a in self.alerts]
+        self.store.sync_alerts()
+        alerts, _ = self.alerts.query(since=since)
+        return [a.to_dict() for a in alerts]
+    
+    def query_alerts(self, since: int = None, cursor: int = None, limit: int = None,
+                     child_id: str = None, pool_id: str = None) -> Dict:
+        """Get a page of alerts with a cursor for the next poll (ValueError for a non-integer cursor)"""
+        if cursor is not None and not isinstance(cursor, int):
+            raise ValueError('cursor must be an integer, as returned in next_cursor')
+        self.store.sync_alerts()
+        alerts, next_cursor = self.alerts.query(since, cursor, limit, child_id, pool_id)
+        return {
+            'alerts': [a.to_dict() for a in alerts],
+            'next_cursor': next_cursor
+        }
 
 # ============================================
 # PART 3: THE BRIDGE - BOTH SYSTEMS TOGETHER
 # ============================================
 
+class EarthRevalidationScheduler:
+    """Background worker that re-validates each session's location on a TTL
+    
+    Results are recorded on the session ('earth_verified', 'earth_checked')
+    so safety checks only read a flag. The worker thread starts lazily on
+    the first scheduled session.
+    """
+    
+    def __init__(self, system: 'ZER01NE67', ttl_s: float = None, autostart: bool = True):
+        self.system = system
+        self.ttl_s = Config.EARTH_REVALIDATE_TTL_S if ttl_s is None else ttl_s
+        self.autostart = autostart
+        self._heap = []              # (due_monotonic, session_id)
+        self._urgent = deque()       # session_ids requested by safety checks
+        self._waiters = {}           # session_id -> threading.Event
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.runs = 0
+        self.lost = 0
+        self.failures = 0
+    
+    def schedule(self, session_id: str, delay_s: float = None):
+        """Queue a session for re-validation after delay_s (default: TTL)"""
+        due = time.monotonic() + (self.ttl_s if delay_s is None else delay_s)
+        with self._cond:
+            heapq.heappush(self._heap, (due, session_id))
+            self._cond.notify()
+        if self.autostart:
+            self.start()
+    
+    def request(self, session_id: str) -> threading.Event:
+        """Ask for an immediate re-validation; the event is set when it is recorded"""
+        with self._cond:
+            event = self._waiters.get(session_id)
+            if event is None:
+                event = self._waiters[session_id] = threading.Event()
+                self._urgent.append(session_id)
+                self._cond.notify()
+        if self.autostart:
+            self.start()
+        return event
+    
+    def prune(self) -> int:
+        """Drop queued entries of sessions that no longer exist; returns how many"""
+        sessions = self.system.sessions
+        with self._cond:
+            kept = [entry for entry in self._heap if entry[1] in sessions]
+            dropped = len(self._heap) - len(kept)
+            if dropped:
+                heapq.heapify(kept)
+                self._heap = kept
+        return dropped
+    
+    def is_stale(self, session: Dict) -> bool:
+        return time.time_ns() - session.get('earth_checked', 0) > self.ttl_s * 1e9
+    
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='earth-revalidation', daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _next(self) -> Tuple[Optional[str], bool]:
+        """Block until a session is due (or stop); called with _cond held"""
+        while not self._stopped:
+            if self._urgent:
+                return self._urgent.popleft(), False
+            if self._heap:
+                wait = self._heap[0][0] - time.monotonic()
+                if wait <= 0:
+                    return heapq.heappop(self._heap)[1], True
+                self._cond.wait(wait)
+            else:
+                self._cond.wait()
+        return None, False
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                session_id, reschedule = self._next()
+            if session_id is None:
+                return
+            try:
+                self.revalidate(session_id, reschedule)
+            except Exception:
+                self.failures += 1
+    
+    def revalidate(self, session_id: str, reschedule: bool = False):
+        """Re-run the 47 points for one session and record the outcome"""
+        try:
+            session = self.system.sessions.get(session_id)
+            if session is None:
+                return
+            
+            earth = self.system.earth.validate_location(session['lat'], session['lon'], 300.0)
+            with self.system.session_lock:
+                session = self.system.sessions.get(session_id)
+                if session is None:
+                    return
+                session.update(earth_summary(earth))
+                session['earth_checked'] = time.time_ns()
+                session['earth_ref'] = self.system.store.earth_results.put(session_id, earth)
+                self.system.sessions[session_id] = session
+            self.runs += 1
+            if not earth['verified']:
+                self.lost += 1
+            
+            # Due sessions re-enter the heap; urgent runs keep their existing entry
+            if reschedule:
+                self.schedule(session_id)
+        finally:
+            with self._cond:
+                event = self._waiters.pop(session_id, None)
+            if event is not None:
+                event.set()
+    
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'ttl_s': self.ttl_s,
+                'scheduled': len(self._heap),
+                'urgent': len(self._urgent),
+                'runs': self.runs,
+                'lost': self.lost,
+                'failures': self.failures,
+                'running': self._thread is not None
+            }
+
+
+def earth_summary(earth_result: Dict) -> Dict:
+    """The part of a 47-point result a session keeps"""
+    return {
+        'collapse_state': earth_result['collapse_state'],
+        'average_confidence': earth_result['average_confidence'],
+        'points_passed': earth_result['points_passed'],
+        'earth_verified': earth_result['verified']
+    }
+
+
+# ============================================
+# RETENTION
+# ============================================
+
+def _deep_size(obj, seen: set, depth: int = 4) -> int:
+    """sys.getsizeof of an object plus what it holds, `depth` levels down; objects in `seen` count 0"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if depth:
+        depth -= 1
+        if isinstance(obj, dict):
+            size += sum(_deep_size(k, seen, depth) + _deep_size(v, seen, depth) for k, v in list(obj.items()))
+        elif isinstance(obj, (list, tuple)):
+            size += sum(_deep_size(v, seen, depth) for v in obj)
+        elif is_dataclass(obj):
+            size += sum(_deep_size(getattr(obj, f.name), seen, depth) for f in fields(obj))
+    return size
+
+
+def approx_bytes(container, sample: int = 32) -> int:
+    """Approximate bytes held by a dict, ColumnarTable, AlertColumns or list of records
+    
+    The size of up to `sample` entries is extrapolated to the whole
+    container. Objects shared between the sampled entries (interned keys,
+    cached Earth points) are counted once per sample, so they still
+    weigh in at 1/sample per entry and estimates err high.
+    """
+    n = len(container)
+    if isinstance(container, ColumnarTable):
+        size = sys.getsizeof(container._keys) + sys.getsizeof(container._rows)
+        size += sum(map(sys.getsizeof, container._columns.values()))
+        strings = [container._keys[:sample]] + [container._columns[name][:sample]
+                                                 for name, code in container.schema.items() if code == 'str']
+        held = len(strings[0])
+        if held:
+            unique = {id(s): s for column in strings for s in column if s is not None}
+            size += sum(map(sys.getsizeof, unique.values())) * n // held
+        return size
+    if isinstance(container, AlertColumns):
+        ids = container.alert_id[:sample]
+        size = sum(map(sys.getsizeof, vars(container).values()))
+        return size + (sum(map(sys.getsizeof, ids)) * n // len(ids) if ids else 0)
+    seen = set()
+    if isinstance(container, dict):
+        entries = list(islice(container.items(), sample))
+        size = sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in entries)
+    else:
+        entries = list(islice(container, sample))
+        size = sum(_deep_size(v, seen) for v in entries)
+    return sys.getsizeof(container) + (size * n // len(entries) if entries else 0)
+
+
+class RetentionManager:
+    """Idle expiry, alert age limit and memory budget, applied by a periodic sweep
+    
+    The sweep runs every RETENTION_SWEEP_S on a daemon thread, started only
+    if a session or bond TTL, ALERT_MAX_AGE_S or MEMORY_BUDGET_MB is set
+    (the alert count limit is enforced by AlertStore itself). Activity is
+    inferred without touching the check path: a bond was active since the
+    last sweep if its handshake count moved, and a session is as recent as
+    its newest bond (or its creation). Sessions and bonds are removed
+    through ZER01NE67, so the bond index, pool index and stored Earth
+    results stay consistent with them.
+    
+    Over the budget, the oldest alerts go first, then the least recently
+    active sessions with their bonds and pools. Session and bond expiry
+    need the process-local memory store: with Redis, one worker does not
+    see the activity of the others.
+    """
+    
+    BUDGET_TARGET = 0.9     # eviction aims this far under the memory budget
+    BUDGET_PASSES = 3       # measure-and-evict rounds per sweep
+    
+    def __init__(self, system: 'ZER01NE67', session_ttl_s: float = None, bond_ttl_s: float = None,
+                 budget_mb: float = None, interval_s: float = None, autostart: bool = True):
+        self.system = system
+        self.session_ttl_s = Config.SESSION_IDLE_TTL_S if session_ttl_s is None else session_ttl_s
+        self.bond_ttl_s = Config.BOND_IDLE_TTL_S if bond_ttl_s is None else bond_ttl_s
+        self.budget_mb = Config.MEMORY_BUDGET_MB if budget_mb is None else budget_mb
+        self.interval_s = interval_s or Config.RETENTION_SWEEP_S
+        self._activity: Dict[str, Tuple[int, float]] = {}   # bond_id -> (handshakes, last active epoch s)
+        self._lock = threading.Lock()       # one sweep at a time
+        self._stopped = threading.Event()
+        self._thread = None
+        self.sweeps = 0
+        self.failures = 0
+        self.expired_sessions = 0
+        self.expired_bonds = 0
+        self.budget_sessions = 0
+        self.budget_alerts = 0
+        if autostart and self.enabled:
+            self.start()
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.session_ttl_s or self.bond_ttl_s or self.budget_mb
+                    or self.system.safety.alerts.max_age_s)
+    
+    @property
+    def local(self) -> bool:
+        return self.system.store.backend == 'memory'
+    
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='retention', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        while not self._stopped.wait(self.interval_s):
+            try:
+                self.sweep()
+            except Exception:
+                self.failures += 1
+    
+    def sweep(self, now: float = None) -> Dict[str, int]:
+        """Apply TTLs, the alert age limit and the budget once; returns what was removed"""
+        now = time.time() if now is None else now
+        alerts = self.system.safety.alerts
+        removed = {'sessions': 0, 'bonds': 0, 'alerts': 0}
+        with self._lock:
+            base = alerts.base
+            if alerts.max_age_s:
+                alerts.evict(max_age_s=alerts.max_age_s, now=now)
+            self.system.safety.expire_alerts(int(now * 1000))
+            by_session = self._observe(now) if self.local else {}
+            if self.local and self.bond_ttl_s:
+                removed['bonds'] = self._expire_bonds(now)
+            if self.local and self.session_ttl_s:
+                removed['sessions'] = self._expire_sessions(now, by_session)
+            if self.budget_mb:
+                removed['sessions'] += self._enforce_budget(by_session)
+            if removed['sessions']:
+                self.system.revalidator.prune()
+            removed['alerts'] = alerts.base - base
+            self.sweeps += 1
+        return removed
+    
+    def _observe(self, now: float) -> Dict[str, List[str]]:
+        """Refresh each bond's last activity; returns session_id -> bond_ids"""
+        bonds, sessions = self.system.safety.bonds, self.system.sessions
+        previous, activity = self._activity, {}
+        by_session: Dict[str, List[str]] = {}
+        orphans = []
+        for bond_id, (session_id, _) in list(self.system.bond_index.items()):
+            bond = bonds.get(bond_id)
+            if bond is None:
+                continue
+            if session_id not in sessions:
+                orphans.append(bond_id)     # created while its session was being removed
+                continue
+            handshakes = bond['handshakes']
+            seen = previous.get(bond_id)
+            if seen is None:
+                last = now if handshakes else bond['created'] / 1e9
+            else:
+                last = now if handshakes != seen[0] else seen[1]
+            activity[bond_id] = (handshakes, last)
+            by_session.setdefault(session_id, []).append(bond_id)
+        self._activity = activity
+        for bond_id in orphans:
+            self.system.remove_family_bond(bond_id)
+        return by_session
+    
+    def _last_active(self, session_id: str, by_session: Dict[str, List[str]]) -> float:
+        session = self.system.sessions.get(session_id)
+        if session is None:
+            return math.inf
+        last = session['created'] / 1e9
+        for bond_id in by_session.get(session_id, ()):
+            seen = self._activity.get(bond_id)
+            if seen is not None and seen[1] > last:
+                last = seen[1]
+        return last
+    
+    def _expire_bonds(self, now: float) -> int:
+        expired = [bond_id for bond_id, (_, last) in self._activity.items() if now - last > self.bond_ttl_s]
+        for bond_id in expired:
+            del self._activity[bond_id]
+            self.system.remove_family_bond(bond_id)
+        self.expired_bonds += len(expired)
+        return len(expired)
+    
+    def _expire_sessions(self, now: float, by_session: Dict[str, List[str]]) -> int:
+        expired = [session_id for session_id in list(self.system.sessions)
+                   if now - self._last_active(session_id, by_session) > self.session_ttl_s]
+        for session_id in expired:
+            self._remove_session(session_id, by_session)
+        self.expired_sessions += len(expired)
+        return len(expired)
+    
+    def _remove_session(self, session_id: str, by_session: Dict[str, List[str]]):
+        bond_ids = by_session.pop(session_id, [])
+        for bond_id in bond_ids:
+            self._activity.pop(bond_id, None)
+        self.system.remove_session(session_id, bond_ids)
+    
+    def _enforce_budget(self, by_session: Dict[str, List[str]]) -> int:
+        """Evict under the budget: oldest alerts first, then LRU sessions; returns sessions removed
+        
+        Eviction frees average-sized entities, but tables keep part of their
+        allocation, so it aims at BUDGET_TARGET of the budget and measures
+        again (up to BUDGET_PASSES times) until the estimate is under it.
+        """
+        budget = self.budget_mb * 2**20
+        alerts = self.system.safety.alerts
+        removed = 0
+        for _ in range(self.BUDGET_PASSES):
+            usage = self.usage()
+            total = sum(category['bytes'] or 0 for category in usage.values())
+            if total <= budget:
+                break
+            excess = total - budget * self.BUDGET_TARGET
+            held = usage['alerts']['count']
+            if held:
+                drop = min(held, math.ceil(excess / (usage['alerts']['bytes'] / held)))
+                alerts.evict(max_count=held - drop)
+                self.budget_alerts += drop
+                excess -= drop * usage['alerts']['bytes'] / held
+            count = usage['sessions']['count']
+            if excess <= 0 or not self.local or not count:
+                continue
+            per_session = sum(usage[name]['bytes'] for name in ('sessions', 'pools', 'bonds', 'earth_results')) / count
+            victims = heapq.nsmallest(math.ceil(excess / per_session), list(self.system.sessions),
+                                      key=lambda session_id: self._last_active(session_id, by_session))
+            for session_id in victims:
+                self._remove_session(session_id, by_session)
+            self.budget_sessions += len(victims)
+            removed += len(victims)
+        return removed
+    
+    def usage(self) -> Dict[str, Dict]:
+        """Entity count and approximate bytes per category (bytes None when held in Redis)"""
+        store, local = self.system.store, self.local
+        
+        def category(container, *extra):
+            return {'count': len(container),
+                    'bytes': sum(map(approx_bytes, (container,) + extra)) if local else None}
+        
+        return {
+            'sessions': category(store.sessions),
+            'pools': category(store.pools),
+            'bonds': category(store.bonds, store.bond_index),
+            'alerts': {'count': len(store.alerts), 'bytes': store.alerts.memory_bytes()},
+            'earth_results': {'count': store.earth_results.stats().get('entries'),
+                              'bytes': store.earth_results.memory_bytes() if local else None}
+        }
+    
+    def stats(self) -> Dict:
+        usage = self.usage()
+        alerts = self.system.safety.alerts
+        return {
+            'budget_mb': self.budget_mb,
+            'total_bytes': sum(category['bytes'] or 0 for category in usage.values()),
+            'usage': usage,
+            'evictions': {
+                'sessions_idle': self.expired_sessions,
+                'bonds_idle': self.expired_bonds,
+                'sessions_budget': self.budget_sessions,
+                'alerts': alerts.base,
+                'alerts_budget': self.budget_alerts,
+                'earth_results': self.system.store.earth_results.stats().get('evictions')
+            },
+            'session_idle_ttl_s': self.session_ttl_s,
+            'bond_idle_ttl_s': self.bond_ttl_s,
+            'alert_max_history': alerts.max_history,
+            'alert_max_age_s': alerts.max_age_s,
+            'sweeps': self.sweeps,
+            'failures': self.failures,
+            'running': self._thread is not None
+        }
+
+
 class ZER01NE67:
     """COMPLETE SYSTEM: 47 + 20 = 67"""
     
-    def __init__(self):
-        self.earth = EarthValidator()      # 47 points
-        self.safety = ChildSafetyAPI()      # 20 logics
-        self.sessions = {}
+    def __init__(self, store: MemoryStateStore = None):
+        self.store = store or make_state_store()
+        self.earth = EarthValidator(cache=EarthPointCache(), feeds=make_feeds())      # 47 points
+        self.safety = ChildSafetyAPI(store=self.store)      # 20 logics
+        self.sessions = self.store.sessions
+        self.bond_index = self.store.bond_index   # bond_id -> (session_id, pool_id)
+        self.session_lock = threading.Lock()    # session read-modify-writes
+        self.revalidator = EarthRevalidationScheduler(self)
+        for session_id in self.sessions:
+            self.revalidator.schedule(session_id)
+        self.retention = RetentionManager(self)     # idle TTLs + memory budget (thread only if configured)
         
     def register_location(self, owner_id: str, lat: float, lon: float, 
                           depth_m: float = 1.2, name: str = "Pool") -> Dict:
@@ -523,20 +3209,22 @@ class ZER01NE67:
         pool_id = self.safety.register_pool(owner_id, lat, lon, depth_m)
         
         # Step 3: Create session
-        session_id = hashlib.sha256(f"{pool_id}{lat}{lon}{time.time()}".encode()).hexdigest()[:16]
+        session_id = make_id(f"{pool_id}{lat}{lon}{time.time()}", self.safety.owns)
         
-        self.sessions[session_id] = {
-            'session_id': session_id,
-            'pool_id': pool_id,
-            'owner_id': owner_id,
-            'lat': lat,
-            'lon': lon,
-            'depth_m': depth_m,
-            'name': name,
-            'earth_validation': earth_result,
-            'created': time.time_ns(),
-            'bonds': []
-        }
+        # Compact record: owner/depth live on the pool, bonds in the safety API,
+        # and the full 47-point payload in the evictable result store
+        self.sessions[session_id] = dict(
+            earth_summary(earth_result),
+            session_id=session_id,
+            pool_id=pool_id,
+            name=name,
+            lat=lat,
+            lon=lon,
+            earth_checked=time.time_ns(),
+            created=time.time_ns(),
+            earth_ref=self.store.earth_results.put(session_id, earth_result)
+        )
+        self.revalidator.schedule(session_id)
         
         return {
             'success': True,
@@ -556,22 +3244,34 @@ class ZER01NE67:
     def create_family_bond(self, session_id: str, mother_id: str, child_id: str) -> Dict:
         """Create quantum bond between mother and child"""
         
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             return {'error': 'Session not found'}
         
-        session = self.sessions[session_id]
-        
-        bond_id = self.safety.create_bond(mother_id, child_id, session['pool_id'])
+        pool_id = session['pool_id']
+        bond_id = self.safety.create_bond(mother_id, child_id, pool_id)
         
         if not bond_id:
             return {'error': 'Failed to create bond'}
         
-        session['bonds'].append({
+        # Bond details live only in the safety API; the index links it to the session
+        self.bond_index[bond_id] = (session_id, pool_id)
+        
+        return {
+            'success': True,
             'bond_id': bond_id,
-            'mother_id': mother_id,
-            'child_id': child_id,
-            'created': time.time_ns()
-        })
+            'session_id': session_id
+        }
+    
+    def remove_family_bond(self, bond_id: str) -> Dict:
+        """Remove a bond from its session, the safety API and the bond index"""
+        
+        entry = self.bond_index.pop(bond_id, None)
+        if entry is None:
+            return {'error': 'Bond not found'}
+        
+        session_id, _ = entry
+        self.safety.remove_bond(bond_id)
         
         return {
             'success': True,
@@ -579,38 +3279,166 @@ class ZER01NE67:
             'session_id': session_id
         }
     
-    def safety_check(self, bond_id: str, child: ChildState) -> Dict:
-        """Run safety check with Earth validation"""
+    def remove_session(self, session_id: str, bond_ids: List[str] = None) -> Dict:
+        """Remove a session with its bonds, its pool and its stored Earth result
         
-        # Find session
-        session_id = None
-        for sid, sess in self.sessions.items():
-            for b in sess.get('bonds', []):
-                if b['bond_id'] == bond_id:
-                    session_id = sid
-                    break
+        bond_ids, if the caller already knows them, saves a bond index scan.
+        """
+        with self.session_lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return {'error': 'Session not found'}
+            pool_id, earth_ref = session['pool_id'], session['earth_ref']
+            del self.sessions[session_id]
+        
+        # Bonds created after the session was looked up are left to the next retention sweep
+        if bond_ids is None:
+            bond_ids = [bond_id for bond_id, (sid, _) in list(self.bond_index.items()) if sid == session_id]
+        for bond_id in bond_ids:
+            self.remove_family_bond(bond_id)
+        self.safety.remove_pool(pool_id)
+        if earth_ref:
+            self.store.earth_results.discard(earth_ref)
         
-        if not session_id:
+        return {
+            'success': True,
+            'session_id': session_id,
+            'bonds_removed': len(bond_ids)
+        }
+    
+    def session_bonds(self, session_id: str) -> List[Dict]:
+        """Bonds registered under a session (scans the bond index)"""
+        return [dict(self.safety.bonds[bond_id]) for bond_id, (sid, _) in self.bond_index.items()
+                if sid == session_id and bond_id in self.safety.bonds]
+    
+    def get_earth_result(self, session_id: str) -> Dict:
+        """A session's Earth summary, plus the full result if still stored"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return {'error': 'Session not found'}
+        
+        ref = session['earth_ref']
+        full = self.store.earth_results.get(ref) if ref else None
+        summary = {key: session[key] for key in
+                   ('collapse_state', 'average_confidence', 'points_passed', 'earth_checked')}
+        summary['earth_verified'] = bool(session['earth_verified'])
+        return {
+            'session_id': session_id,
+            'summary': summary,
+            'result': full,
+            'evicted': full is None
+        }
+    
+    def safety_check(self, bond_id: str, child: ChildState, deadline_ms: float = None) -> Dict:
+        """Run safety check with Earth validation
+        
+        Earth status comes from the session's last background re-validation.
+        If it is older than the TTL and deadline_ms is given, an immediate
+        re-validation is requested and awaited for at most deadline_ms.
+        """
+        
+        # Find session (O(1) via bond index)
+        if metrics.ENABLED:
+            start = time.perf_counter()
+            entry = self.bond_index.get(bond_id)
+            BOND_LOOKUP_SECONDS.observe(time.perf_counter() - start)
+        else:
+            entry = self.bond_index.get(bond_id)
+        if entry is None:
             return {'error': 'Bond not found'}
         
-        session = self.sessions[session_id]
+        session_id, _ = entry
         
-        # Periodic Earth re-validation
-        if len(self.safety.alerts) % 10 == 0:
-            earth = self.earth.validate_location(session['lat'], session['lon'], 300.0)
-            if not earth['verified']:
-                return {'error': 'Earth validation lost - reanchor required'}
+        session = self.sessions.get(session_id)
+        if session is None:
+            return {'error': 'Bond not found'}   # session removed (expired) after the lookup
+        
+        # Earth status (re-validated in the background)
+        stale = self.revalidator.is_stale(session)
+        if stale and deadline_ms:
+            stale = not self.revalidator.request(session_id).wait(deadline_ms / 1000.0)
+            if not stale:
+                # The re-validation wrote a new session (remote stores hand out copies)
+                session = self.sessions.get(session_id)
+                if session is None:
+                    return {'error': 'Bond not found'}
+        if not session['earth_verified']:
+            return {'error': 'Earth validation lost - reanchor required'}
         
         # Run safety check
         result = self.safety.check_safety(bond_id, child)
+        if 'error' in result:
+            return result
         
         # Add Earth info
         result['earth_validated'] = True
+        result['earth_stale'] = stale
         result['phase'] = self.earth.phase.value
         result['total_handshakes'] = self.earth.handshakes
         
         return result
     
+    def safety_check_batch(self, bond_ids: List[str], child_ids: List[str],
+                           distances, moving_toward, heart_rates,
+                           lats=None, lons=None) -> List[Dict]:
+        """Run safety checks for a batch of readings, results in input order"""
+        
+        results: List[Optional[Dict]] = [None] * len(bond_ids)
+        
+        # Resolve sessions via bond index
+        rows = []
+        row_sessions = {}   # row -> session_id
+        for i, bond_id in enumerate(bond_ids):
+            entry = self.bond_index.get(bond_id)
+            if entry is None:
+                results[i] = {'error': 'Bond not found'}
+            else:
+                rows.append(i)
+                row_sessions[i] = entry[0]
+        
+        # Earth status (re-validated in the background)
+        sessions = {sid: self.sessions.get(sid) for sid in set(row_sessions.values())}
+        lost = {sid for sid, session in sessions.items() if session is None or not session['earth_verified']}
+        stale = {sid for sid, session in sessions.items() if session is not None
+                 and self.revalidator.is_stale(session)}
+        if lost:
+            kept = []
+            for i in rows:
+                session = sessions[row_sessions[i]]
+                if session is None:
+                    results[i] = {'error': 'Bond not found'}
+                elif row_sessions[i] in lost:
+                    results[i] = {'error': 'Earth validation lost - reanchor required'}
+                else:
+                    kept.append(i)
+            rows = kept
+        
+        if not rows:
+            return results
+        
+        # Run safety checks (vectorized)
+        checked = self.safety.check_safety_batch(
+            [bond_ids[i] for i in rows],
+            [child_ids[i] for i in rows],
+            [distances[i] for i in rows],
+            [moving_toward[i] for i in rows],
+            [heart_rates[i] for i in rows],
+            lats=None if lats is None else [lats[i] for i in rows],
+            lons=None if lons is None else [lons[i] for i in rows]
+        )
+        
+        phase = self.earth.phase.value
+        handshakes = self.earth.handshakes
+        for i, result in zip(rows, checked):
+            if 'error' not in result:
+                result['earth_validated'] = True
+                result['earth_stale'] = row_sessions[i] in stale
+                result['phase'] = phase
+                result['total_handshakes'] = handshakes
+            results[i] = result
+        
+        return results
+    
     def get_stats(self) -> Dict:
         """Get complete system statistics"""
         return {
@@ -626,29 +3454,172 @@ class ZER01NE67:
             'alerts': len(self.safety.alerts),
             'earth_handshakes': self.earth.handshakes,
             'phase': self.earth.phase.value,
+            'earth_cache': self.earth.cache.stats() if self.earth.cache else None,
+            'feeds': self.earth.feeds.stats() if self.earth.feeds else None,
+            'earth_revalidation': self.revalidator.stats(),
+            'earth_results': self.store.earth_results.stats(),
+            'alert_stream': self.safety.stream.stats(),
+            'alert_debounce': self.safety.debouncer.stats(),
+            'dispatcher': self.safety.dispatcher.stats() if self.safety.dispatcher else None,
+            'telemetry': self.safety.telemetry.stats(),
+            'state_store': self.store.stats(),
+            'memory': self.retention.stats(),
             'genesis': Config.GENESIS_TIMESTAMP,
             'hardware_id': Config.HARDWARE_ID
         }
 
 # ============================================
-# CREATE THE SYSTEM INSTANCE
+# STATIC RESPONSES
 # ============================================
 
-system = ZER01NE67()
+# Bodies that never change after startup, serialized (and compressed) once
+HOME_RESPONSE = Precomputed({
+    'system': Config.SYSTEM_NAME,
+    'version': Config.VERSION,
+    'zer01ne_points': Config.ZER01NE_POINTS,
+    'safety_points': Config.SAFETY_POINTS,
+    'total_points': Config.TOTAL_POINTS,
+    'equation': "47 + 20 = 67",
+    'genesis': Config.GENESIS_TIMESTAMP,
+    'status': 'operational'
+})
+POINTS_RESPONSE = Precomputed({
+    'points': [spec.to_dict() for spec in POINT_REGISTRY.values()],
+    'groups': {group: list(ids) for group, ids in POINT_GROUPS.items()}
+})
+HEALTH_PREFIX = b'{"status":"healthy","timestamp":'
+
+def health_body() -> bytes:
+    """/health without a JSON encoder call - only the timestamp changes"""
+    return HEALTH_PREFIX + str(time.time_ns()).encode() + b'}'
 
 # ============================================
-# FLASK SERVER (if available)
+# SYSTEM INSTANCE
 # ============================================
 
-if HAS_FLASK:
+_system = None
+_app = None
+_instance_lock = threading.RLock()    # get_app() -> create_app() -> get_system()
+
+def get_system() -> 'ZER01NE67':
+    """The process-wide ZER01NE67, created on first use rather than at import"""
+    global _system
+    if _system is None:
+        with _instance_lock:
+            if _system is None:
+                _system = ZER01NE67()
+    return _system
+
+def get_app():
+    """The Flask app for get_system(), created on first use"""
+    global _app
+    if _app is None:
+        with _instance_lock:
+            if _app is None:
+                _app = create_app()
+    return _app
+
+def __getattr__(name):
+    """`system` and `app` stay available as module attributes, built lazily"""
+    if name == 'system':
+        return get_system()
+    if name == 'app':
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ============================================
+# FLASK SERVER
+# ============================================
+
+def create_app(system: 'ZER01NE67' = None):
+    """Flask app serving `system` (default: get_system()); needs flask and flask-cors"""
+    from flask import Flask, Response, request, jsonify, send_from_directory
+    from flask.json.provider import DefaultJSONProvider
+    from flask_cors import CORS
+    if system is None:
+        system = get_system()
+    
+    class FastJSONProvider(DefaultJSONProvider):
+        """jsonify() and request.get_json() through responses (orjson when installed)"""
+        
+        def dumps(self, obj, **kwargs) -> str:
+            return responses.dumps(obj).decode()
+        
+        def loads(self, s, **kwargs):
+            return responses.loads(s)
+        
+        def response(self, *args, **kwargs) -> Response:
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(responses.dumps(obj), mimetype=self.mimetype)
+    
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     CORS(app)
-
+    
+    def precomputed_response(body: Precomputed) -> Response:
+        """Serve pre-serialized bytes in whichever encoding the client accepts"""
+        data, encoding = body.select(request.headers.get('Accept-Encoding'),
+                                     Config.RESPONSE_COMPRESS_MIN_BYTES)
+        response = app.response_class(data, mimetype='application/json')
+        response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+    
+    @app.after_request
+    def compress_response(response):
+        """gzip/deflate large JSON and text bodies when the client accepts it"""
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or not (response.is_json or response.mimetype.startswith('text/'))):
+            return response
+        body = response.get_data()
+        if len(body) < Config.RESPONSE_COMPRESS_MIN_BYTES:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = responses.negotiate(request.headers.get('Accept-Encoding'))
+        if encoding:
+            response.set_data(responses.compress(body, encoding, Config.RESPONSE_COMPRESS_LEVEL))
+            response.headers['Content-Encoding'] = encoding
+            etag, weak = response.get_etag()
+            if etag and not weak:
+                response.set_etag(etag, weak=True)   # same content, different bytes
+        return response
+    
+    @app.before_request
+    def start_timer():
+        request.environ['zer01ne.start'] = time.perf_counter()
+    
+    @app.after_request
+    def record_request(response):
+        """Latency and status per route; error responses counted by their message"""
+        start = request.environ.get('zer01ne.start')
+        if not metrics.ENABLED or start is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_SECONDS.labels(request.method, route).observe(time.perf_counter() - start)
+        HTTP_REQUESTS.labels(request.method, route, response.status_code).inc()
+        if response.status_code >= 400:
+            body = response.get_json(silent=True) if response.is_json else None
+            ERRORS.labels(metrics.error_type(body.get('error') if isinstance(body, dict) else
+                                             f"http_{response.status_code}")).inc()
+        return response
+    
+    @app.teardown_request
+    def record_exception(exc):
+        if exc is not None and metrics.ENABLED:
+            ERRORS.labels(type(exc).__name__).inc()
+    
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        """Counters and latency histograms in the Prometheus text format"""
+        return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+    
     @app.route('/Images/<path:filename>', methods=['GET'])
     def serve_images(filename):
         """Serve local dashboard images from the Images folder."""
         return send_from_directory('Images', filename)
-
+    
     @app.route('/dashboard', methods=['GET'])
     def dashboard():
         """Serve the professional API dashboard"""
@@ -660,23 +3631,11 @@ if HAS_FLASK:
     
     @app.route('/', methods=['GET'])
     def home():
-        return jsonify({
-            'system': Config.SYSTEM_NAME,
-            'version': Config.VERSION,
-            'zer01ne_points': Config.ZER01NE_POINTS,
-            'safety_points': Config.SAFETY_POINTS,
-            'total_points': Config.TOTAL_POINTS,
-            'equation': "47 + 20 = 67",
-            'genesis': Config.GENESIS_TIMESTAMP,
-            'status': 'operational'
-        })
+        return precomputed_response(HOME_RESPONSE)
     
     @app.route('/health', methods=['GET'])
     def health():
-        return jsonify({
-            'status': 'healthy',
-            'timestamp': time.time_ns()
-        })
+        return app.response_class(health_body(), mimetype='application/json')
     
     @app.route('/stats', methods=['GET'])
     def stats():
@@ -732,8 +3691,8 @@ if HAS_FLASK:
         
         child = ChildState(
             child_id=data['child'].get('child_id', 'unknown'),
-            lat=data['child'].get('lat', 0.0),
-            lon=data['child'].get('lon', 0.0),
+            lat=data['child'].get('lat'),
+            lon=data['child'].get('lon'),
             distance_to_pool=data['child'].get('distance', 0.0),
             moving_toward_pool=data['child'].get('moving_toward', False),
             heart_rate=data['child'].get('heart_rate', 60.0)
@@ -741,7 +3700,8 @@ if HAS_FLASK:
         
         result = system.safety_check(
             bond_id=data['bond_id'],
-            child=child
+            child=child,
+            deadline_ms=data.get('deadline_ms')
         )
         
         if 'error' in result:
@@ -749,19 +3709,128 @@ if HAS_FLASK:
         
         return jsonify(result)
     
+    @app.route('/safety/check/batch', methods=['POST'])
+    def check_safety_batch():
+        data = request.json
+        
+        required = ['bond_ids']
+        if not all(k in data for k in required) or not ('distances' in data or 'lats' in data):
+            return jsonify({'error': 'Missing required fields'}), 400
+        
+        bond_ids = data['bond_ids']
+        n = len(bond_ids)
+        child_ids = data.get('child_ids', ['unknown'] * n)
+        distances = data.get('distances', [0.0] * n)
+        moving_toward = data.get('moving_toward', [False] * n)
+        heart_rates = data.get('heart_rates', [60.0] * n)
+        lats = data.get('lats')
+        lons = data.get('lons', [None] * n) if lats is not None else None
+        
+        columns = [child_ids, distances, moving_toward, heart_rates] + ([lats, lons] if lats is not None else [])
+        if not all(len(col) == n for col in columns):
+            return jsonify({'error': 'Array lengths do not match'}), 400
+        
+        results = system.safety_check_batch(
+            bond_ids=bond_ids,
+            child_ids=child_ids,
+            distances=distances,
+            moving_toward=moving_toward,
+            heart_rates=heart_rates,
+            lats=lats,
+            lons=lons
+        )
+        
+        return jsonify({
+            'results': results,
+            'count': n,
+            'alerts': sum(1 for r in results if r.get('alert'))
+        })
+    
+    @app.route('/pools/nearby', methods=['GET'])
+    def pools_nearby():
+        try:
+            lat = float(request.args['lat'])
+            lon = float(request.args['lon'])
+            radius_m = float(request.args['radius_m']) if request.args.get('radius_m') else None
+            k = int(request.args['k']) if request.args.get('k') else None
+        except (KeyError, ValueError):
+            return jsonify({'error': 'lat and lon are required'}), 400
+        
+        pools = system.safety.pools_near(lat, lon, radius_m=radius_m, k=k)
+        return jsonify({'pools': pools, 'count': len(pools)})
+    
     @app.route('/alerts', methods=['GET'])
     def get_alerts():
-        since = request.args.get('since')
-        if since:
-            try:
-                since = int(since)
-            except:
-                since = None
+        args = {}
+        for key in ('since', 'cursor', 'limit'):
+            value = request.args.get(key)
+            if value:
+                try:
+                    args[key] = int(value)
+                except:
+                    if key == 'cursor':
+                        args[key] = value   # sharded mode: one position per shard (validated by the store)
+        for key in ('child_id', 'pool_id'):
+            if request.args.get(key):
+                args[key] = request.args[key]
         
-        return jsonify({
-            'alerts': system.safety.get_alerts(since),
-            'count': len(system.safety.alerts)
+        # Conditional GET: same store version + same query -> 304 (version after syncing other workers)
+        store = system.safety.alerts
+        query = hashlib.md5(request.query_string).hexdigest()[:8]
+        etag = f"{system.safety.alerts_version()}-{query}"
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        try:
+            page = system.safety.query_alerts(**args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        response = jsonify({
+            'alerts': page['alerts'],
+            'next_cursor': page['next_cursor'],
+            'count': len(store)
         })
+        response.set_etag(etag)
+        return response
+    
+    @app.route('/alerts/stream', methods=['GET'])
+    def stream_alerts():
+        """Server-Sent Events: push each new alert, resumable via Last-Event-ID"""
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except:
+            last_event_id = None
+        
+        broadcaster = system.safety.stream
+        if broadcaster is None:
+            return jsonify({'error': 'Live stream is not available in sharded mode'}), 501
+        sub = broadcaster.subscribe(
+            pool_id=request.args.get('pool_id'),
+            child_id=request.args.get('child_id'),
+            owner_id=request.args.get('owner_id'),
+            last_event_id=last_event_id
+        )
+        if sub is None:
+            return jsonify({'error': 'Too many subscribers'}), 503
+        
+        def generate():
+            try:
+                yield 'retry: 3000\n\n'
+                while not sub.closed:
+                    events = sub.drain(timeout=Config.ALERT_STREAM_KEEPALIVE_S)
+                    if not events:
+                        yield ': keep-alive\n\n'
+                        continue
+                    for position, alert, update in events:
+                        yield sse_event(position, alert, update)
+            finally:
+                broadcaster.unsubscribe(sub)
+        
+        return Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
     
     @app.route('/earth/validate', methods=['POST'])
     def earth_validate():
@@ -771,13 +3840,56 @@ if HAS_FLASK:
         if not all(k in data for k in required):
             return jsonify({'error': 'Missing required fields'}), 400
         
-        validator = EarthValidator()
+        validator = EarthValidator(cache=system.earth.cache, feeds=system.earth.feeds)
         result = validator.validate_location(
             lat=data['lat'],
             lon=data['lon'],
-            alt=data.get('alt', 300.0)
+            alt=data.get('alt', 300.0),
+            **point_filters(data, request.args)
         )
         
+        if 'error' in result:
+            return jsonify(result), 400
+        
+        return jsonify(result)
+    
+    @app.route('/session/<session_id>/earth', methods=['GET'])
+    def session_earth(session_id):
+        """Earth summary for a session, with the full 47-point result if not yet evicted"""
+        result = system.get_earth_result(session_id)
+        if 'error' in result:
+            return jsonify(result), 404
+        return jsonify(result)
+    
+    @app.route('/earth/points', methods=['GET'])
+    def earth_points():
+        """Point registry: id, name, group, purity and dependencies"""
+        return precomputed_response(POINTS_RESPONSE)
+    
+    @app.route('/earth/validate/batch', methods=['POST'])
+    def earth_validate_batch():
+        data = request.json
+        
+        required = ['lats', 'lons']
+        if not all(k in data for k in required):
+            return jsonify({'error': 'Missing required fields'}), 400
+        
+        alts = data.get('alts', 300.0)
+        if len(data['lats']) != len(data['lons']) or (
+                isinstance(alts, list) and len(alts) != len(data['lats'])):
+            return jsonify({'error': 'Array lengths do not match'}), 400
+        
+        validator = EarthValidator(feeds=system.earth.feeds)
+        result = validator.validate_location_many(
+            lats=data['lats'],
+            lons=data['lons'],
+            alts=alts
+        )
+        
+        result['values'] = {k: v.tolist() for k, v in result['values'].items()}
+        for key in ('confidence', 'average_confidence', 'points_passed', 'collapse_state', 'verified'):
+            result[key] = result[key].tolist()
+        
         return jsonify(result)
     
     @app.route('/api-key/generate', methods=['POST'])
@@ -811,12 +3923,16 @@ if HAS_FLASK:
             'documentation': 'See http://localhost:5000/dashboard for usage guide'
         }), 201
 
+    return app
+
 # ============================================
 # MAIN - RUN DEMO
 # ============================================
 
-def run_demo():
+def run_demo(system: 'ZER01NE67' = None):
     """Run a complete demo"""
+    if system is None:
+        system = get_system()
     
     print("\n" + "="*60)
     print(f" {Config.SYSTEM_NAME}")
@@ -904,7 +4020,7 @@ if __name__ == "__main__":
     if HAS_FLASK:
         print("\nðŸŒ Starting Flask server on http://localhost:5000")
         print("   Press Ctrl+C to stop")
-        app.run(host=Config.HOST, port=Config.PORT, debug=Config.DEBUG)
+        create_app(system).run(host=Config.HOST, port=Config.PORT, debug=Config.DEBUG)
     else:
         print("\nâš ï¸ Flask not installed. Install with:")
         print("   pip install flask flask-cors")
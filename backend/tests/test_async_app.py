@@ -0,0 +1,83 @@
+"""
+The aiohttp app keeps its event loop free while the core waits on disk: with
+WAL_DIR set and synchronous commits, family registrations wait for the log's
+group commit and must run in the state pool.
+"""
+
+import time
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+from aiohttp.test_utils import TestServer, TestClient
+
+import async_app
+from sovereign_quantum_system import ZER01NE67, MemoryStateStore
+from wal_store import DurableState
+
+COMMIT_DELAY_S = 0.05   # each group commit lingers this long, so an inline registration stalls the loop
+REGISTRATIONS = 10
+MAX_STALL_S = 0.03      # longest the loop may go without running a 1 ms ticker
+
+
+@pytest.fixture
+def durable_system(tmp_path):
+    store = MemoryStateStore(journaled=True)
+    durable = DurableState(store, directory=str(tmp_path), fsync=True, sync_commit=True,
+                           commit_delay_s=COMMIT_DELAY_S, autostart=False)
+    durable.recover()
+    system = ZER01NE67(store=store)
+    yield system
+    system.revalidator.stop()
+    durable.close()
+
+
+async def _longest_stall(app, requests) -> float:
+    """Run the request coroutines against app; returns the longest gap between ticks of a 1 ms timer"""
+    stop = asyncio.Event()
+    longest = 0.0
+
+    async def ticker():
+        nonlocal longest
+        last = time.perf_counter()
+        while not stop.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            longest = max(longest, now - last)
+            last = now
+
+    async with TestClient(TestServer(app)) as client:
+        tick = asyncio.create_task(ticker())
+        await asyncio.sleep(0.01)
+        await requests(client)
+        stop.set()
+        await tick
+    return longest
+
+
+def test_registrations_do_not_stall_the_loop(durable_system):
+    app = async_app.make_app(durable_system)
+    assert app[async_app.SYNC_WAL]
+    session_id = durable_system.register_location('OWNER', 33.4484, -112.0740)['session_id']
+    statuses = []
+
+    async def register(client):
+        for n in range(REGISTRATIONS):
+            response = await client.post('/family/register', json={
+                'session_id': session_id, 'mother_id': f'MOM_{n}', 'child_id': f'CHILD_{n}'})
+            statuses.append(response.status)
+
+    stall = asyncio.run(_longest_stall(app, register))
+    assert statuses == [200] * REGISTRATIONS
+    assert len(durable_system.safety.bonds) == REGISTRATIONS
+    assert stall < MAX_STALL_S, f"event loop stalled {stall * 1000:.0f} ms"
+
+
+def test_memory_store_without_wal_stays_inline():
+    system = ZER01NE67(store=MemoryStateStore())
+    try:
+        app = async_app.make_app(system)
+        assert not app[async_app.SYNC_WAL] and not app[async_app.REMOTE]
+    finally:
+        system.revalidator.stop()
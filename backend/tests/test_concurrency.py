@@ -0,0 +1,142 @@
+"""
+Time-bounded concurrency stress: 64 threads against one AlertStore (appends,
+in-place updates and evictions racing through the contended drain) and
+against a whole ZER01NE67. benchmarks/stress_concurrency.py runs the longer
+version from the command line.
+"""
+
+import sys
+import time
+import threading
+from dataclasses import replace
+
+import pytest
+
+from sovereign_quantum_system import AlertStore, AlertColumns, SafetyAlert
+from benchmarks.stress_concurrency import run as stress_system
+
+THREADS = 64
+ITERATIONS = 200
+KEEP = 500          # alerts an evicting thread trims the store to
+TIMEOUT_S = 60.0    # per test; a deadlocked drain fails instead of hanging
+
+
+@pytest.fixture
+def fast_switching():
+    """Switch threads as often as possible so they interleave inside the drain"""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+class YieldingLock:
+    """A lock that lets other threads run just before it is released
+
+    Writers that arrive in that window find the lock taken and leave their
+    changes queued, which is the case _drain's re-check after release covers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        return self._lock.acquire(blocking, timeout)
+
+    def release(self):
+        time.sleep(0)
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def run_threads(target, count: int):
+    """Run target(t, barrier) on count threads; fail on a hang or on any thread's exception"""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def guarded(t):
+        try:
+            target(t, barrier)
+        except BaseException as e:
+            errors.append(e)
+            barrier.abort()
+
+    threads = [threading.Thread(target=guarded, args=(t,), daemon=True) for t in range(count)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join(TIMEOUT_S)
+        assert not th.is_alive(), f"thread still running after {TIMEOUT_S:.0f}s"
+    if errors:
+        raise errors[0]
+
+
+@pytest.mark.parametrize('columnar', [False, True], ids=['list', 'columnar'])
+def test_alert_store_extend_revise_evict(columnar, fast_switching):
+    store = AlertStore(AlertColumns() if columnar else None, max_history=0, max_age_s=0)
+    store._commit_lock = YieldingLock()
+    heard = {'appends': 0, 'updates': 0}
+
+    def listener(position, alert, update):
+        heard['updates' if update else 'appends'] += 1     # listeners run under the commit lock
+
+    store.listeners.append(listener)
+    notified = [0] * THREADS
+
+    def alert(t: int, i: int, j: int) -> SafetyAlert:
+        return SafetyAlert(alert_id=f"{t}-{i}-{j}", child_id=f"CHILD_{t}", pool_id=f"POOL_{j}",
+                           danger_probability=0.9, timestamp=i, triggered=True, last_seen=i, peak_probability=0.9)
+
+    def writer(t, barrier):
+        barrier.wait()
+        for i in range(ITERATIONS):
+            if t % 8 == 0 and i % 4 == 0:
+                store.evict(max_count=KEEP)
+            batch = [alert(t, i, j) for j in range(2)]
+            store.extend(batch)
+            notify = i % 2 == 0
+            store.revise([(replace(a, count=2, danger_probability=0.95), notify) for a in batch])
+            notified[t] += 2 * notify
+        # Last writes all at once: nobody writes after them to pick up what a contended drain leaves
+        barrier.wait()
+        last = alert(t, ITERATIONS, 0)
+        store.append(last)
+        store.revise([(replace(last, count=2, danger_probability=0.95), False)])
+
+    run_threads(writer, THREADS)
+
+    appended = THREADS * (ITERATIONS * 2 + 1)
+    assert not store._pending, "a contended drain left changes queued"
+    assert not store._early, "an update was parked although its append came first"
+    assert store.end == appended
+    assert heard['appends'] == appended
+    assert store.version >= appended + appended     # every append and update bumps it (plus evictions)
+
+    # Every alert still held got its update, and the indexes agree with the rows
+    base, rows, keys = store._window
+    assert len(keys) == len(rows) and keys == sorted(keys)
+    for position in range(base, store.end):
+        alert = store[position]
+        assert alert.count == 2 and alert.danger_probability == 0.95
+        assert store.position(alert.alert_id) == position
+    assert len(store._by_id) == len(rows)
+    for child_id, (positions, _) in store._by_child.items():
+        assert positions == sorted(positions) and positions[0] >= base
+        assert all(store[p].child_id == child_id for p in positions)
+    assert sum(len(positions) for positions, _ in store._by_child.values()) == len(rows)
+    # Updates to alerts evicted first are dropped, so at most every notified update is heard
+    assert heard['updates'] <= sum(notified)
+
+    store.evict(max_count=KEEP)
+    assert len(store) == min(KEEP, appended) and store.base == appended - len(store)
+
+
+@pytest.mark.parametrize('columnar', [False, True], ids=['dict', 'columnar'])
+def test_system_exact_counts(columnar, fast_switching):
+    assert stress_system(THREADS, 100, columnar)
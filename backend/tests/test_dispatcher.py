@@ -0,0 +1,148 @@
+"""
+OutboundDispatcher against a local stub HTTP server: SOS events are not held
+up behind insurer deliveries, failed sends are retried with backoff until
+max_attempts, a full lane drops its oldest events and insurer events go out
+in batches.
+"""
+
+import json
+import time
+import threading
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import dispatcher as dispatcher_module
+from dispatcher import OutboundDispatcher
+
+FLUSH_S = 10.0
+
+
+class Stub(ThreadingHTTPServer):
+    """Records every POST; answers each path's scripted statuses in turn (then 200), after its delay"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.lock = threading.Lock()
+        self.statuses = defaultdict(deque)      # path -> statuses still to answer
+        self.delay_s = defaultdict(float)       # path -> seconds to wait before answering
+        self.received = defaultdict(list)       # path -> [(monotonic, status, events header, body)]
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'     # keep-alive
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(self.server.delay_s[self.path])
+        with self.server.lock:
+            script = self.server.statuses[self.path]
+            status = script.popleft() if script else 200
+            self.server.received[self.path].append(
+                (time.monotonic(), status, int(self.headers['X-Zer01ne-Events']), body))
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = Stub()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_dispatcher(stub):
+    """OutboundDispatcher on the stub's /sos and /insurer-a, /insurer-b endpoints, closed afterwards"""
+    made = []
+
+    def make(**options) -> OutboundDispatcher:
+        options.setdefault('linger_s', 0.01)
+        dispatcher = OutboundDispatcher(sos_urls=[stub.url('/sos')],
+                                        insurer_urls=[stub.url('/insurer-a'), stub.url('/insurer-b')], **options)
+        made.append(dispatcher)
+        return dispatcher
+
+    yield make
+    for dispatcher in made:
+        dispatcher.close()
+
+
+def event(n: int) -> dict:
+    return {'type': 'alert.raised', 'n': n}
+
+
+def test_sos_is_not_held_up_by_slow_insurers(stub, make_dispatcher):
+    stub.delay_s['/insurer-a'] = stub.delay_s['/insurer-b'] = 0.3
+    dispatcher = make_dispatcher(sos_workers=2, batch_size=10)
+    for n in range(10):
+        dispatcher.submit(event(n), f"ALERT_{n}")
+    assert dispatcher.flush(FLUSH_S)
+
+    sos = stub.received['/sos']
+    insurer = stub.received['/insurer-a'] + stub.received['/insurer-b']
+    assert sorted(body['n'] for *_, body in sos) == list(range(10))
+    assert [events for _, _, events, _ in insurer] == [10, 10]
+    # Every SOS was answered before the first insurer delivery came back
+    assert max(t for t, *_ in sos) < min(t for t, *_ in insurer)
+
+
+def test_retries_back_off_until_max_attempts(stub, make_dispatcher, monkeypatch):
+    monkeypatch.setattr(dispatcher_module.random, 'uniform', lambda low, high: high)    # no jitter
+    stub.statuses['/sos'].extend([503] * 10)
+    stub.statuses['/insurer-a'].extend([503, 429])
+    stub.statuses['/insurer-b'].append(400)     # other 4xx are final
+    dispatcher = make_dispatcher(max_attempts=4, backoff_s=0.05, backoff_max_s=0.15, batch_size=1)
+    dispatcher.submit(event(0), 'ALERT_0')
+    assert dispatcher.flush(FLUSH_S)
+
+    attempts = [t for t, *_ in stub.received['/sos']]
+    assert len(attempts) == 4
+    gaps = [b - a for a, b in zip(attempts, attempts[1:])]
+    for gap, backoff in zip(gaps, (0.05, 0.1, 0.15)):      # doubling, capped at backoff_max_s
+        assert gap >= backoff
+    assert [status for _, status, *_ in stub.received['/insurer-a']] == [503, 429, 200]
+    assert [status for _, status, *_ in stub.received['/insurer-b']] == [400]
+
+    stats = dispatcher.stats()
+    assert (stats['sos']['failed'], stats['sos']['retried'], stats['sos']['delivered']) == (1, 3, 0)
+    assert (stats['insurer']['failed'], stats['insurer']['retried'], stats['insurer']['delivered']) == (1, 2, 1)
+
+
+def test_full_lane_drops_oldest_events(stub, make_dispatcher):
+    # A long linger keeps insurer events queued, so the queue fills
+    dispatcher = make_dispatcher(queue_size=3, batch_size=100, linger_s=60.0)
+    for n in range(5):
+        dispatcher.submit(event(n), f"ALERT_{n}", sos=False)
+    assert dispatcher.insurer.stats()['dropped'] == 2
+    dispatcher.close()      # sends the queue without lingering
+
+    for path in ('/insurer-a', '/insurer-b'):
+        (_, _, events, body), = stub.received[path]
+        assert events == 3 and [e['n'] for e in body['events']] == [2, 3, 4]
+
+
+def test_insurer_events_are_batched(stub, make_dispatcher):
+    dispatcher = make_dispatcher(batch_size=5, linger_s=0.2)
+    for n in range(12):
+        dispatcher.submit(event(n), f"ALERT_{n}")
+    assert dispatcher.flush(FLUSH_S)
+
+    assert len(stub.received['/sos']) == 12
+    for path in ('/insurer-a', '/insurer-b'):
+        batches = stub.received[path]
+        assert [events for _, _, events, _ in batches] == [5, 5, 2]
+        assert [body['count'] for *_, body in batches] == [5, 5, 2]
+        assert [e['n'] for *_, body in batches for e in body['events']] == list(range(12))
@@ -0,0 +1,73 @@
+"""
+validate_location_many gives each row what validate_location gives at that
+location: per-point confidences (feed points read the row's own tile),
+summary columns and the array kernels' values.
+"""
+
+import pytest
+
+from sovereign_quantum_system import EarthValidator
+
+# (lat, lon, alt): seismic zone, FAA zones, both hemispheres, polar, windy tiles (odd latitude degrees)
+LOCATIONS = [
+    (33.4484, -112.0740, 300.0),
+    (33.9, -112.5, 100.0),
+    (34.0522, -118.2437, 1000.0),
+    (-33.8688, 151.2093, 20.0),
+    (70.2, 25.0, 300.0),
+    (-78.5, 166.0, 5000.0),
+    (0.0, 0.0, 0.0),
+    (33.4484, -112.0740, 300.0),
+]
+# values column -> (point, field) of the scalar result
+KERNEL_FIELDS = {
+    'time_dilation': (17, 'delta'),
+    'coriolis_f': (21, 'f'),
+    'declination': (23, 'declination'),
+    'seismic_risk': (24, 'risk'),
+    'faa_zone': (26, 'zone'),
+    'is_polar': (29, 'is_polar'),
+    'qnh': (31, 'qnh'),
+    'teleport_speed_mps': (40, 'speed_mps'),
+}
+
+
+class TileFeeds:
+    """Feed stand-in: strong wind on odd 1-degree latitude tiles, defaults elsewhere"""
+
+    def __init__(self):
+        self.peeked = set()
+
+    def key(self, name, lat, lon):
+        return (name, int(lat // 1.0), int(lon // 1.0))
+
+    def peek(self, name, lat, lon, default=None):
+        key = self.key(name, lat, lon)
+        self.peeked.add(key)
+        if name == 'wind' and key[1] % 2:
+            return 9.0, 'fresh'
+        return default, 'fresh'
+
+
+@pytest.mark.parametrize('feeds', [None, TileFeeds()], ids=['static', 'tiled-feeds'])
+def test_batch_matches_scalar(feeds):
+    validator = EarthValidator(feeds=feeds)
+    lats, lons, alts = (list(column) for column in zip(*LOCATIONS))
+    batch = validator.validate_location_many(lats, lons, alts)
+    assert batch['count'] == len(LOCATIONS)
+    if feeds is not None:
+        # Every row's tile was read, as validating each row would, and the rows disagree on p16
+        assert {key for key in feeds.peeked if key[0] == 'wind'} == {
+            feeds.key('wind', lat, lon) for lat, lon, _ in LOCATIONS}
+        assert sorted(set(batch['confidence'][:, 15].tolist())) == [0.8, 1.0]
+
+    for i, (lat, lon, alt) in enumerate(LOCATIONS):
+        scalar = validator.validate_location(lat, lon, alt)
+        points = scalar['points']
+        assert batch['confidence'][i].tolist() == [points[pid]['confidence'] for pid in range(1, 48)], f"row {i}"
+        assert batch['average_confidence'][i] == scalar['average_confidence']
+        assert batch['points_passed'][i] == scalar['points_passed']
+        assert batch['collapse_state'][i] == scalar['collapse_state']
+        assert batch['verified'][i] == scalar['verified']
+        for column, (pid, field) in KERNEL_FIELDS.items():
+            assert batch['values'][column][i] == pytest.approx(points[pid][field], rel=1e-9), (column, i)
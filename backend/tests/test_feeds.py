@@ -0,0 +1,138 @@
+"""
+FeedClient against the fake NASA/NOAA/USGS upstreams of
+benchmarks/bench_feeds.py, on a controllable clock: concurrent misses on a
+tile share one request, expired entries are served stale while one refresh
+runs, and a failing source opens its breaker until a trial succeeds.
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('aiohttp')
+from feeds import FeedClient, FRESH, STALE, FALLBACK
+from benchmarks.bench_feeds import FakeClock, FakeUpstream, make_client, TTL
+
+LAT, LON = 33.4484, -112.0740
+SOURCES = tuple(TTL)
+THREADS = 16
+FAILURES = 3        # breaker threshold
+COOLDOWN_S = 30.0
+FLUSH_S = 10.0
+
+
+@pytest.fixture
+def upstream():
+    return FakeUpstream(delay_s=0.02)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def client(upstream, clock):
+    client = make_client(upstream, clock, FAILURES, COOLDOWN_S)
+    yield client
+    client.close()
+
+
+def peek_all(client, lat=LAT, lon=LON):
+    return {name: client.peek(name, lat, lon, -1.0) for name in SOURCES}
+
+
+def refresh(client, lat=LAT, lon=LON):
+    """Peek (scheduling any refresh) and wait for the fetches to finish"""
+    peek_all(client, lat, lon)
+    assert client.flush(FLUSH_S)
+
+
+def test_concurrent_misses_share_one_fetch(client, upstream):
+    barrier = threading.Barrier(THREADS)
+
+    def reader():
+        barrier.wait()
+        for _ in range(50):
+            peek_all(client, LAT + 0.01, LON + 0.01)    # same tile as LAT/LON
+
+    threads = [threading.Thread(target=reader) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    async def gets():
+        return await asyncio.gather(*(client.get('wind', LAT, LON) for _ in range(20)))
+
+    answers = asyncio.run(gets())
+    assert client.flush(FLUSH_S)
+    assert dict(upstream.requests) == {name: 1 for name in SOURCES}
+    assert {state for _, state in answers} == {FRESH}
+    assert peek_all(client) == {name: (upstream.value(name, 1), FRESH) for name in SOURCES}
+
+
+def test_tides_are_shared_by_every_tile(client, upstream):
+    refresh(client)
+    refresh(client, LAT + 5, LON + 5)
+    assert dict(upstream.requests) == {'wind': 2, 'tides': 1, 'water_table': 2}
+
+
+def test_expired_entries_are_served_stale_while_one_refresh_runs(client, upstream, clock):
+    refresh(client)
+    clock.now += max(TTL.values())
+
+    for _ in range(20):
+        assert peek_all(client) == {name: (upstream.value(name, 1), STALE) for name in SOURCES}
+    assert client.flush(FLUSH_S)
+    assert dict(upstream.requests) == {name: 2 for name in SOURCES}
+    assert peek_all(client) == {name: (upstream.value(name, 2), FRESH) for name in SOURCES}
+
+
+def test_breaker_opens_after_failures_and_closes_after_a_trial(client, upstream, clock):
+    refresh(client)
+    upstream.requests.clear()
+    upstream.failing = True
+    clock.now += max(TTL.values())
+    for _ in range(FAILURES * 3):
+        refresh(client)
+
+    assert dict(upstream.requests) == {name: FAILURES for name in SOURCES}
+    assert {name: client.breakers[name].state for name in SOURCES} == {name: 'open' for name in SOURCES}
+    assert peek_all(client) == {name: (upstream.value(name, 1), STALE) for name in SOURCES}
+
+    # Still cooling down: nothing is sent
+    clock.now += COOLDOWN_S / 2
+    refresh(client)
+    assert dict(upstream.requests) == {name: FAILURES for name in SOURCES}
+
+    upstream.failing = False
+    upstream.requests.clear()
+    clock.now += COOLDOWN_S
+    refresh(client)
+    assert dict(upstream.requests) == {name: 1 for name in SOURCES}
+    assert {name: client.breakers[name].state for name in SOURCES} == {name: 'closed' for name in SOURCES}
+    assert {state for _, state in peek_all(client).values()} == {FRESH}
+
+
+def test_default_sources_send_configured_credentials(upstream, clock):
+    config = SimpleNamespace(
+        NASA_POWER_URL=upstream.url('power'), NOAA_TIDES_URL=upstream.url('tides'),
+        USGS_GWLEVELS_URL=upstream.url('gwlevels'), NOAA_TIDE_STATION='9410230',
+        NASA_API_KEY='nasa-key', NOAA_TOKEN='noaa-token', USGS_TOKEN=None,
+        FEED_WIND_TTL_S=TTL['wind'], FEED_TIDES_TTL_S=TTL['tides'], FEED_WATER_TABLE_TTL_S=TTL['water_table'],
+        FEED_TILE_DEG=0.25, FEED_MAX_ENTRIES=100, FEED_TIMEOUT_S=5.0, FEED_POOL_SIZE=4,
+        FEED_BREAKER_FAILURES=FAILURES, FEED_BREAKER_COOLDOWN_S=COOLDOWN_S)
+    client = FeedClient.from_config(config)
+    client.clock = clock
+    try:
+        assert {state for _, state in peek_all(client).values()} == {FALLBACK}
+        assert client.flush(FLUSH_S)
+    finally:
+        client.close()
+
+    assert upstream.headers['wind']['X-Api-Key'] == 'nasa-key'
+    assert upstream.headers['tides']['token'] == 'noaa-token'
+    assert 'X-Api-Key' not in upstream.headers['water_table']      # no USGS_TOKEN configured
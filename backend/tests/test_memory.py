@@ -0,0 +1,78 @@
+"""
+Memory budgets per registered session (with its pool and two bonds) and per
+stored entity, for the slotted dict layout and the columnar layout.
+benchmarks/bench_memory.py prints the full before/after table.
+"""
+
+import tracemalloc
+
+import pytest
+
+from sovereign_quantum_system import (
+    ChildState, SafetyAlert, AlertColumns, ZER01NE67, MemoryStateStore, EarthValidator, EarthResultStore
+)
+
+SESSIONS = 5000
+ENTITIES = 100000
+
+# About 15% over what each layout measures at this size (2.6 KB dict, 1.8 KB columnar)
+SESSION_BUDGET = {False: 3000, True: 2000}
+
+
+def traced_bytes(build) -> int:
+    """Bytes build() leaves allocated (including whatever it returns)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def session_bytes(columnar: bool) -> float:
+    """Traced growth per session registered into an already running system"""
+    store = MemoryStateStore(columnar)
+    store.earth_results = EarthResultStore(max_entries=0)   # compact summaries only
+    system = ZER01NE67(store=store)
+    system.earth = EarthValidator()     # no point cache: measure sessions, not cells
+
+    def register():
+        for n in range(SESSIONS):
+            session = system.register_location(f"OWNER_{n}", 33.0 + n * 1e-3, -112.0740)
+            for b in range(2):
+                system.create_family_bond(session['session_id'], f"MOM_{n}", f"CHILD_{n}_{b}")
+    try:
+        return traced_bytes(register) / SESSIONS
+    finally:
+        system.revalidator.stop()
+
+
+def alert(n: int) -> SafetyAlert:
+    return SafetyAlert(alert_id=f"{n:016x}", child_id=f"CHILD_{n % 5000}", pool_id=f"{n % 1000:016x}",
+                       danger_probability=0.9, triggered=True, satelite_sos_sent=True)
+
+
+@pytest.mark.parametrize('columnar', [False, True], ids=['dict', 'columnar'])
+def test_bytes_per_session(columnar):
+    per_session = session_bytes(columnar)
+    assert per_session < SESSION_BUDGET[columnar], f"{per_session:.0f} bytes per session"
+
+
+def test_models_are_slotted():
+    assert not hasattr(ChildState(child_id='c'), '__dict__')
+    assert not hasattr(alert(0), '__dict__')
+
+
+def test_columnar_alerts_smaller_than_objects():
+    objects = traced_bytes(lambda: [alert(n) for n in range(ENTITIES)]) / ENTITIES
+
+    def build_columns():
+        columns = AlertColumns()
+        for n in range(ENTITIES):
+            columns.append(alert(n))
+        return columns
+    columnar = traced_bytes(build_columns) / ENTITIES
+    assert columnar < objects * 0.5, f"{columnar:.0f} vs {objects:.0f} bytes per alert"
@@ -0,0 +1,128 @@
+"""
+STATE_STORE=redis with two workers sharing one (fake) Redis server: state
+written by one worker is served by the other, alert updates land on the
+pushing worker's list position, the list stays trimmed to ALERT_MAX_HISTORY
+and /alerts revalidation sees alerts raised elsewhere.
+"""
+
+import json
+from dataclasses import replace
+
+import pytest
+
+fakeredis = pytest.importorskip('fakeredis')
+pytest.importorskip('lupa')     # fakeredis runs the store's Lua scripts through lupa
+import redis_store
+from config import Config
+from sovereign_quantum_system import ZER01NE67, ChildState, SafetyAlert, create_app, make_state_store
+
+LAT, LON = 33.4484, -112.0740
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    """make_state_store() builds stores on one shared fake server; returns a worker factory"""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(Config, 'STATE_STORE', 'redis')
+    monkeypatch.setattr(redis_store.redis, 'Redis', lambda connection_pool: fakeredis.FakeRedis(server=server))
+    started = []
+
+    def worker() -> ZER01NE67:
+        system = ZER01NE67(store=make_state_store())
+        started.append(system)
+        return system
+
+    yield worker
+    for system in started:
+        system.revalidator.stop()
+
+
+def near_pool(child_id: str) -> ChildState:
+    return ChildState(child_id=child_id, lat=LAT, lon=LON, distance_to_pool=1.0,
+                      moving_toward_pool=True, heart_rate=150)
+
+
+def listed(store) -> list:
+    """The shared alert list as (alert_id, count) pairs"""
+    return [(a['alert_id'], a['count']) for a in map(json.loads, store.client.lrange(store._alert_list, 0, -1))]
+
+
+def test_workers_share_state_and_alerts(workers):
+    w1, w2 = workers(), workers()
+    assert w1.store.backend == 'redis'
+    session_id = w1.register_location('OWNER', LAT, LON)['session_id']
+    bond_id = w1.create_family_bond(session_id, 'MOM', 'CHILD')['bond_id']
+
+    result = w2.safety_check(bond_id, near_pool('CHILD'))
+    assert result['alert_event'] == 'raised' and result['handshake_count'] == 1
+    far = ChildState(child_id='CHILD', lat=LAT, lon=LON, distance_to_pool=500.0, heart_rate=80)
+    assert w1.safety_check(bond_id, far)['handshake_count'] == 2
+
+    assert [a['alert_id'] for a in w1.safety.get_alerts()] == [result['alert_id']]
+    assert w1.remove_family_bond(bond_id)['success']
+    assert w2.safety_check(bond_id, near_pool('CHILD')) == {'error': 'Bond not found'}
+
+
+def test_check_sees_the_revalidated_session(workers):
+    w1, w2 = workers(), workers()
+    session_id = w1.register_location('OWNER', LAT, LON)['session_id']
+    bond_id = w1.create_family_bond(session_id, 'MOM', 'CHILD')['bond_id']
+    session = w1.sessions[session_id]
+    w1.sessions[session_id] = {**session, 'earth_verified': False, 'earth_checked': 0}
+
+    # The stale copy says verification was lost; the re-validation awaited here restores it
+    result = w2.safety_check(bond_id, near_pool('CHILD'), deadline_ms=10000)
+    assert 'error' not in result and result['earth_stale'] is False
+    assert w1.sessions[session_id]['earth_verified']
+
+
+def test_updates_set_the_pushed_position(workers):
+    w1, w2 = workers(), workers()
+    session_id = w1.register_location('OWNER', LAT, LON)['session_id']
+    bonds = [w1.create_family_bond(session_id, 'MOM', f'CHILD_{n}')['bond_id'] for n in range(2)]
+    w2.safety_check(bonds[0], near_pool('CHILD_0'))     # another worker's alert ahead in the list
+    alert_id = w1.safety_check(bonds[1], near_pool('CHILD_1'))['alert_id']
+
+    assert w1.safety_check(bonds[1], near_pool('CHILD_1'))['alert_event'] == 'updated'
+    assert w1.store._indexes[alert_id] == 1
+    assert [count for _, count in listed(w1.store)] == [1, 2]
+    # A worker starting now syncs the updated alert
+    assert [a['count'] for a in workers().safety.get_alerts()] == [1, 2]
+
+
+def test_list_is_trimmed_and_positions_stay_put(workers):
+    w1, w2 = workers(), workers()
+    for store in (w1.store, w2.store):
+        store.max_history = 3
+
+    def alert(n: int) -> SafetyAlert:
+        return SafetyAlert(alert_id=f'A{n}', child_id='CHILD', pool_id='POOL', danger_probability=0.9,
+                           timestamp=n, triggered=True)
+
+    w1.store.record_checks([], [alert(n) for n in range(5)])
+    assert listed(w1.store) == [('A2', 1), ('A3', 1), ('A4', 1)]
+    assert w1.store._indexes['A4'] == 4
+
+    w2.store.record_checks([], [alert(5)])     # trims A2 after w1 learned the positions
+    w1.store.record_checks([], [], [(replace(alert(4), count=3), False), (replace(alert(0), count=3), False)])
+    assert listed(w1.store) == [('A3', 1), ('A4', 3), ('A5', 1)]
+
+    # w2's push read back only what was left: it never saw A0-A2
+    assert [a.alert_id for a in w2.store.alerts] == ['A3', 'A4', 'A5'] and w2.store._synced == 6
+    w3 = workers()
+    w3.store.sync_alerts()
+    assert [(a.alert_id, a.count) for a in w3.store.alerts] == [('A3', 1), ('A4', 3), ('A5', 1)]
+
+
+def test_alerts_etag_sees_other_workers(workers):
+    w1, w2 = workers(), workers()
+    session_id = w1.register_location('OWNER', LAT, LON)['session_id']
+    bond_id = w1.create_family_bond(session_id, 'MOM', 'CHILD')['bond_id']
+    client = create_app(w2).test_client()
+    first = client.get('/alerts')
+    assert first.status_code == 200 and first.json['alerts'] == []
+
+    w1.safety_check(bond_id, near_pool('CHILD'))
+    again = client.get('/alerts', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 200 and len(again.json['alerts']) == 1
+    assert client.get('/alerts', headers={'If-None-Match': again.headers['ETag']}).status_code == 304
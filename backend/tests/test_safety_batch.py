@@ -0,0 +1,85 @@
+"""
+check_safety_batch gives row for row what the same checks through scalar
+check_safety give: probabilities, alert events, handshake counts, telemetry
+and errors, in input order, across sessions and with unknown bonds mixed in.
+"""
+
+import time
+
+import pytest
+
+from sovereign_quantum_system import ZER01NE67, ChildState, MemoryStateStore
+
+SITES = [(33.4484, -112.0740), (34.0522, -118.2437)]    # one session (and pool) each
+CHILDREN = 3    # bonded per session
+# (distance_m, moving, heart_rate, located) per round: safe, danger, still in danger, safe again
+ROUNDS = [(8.0, False, 70, False), (1.0, True, 150, True), (0.5, True, 160, True), (9.5, False, 60, False)]
+ROUND_S = 1.0   # clock step between rounds; both paths see the same clock, so velocities match
+# Compared per row; alert ids and timestamps come from the clock
+FIELDS = ('error', 'child_id', 'danger_probability', 'alert', 'alert_event', 'handshake_count',
+          'distance_m', 'velocity_mps', 'time_to_pool_s', 'heart_rate_smoothed')
+
+
+def bonded_system():
+    """A system with CHILDREN bonds per site, and its check rows: (bond_id, child_id, site) in mixed order
+
+    The sites' sessions interleave, one bond is checked twice and unknown
+    bonds lead and trail the rows.
+    """
+    system = ZER01NE67(store=MemoryStateStore())
+    sites = []
+    for s, (lat, lon) in enumerate(SITES):
+        session_id = system.register_location(f'OWNER_{s}', lat, lon)['session_id']
+        sites.append([(system.create_family_bond(session_id, f'MOM_{s}', f'CHILD_{s}_{c}')['bond_id'],
+                       f'CHILD_{s}_{c}', s) for c in range(CHILDREN)])
+    order = [row for pair in zip(*sites) for row in pair]
+    return system, [('NO_SUCH_BOND', 'GHOST', 0)] + order[:3] + [order[1]] + order[3:] + [('ALSO_MISSING', 'GHOST', 1)]
+
+
+@pytest.fixture
+def systems():
+    built = [bonded_system(), bonded_system()]
+    yield built
+    for system, _ in built:
+        system.revalidator.stop()
+
+
+def labelled(system, rows, results):
+    """Results with system-specific ids replaced by the row's site, for comparing two systems"""
+    labelled = []
+    for (bond_id, _, site), result in zip(rows, results):
+        row = {field: result.get(field) for field in FIELDS}
+        row['has_alert_id'] = 'alert_id' in result
+        if 'error' not in result:
+            assert result['bond_id'] == bond_id
+            assert result['pool_id'] == system.safety.bonds[bond_id]['pool_id']
+            row['site'] = site
+        labelled.append(row)
+    return labelled
+
+
+def test_batch_matches_scalar(systems, monkeypatch):
+    (scalar, scalar_rows), (batch, batch_rows) = systems
+    start_ns = time.time_ns()
+    for r, (distance, moving, heart_rate, located) in enumerate(ROUNDS):
+        now_ns = start_ns + int(r * ROUND_S * 1e9)
+        monkeypatch.setattr(time, 'time_ns', lambda: now_ns)
+        lats = [SITES[s][0] + distance * 1e-6 if located else None for _, _, s in scalar_rows]
+        lons = [SITES[s][1] if located else None for _, _, s in scalar_rows]
+
+        expected = [scalar.safety.check_safety(bond_id, ChildState(
+                        child_id=child_id, lat=lat, lon=lon, distance_to_pool=distance,
+                        moving_toward_pool=moving, heart_rate=heart_rate))
+                    for (bond_id, child_id, _), lat, lon in zip(scalar_rows, lats, lons)]
+        n = len(batch_rows)
+        got = batch.safety.check_safety_batch([b for b, _, _ in batch_rows], [c for _, c, _ in batch_rows],
+                                              [distance] * n, [moving] * n, [heart_rate] * n, lats, lons)
+
+        assert labelled(batch, batch_rows, got) == labelled(scalar, scalar_rows, expected)
+        assert got[0] == got[-1] == {'error': 'Bond not found'}
+
+    def stored(system):
+        return [(a['child_id'], a['danger_probability'], a['peak_probability'], a['count'], a['cleared'])
+                for a in system.safety.get_alerts()]
+
+    assert stored(scalar) and stored(batch) == stored(scalar)
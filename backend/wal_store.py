@@ -0,0 +1,514 @@
+"""
+ZER01NE 67 - WRITE-AHEAD LOG
+Crash recovery for the in-memory state store: an append-only log plus periodic snapshots.
+
+Select it with WAL_DIR=<directory> (STATE_STORE=memory). Every mutation of
+pools, bonds, sessions, the bond index, handshake counters and alerts is
+appended to the log as one JSON record; a writer thread writes whatever has
+queued up and fsyncs once per group, so a burst of safety checks costs one
+fsync. Registrations (pools, sessions, bonds) wait for their group to reach
+the disk before returning (WAL_SYNC_COMMIT); handshakes and alerts do not.
+
+Every WAL_SNAPSHOT_S seconds, or once the log passes WAL_SNAPSHOT_MB, the
+log is rotated to a new segment and the state is written as a columnar
+snapshot; log segments and snapshots older than the previous snapshot are
+then deleted. On start the newest readable snapshot is memory-mapped and its
+columns copied straight into arrays, and the segments after it are replayed.
+Snapshots are taken while requests keep running, which is safe because
+every record is either idempotent or absolute (handshake counts are maxima,
+evictions carry the new base position), so replaying records the snapshot
+already holds changes nothing.
+
+With WAL_ENCRYPT=True, bond and alert records and the bond and alert
+snapshot sections (the child-identifying ones) are encrypted with Fernet
+using ENCRYPTION_KEY. The debouncer, telemetry and full Earth results are
+not persisted; they rebuild from traffic.
+"""
+
+import os
+import sys
+import mmap
+import time
+import zlib
+import array
+import struct
+import threading
+from typing import Any, Dict, List, Tuple
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    HAS_FERNET = True
+except ImportError:
+    HAS_FERNET = False
+    InvalidToken = ValueError
+
+from config import Config
+from responses import dumps, loads
+
+FRAME = struct.Struct('<IIB')           # payload length, crc32, flags
+ENCRYPTED = 1                           # frame / section flag
+MAGIC = b'Z67SNAP1'
+TRAILER = struct.Struct('<QQ8s')        # header offset, header length, MAGIC
+SYNC_KINDS = frozenset({'pools', 'bonds', 'sessions', 'bond_index'})
+PRIVATE_KINDS = frozenset({'bonds', 'alert', 'alert_update'})    # encrypted records
+PRIVATE_SECTIONS = frozenset({'bonds', 'alerts'})               # encrypted snapshot sections
+DAMAGED = (ValueError, KeyError, struct.error, InvalidToken)    # reading a bad snapshot
+
+
+def _segment_name(n: int) -> str:
+    return f"wal-{n:08d}.log"
+
+
+def _snapshot_name(n: int) -> str:
+    return f"snapshot-{n:08d}.snap"
+
+
+def _numbered(directory: str, prefix: str, suffix: str) -> List[Tuple[int, str]]:
+    """[(n, path)] of the files named prefix-n.suffix, in order"""
+    found = []
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(suffix):
+            try:
+                found.append((int(name[len(prefix):-len(suffix)]), os.path.join(directory, name)))
+            except ValueError:
+                pass
+    return sorted(found)
+
+
+def _fsync_dir(directory: str):
+    """Make renames and new files durable (not possible on Windows)"""
+    if os.name == 'nt':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# ============================================
+# LOG
+# ============================================
+
+class WriteAheadLog:
+    """Append-only record log in numbered segments, written by one group-commit thread
+
+    append() queues a frame and returns; kinds in sync_kinds wait until the
+    group holding them is flushed (and fsynced when fsync is on). The writer
+    sleeps commit_delay_s before each group to let more records join it.
+    """
+
+    def __init__(self, directory: str, fsync: bool = True, commit_delay_s: float = 0.0,
+                 cipher=None, sync_kinds=SYNC_KINDS, private_kinds=PRIVATE_KINDS):
+        self.directory = directory
+        self.fsync = fsync
+        self.commit_delay_s = commit_delay_s
+        self.cipher = cipher
+        self.sync_kinds = sync_kinds
+        self.private_kinds = private_kinds if cipher is not None else frozenset()
+        self.segment = None
+        self._file = None
+        self._pending: List[bytes] = []
+        self._appended = 0      # sequence number of the last queued record
+        self._durable = 0       # ... and of the last one written
+        self._rotate = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)    # writer waits for records
+        self._done = threading.Condition(self._lock)    # appenders wait for their group
+        self._thread = None
+        self.records = 0
+        self.groups = 0
+        self.bytes = 0
+        self.failed = 0
+        self.segment_bytes = 0
+
+    def open(self, segment: int):
+        """Start writing at a new segment"""
+        os.makedirs(self.directory, exist_ok=True)
+        self._file = open(os.path.join(self.directory, _segment_name(segment)), 'ab')
+        self.segment = segment
+        self.segment_bytes = self._file.tell()
+        _fsync_dir(self.directory)
+        self._thread = threading.Thread(target=self._run, name='wal-writer', daemon=True)
+        self._thread.start()
+
+    def append(self, kind: str, key, value):
+        """Log one mutation: journal callable for MemoryStateStore.set_journal"""
+        payload = dumps((kind, key, value))
+        flags = 0
+        if kind in self.private_kinds:
+            payload = self.cipher.encrypt(payload)
+            flags = ENCRYPTED
+        frame = FRAME.pack(len(payload), zlib.crc32(payload), flags) + payload
+        with self._lock:
+            if self._closed:
+                return
+            self._pending.append(frame)
+            self._appended += 1
+            sequence = self._appended
+            self._work.notify()
+            if kind in self.sync_kinds:
+                while self._durable < sequence and not self._closed:
+                    self._done.wait()
+
+    def rotate(self) -> int:
+        """Flush, close the segment and start the next; returns the new segment number"""
+        with self._lock:
+            target = self.segment + 1
+            self._rotate = True
+            self._work.notify()
+            while self.segment < target and not self._closed:
+                self._done.wait()
+            return self.segment
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything appended so far is written; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            sequence = self._appended
+            while self._durable < sequence and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._done.wait(remaining)
+            return self._durable >= sequence
+
+    def close(self, timeout: float = 10.0):
+        """Write what is queued and stop the writer"""
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        with self._lock:
+            self._closed = True
+            self._work.notify()
+            self._done.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._rotate and not self._closed:
+                    self._work.wait()
+                if self._closed and not self._pending:
+                    break
+            if self.commit_delay_s and not self._rotate:
+                time.sleep(self.commit_delay_s)
+            with self._lock:
+                frames, self._pending = self._pending, []
+                sequence = self._appended
+                rotate = self._rotate
+            try:
+                if frames:
+                    data = b''.join(frames)
+                    self._file.write(data)
+                    self._file.flush()
+                    if self.fsync:
+                        os.fsync(self._file.fileno())
+                    self.records += len(frames)
+                    self.groups += 1
+                    self.bytes += len(data)
+                    self.segment_bytes += len(data)
+                if rotate:
+                    self._file.close()
+                    self._file = open(os.path.join(self.directory, _segment_name(self.segment + 1)), 'ab')
+                    _fsync_dir(self.directory)
+            except OSError:
+                # Keep the frames and try again; appenders waiting on them keep waiting
+                self.failed += 1
+                with self._lock:
+                    self._pending[:0] = frames
+                time.sleep(0.1)
+                continue
+            with self._lock:
+                self._durable = sequence
+                if rotate:
+                    self.segment += 1
+                    self.segment_bytes = 0
+                    self._rotate = False
+                self._done.notify_all()
+        self._file.close()
+
+    @staticmethod
+    def read(path: str, cipher=None) -> Tuple[List[Tuple[str, Any, Any]], int]:
+        """(records, torn bytes) of one segment; a torn or corrupt tail is cut off the file"""
+        size = os.path.getsize(path)
+        if not size:
+            return [], 0
+        records = []
+        offset = 0
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            while offset + FRAME.size <= size:
+                length, crc, flags = FRAME.unpack_from(view, offset)
+                end = offset + FRAME.size + length
+                if end > size:
+                    break
+                payload = view[offset + FRAME.size:end]
+                if zlib.crc32(payload) != crc:
+                    break
+                if flags & ENCRYPTED:
+                    if cipher is None:
+                        raise RuntimeError(f"{path} holds encrypted records: set WAL_ENCRYPT and ENCRYPTION_KEY")
+                    payload = cipher.decrypt(payload)
+                records.append(loads(payload))
+                offset = end
+        if offset < size:
+            os.truncate(path, offset)
+        return records, size - offset
+
+    def stats(self) -> Dict:
+        return {
+            'segment': self.segment,
+            'segment_bytes': self.segment_bytes,
+            'records': self.records,
+            'groups': self.groups,
+            'records_per_fsync': round(self.records / self.groups, 1) if self.groups else 0.0,
+            'bytes': self.bytes,
+            'failed_writes': self.failed,
+            'queued': len(self._pending)
+        }
+
+
+# ============================================
+# SNAPSHOTS
+# ============================================
+
+def write_snapshot(path: str, state: Dict[str, Any], segment: int, cipher=None):
+    """Write MemoryStateStore.export() as a columnar snapshot (tmp file, fsync, rename)
+
+    Layout: MAGIC, one section per table (numeric columns as raw array
+    bytes, string columns as JSON lists), a JSON header describing where
+    every column is, then TRAILER pointing at the header.
+    """
+    header = {'segment': segment, 'created': time.time_ns(), 'byteorder': sys.byteorder, 'sections': []}
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        for name, (first, columns) in state.items():
+            if name == 'alerts':
+                section = {'name': name, 'base': first}
+            else:
+                section = {'name': name}
+                columns = dict(columns, __key__=first)
+            parts, layout, offset = [], [], 0
+            for column, values in columns.items():
+                if isinstance(values, array.array):
+                    data, code = values.tobytes(), values.typecode
+                else:
+                    data, code = dumps(values), 'json'
+                parts.append(data)
+                layout.append({'name': column, 'code': code, 'offset': offset, 'length': len(data)})
+                offset += len(data)
+            data = b''.join(parts)
+            del parts
+            encrypted = cipher is not None and name in PRIVATE_SECTIONS
+            if encrypted:
+                data = cipher.encrypt(data)
+            section.update(offset=f.tell(), length=len(data), crc=zlib.crc32(data),
+                           encrypted=encrypted, columns=layout)
+            f.write(data)
+            header['sections'].append(section)
+        data = dumps(header)
+        offset = f.tell()
+        f.write(data)
+        f.write(TRAILER.pack(offset, len(data), MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(os.path.dirname(path) or '.')
+
+
+def read_snapshot(path: str, cipher=None) -> Tuple[int, Dict[str, Any]]:
+    """(segment, state for MemoryStateStore.load()) from a snapshot; ValueError if damaged"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        if len(view) < len(MAGIC) + TRAILER.size or view[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: not a snapshot")
+        offset, length, magic = TRAILER.unpack_from(view, len(view) - TRAILER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: truncated")
+        header = loads(view[offset:offset + length])
+        swap = header['byteorder'] != sys.byteorder
+        state = {}
+        for section in header['sections']:
+            start, end = section['offset'], section['offset'] + section['length']
+            data = view[start:end]
+            if zlib.crc32(data) != section['crc']:
+                raise ValueError(f"{path}: section {section['name']} is corrupt")
+            if section['encrypted']:
+                if cipher is None:
+                    raise RuntimeError(f"{path} is encrypted: set WAL_ENCRYPT and ENCRYPTION_KEY")
+                data = cipher.decrypt(data)
+            columns = {}
+            with memoryview(data) as buffer:
+                for column in section['columns']:
+                    chunk = buffer[column['offset']:column['offset'] + column['length']]
+                    if column['code'] == 'json':
+                        values = loads(chunk.tobytes())
+                    else:
+                        values = array.array(column['code'])
+                        values.frombytes(chunk)
+                        if swap:
+                            values.byteswap()
+                    chunk.release()
+                    columns[column['name']] = values
+            del data
+            if section['name'] == 'alerts':
+                state['alerts'] = (section['base'], columns)
+            else:
+                state[section['name']] = (columns.pop('__key__'), columns)
+    return header['segment'], state
+
+
+# ============================================
+# DURABLE STATE
+# ============================================
+
+class DurableState:
+    """Recovers a MemoryStateStore from disk, then journals it and snapshots it in the background"""
+
+    def __init__(self, store, directory: str, fsync: bool = True, sync_commit: bool = True,
+                 commit_delay_s: float = 0.0, snapshot_interval_s: float = 300.0,
+                 snapshot_mb: float = 64.0, cipher=None, autostart: bool = True):
+        self.store = store
+        self.directory = directory
+        self.cipher = cipher
+        self.snapshot_interval_s = snapshot_interval_s
+        self.snapshot_mb = snapshot_mb
+        self.autostart = autostart
+        self.wal = WriteAheadLog(directory, fsync, commit_delay_s, cipher,
+                                 SYNC_KINDS if sync_commit else frozenset())
+        self._snapshot_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.recovery: Dict = {}
+        self.snapshots = 0
+        self.snapshot_ms = 0.0
+        self.snapshot_bytes = 0
+        self.last_snapshot = time.monotonic()
+        self.failed_snapshots = 0
+        store.durable = self
+
+    @classmethod
+    def from_config(cls, store, **overrides) -> 'DurableState':
+        cipher = None
+        if Config.WAL_ENCRYPT:
+            if not HAS_FERNET:
+                raise RuntimeError("WAL_ENCRYPT needs the cryptography package: pip install cryptography")
+            try:
+                cipher = Fernet(Config.ENCRYPTION_KEY)
+            except (TypeError, ValueError) as e:
+                raise RuntimeError(f"WAL_ENCRYPT needs ENCRYPTION_KEY set to a Fernet key "
+                                   f"(Fernet.generate_key()): {e}") from e
+        options = dict(directory=Config.WAL_DIR, fsync=Config.WAL_FSYNC, sync_commit=Config.WAL_SYNC_COMMIT,
+                       commit_delay_s=Config.WAL_COMMIT_DELAY_MS / 1000.0,
+                       snapshot_interval_s=Config.WAL_SNAPSHOT_S, snapshot_mb=Config.WAL_SNAPSHOT_MB,
+                       cipher=cipher)
+        options.update(overrides)
+        return cls(store, **options)
+
+    def recover(self) -> Dict:
+        """Load the newest snapshot, replay the log after it, and start journaling"""
+        start = time.perf_counter()
+        os.makedirs(self.directory, exist_ok=True)
+        for _, path in _numbered(self.directory, 'snapshot-', '.snap.tmp'):
+            os.remove(path)     # a snapshot that never finished
+        segment, snapshot = 0, None
+        for n, path in reversed(_numbered(self.directory, 'snapshot-', '.snap')):
+            try:
+                segment, state = read_snapshot(path, self.cipher)
+            except DAMAGED:
+                continue    # fall back to the previous snapshot; its segments are kept
+            self.store.load(state)
+            snapshot = n
+            del state
+            break
+
+        self.store.set_journal(None)
+        replayed, torn, last = 0, 0, segment
+        for n, path in _numbered(self.directory, 'wal-', '.log'):
+            if n < segment:
+                continue
+            records, cut = WriteAheadLog.read(path, self.cipher)
+            for kind, key, value in records:
+                self.store.apply(kind, key, value)
+            replayed += len(records)
+            torn += cut
+            last = n
+
+        self.wal.open(last + 1)
+        self.store.set_journal(self.wal.append)
+        self.recovery = {
+            'snapshot': snapshot,
+            'records_replayed': replayed,
+            'torn_bytes': torn,
+            'pools': len(self.store.pools),
+            'bonds': len(self.store.bonds),
+            'sessions': len(self.store.sessions),
+            'alerts': len(self.store.alerts),
+            'seconds': round(time.perf_counter() - start, 3)
+        }
+        if self.autostart:
+            self.start()
+        return self.recovery
+
+    def snapshot(self) -> int:
+        """Write a snapshot now and drop what the previous one no longer needs; returns its number
+
+        The previous snapshot and the segments after it are kept, so recovery
+        can fall back to them if the newest snapshot turns out damaged.
+        """
+        with self._snapshot_lock:
+            start = time.perf_counter()
+            segment = self.wal.rotate()
+            path = os.path.join(self.directory, _snapshot_name(segment))
+            write_snapshot(path, self.store.export(), segment, self.cipher)
+            snapshots = _numbered(self.directory, 'snapshot-', '.snap')
+            keep = snapshots[-2][0] if len(snapshots) > 1 else segment
+            for n, old in _numbered(self.directory, 'wal-', '.log') + snapshots:
+                if n < keep:
+                    os.remove(old)
+            self.snapshots += 1
+            self.snapshot_ms = (time.perf_counter() - start) * 1000
+            self.snapshot_bytes = os.path.getsize(path)
+            self.last_snapshot = time.monotonic()
+            return segment
+
+    def start(self):
+        if self._thread is None and (self.snapshot_interval_s or self.snapshot_mb):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='wal-snapshots', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(1.0):
+            due = self.snapshot_interval_s and time.monotonic() - self.last_snapshot >= self.snapshot_interval_s
+            big = self.snapshot_mb and self.wal.segment_bytes >= self.snapshot_mb * 2**20
+            if (due or big) and self.wal.records:
+                try:
+                    self.snapshot()
+                except OSError:
+                    self.failed_snapshots += 1
+
+    def close(self, snapshot: bool = False):
+        """Stop snapshotting and flush the log (optionally writing a final snapshot first)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if snapshot:
+            self.snapshot()
+        self.store.set_journal(None)
+        self.wal.close()
+
+    def stats(self) -> Dict:
+        return {
+            'directory': self.directory,
+            'encrypted': self.cipher is not None,
+            'recovery': self.recovery,
+            'snapshots': self.snapshots,
+            'last_snapshot_ms': round(self.snapshot_ms, 1),
+            'last_snapshot_bytes': self.snapshot_bytes,
+            'failed_snapshots': self.failed_snapshots,
+            'log': self.wal.stats()
+        }